@@ -1,15 +1,26 @@
+from collections.abc import AsyncIterator
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from returns.io import IOFailure, IOSuccess, IO, IOResult
-from returns.future import Future, FutureResult
+from fastapi.responses import StreamingResponse
+from loguru import logger
+from returns.io import IOFailure, IOSuccess
+from returns.future import FutureResult
+from returns.maybe import Some
 from returns.result import Failure, Success
 
 from app.core.settings import SETTINGS
 from app.schemas import ArticleReq, ArticleResp
+from app.schemas.article import ArticleErrorEvent, ArticleEvent
 from app.schemas.mindmap import MindmapReq, MindmapResp
+from app.schemas.task import TaskResp
 from app.services.article_service import (
     ArticleService,
     get_article_service,
 )
+from app.services.document_task_service import (
+    DocumentTaskService,
+    get_document_task_service,
+)
 from app.services.mindmap_service import MindmapService, get_mindmap_service
 from app.services.raw_article_service import RawArticleService, get_raw_article_service
 
@@ -35,6 +46,82 @@ async def list_users(
     raise RuntimeError("unreachable")
 
 
+@router.post("/fetch/stream")
+async def stream_article(
+    article_fetch: ArticleReq,
+    raw_article_service: RawArticleService = Depends(get_raw_article_service),
+    article_service: ArticleService = Depends(get_article_service),
+):
+    """Stream the article as NDJSON: a ``meta`` event, ``block`` events in
+    document order, then ``done`` (or ``error`` if rendering fails midway)."""
+    result = await raw_article_service.fetch_raw_article(article_fetch.url)
+    match result:
+        case IOSuccess(Success(raw_article)):
+            return StreamingResponse(
+                _ndjson(article_service.stream_article(raw_article)),
+                media_type="application/x-ndjson",
+            )
+        case IOFailure(Failure(err)):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(err)
+            )
+    raise RuntimeError("unreachable")
+
+
+async def _ndjson(events: AsyncIterator[ArticleEvent]) -> AsyncIterator[str]:
+    try:
+        async for event in events:
+            yield event.model_dump_json(by_alias=True) + "\n"
+    except Exception as err:
+        logger.exception("Article stream failed")
+        yield ArticleErrorEvent(detail=str(err)).model_dump_json(by_alias=True) + "\n"
+
+
+@router.post("/jobs", response_model=TaskResp, status_code=status.HTTP_202_ACCEPTED)
+async def submit_article_job(
+    article_fetch: ArticleReq,
+    task_service: DocumentTaskService = Depends(get_document_task_service),
+):
+    """Queue the article for the background workers and return the task."""
+    task = await task_service.submit(article_fetch.url)
+    return TaskResp.from_task(task)
+
+
+@router.get("/jobs/{task_id}", response_model=TaskResp)
+async def get_article_job(
+    task_id: int,
+    task_service: DocumentTaskService = Depends(get_document_task_service),
+):
+    """Return the task's status; once it has succeeded, ``articleId`` names the
+    article the worker rendered."""
+    match await task_service.get_by_id(task_id):
+        case Some(task):
+            return TaskResp.from_task(task)
+        case _:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+
+@router.get("/jobs/{task_id}/events")
+async def watch_article_job(
+    task_id: int,
+    task_service: DocumentTaskService = Depends(get_document_task_service),
+):
+    """Stream the task as NDJSON each time its status changes, ending once it
+    has succeeded or failed."""
+    match await task_service.get_by_id(task_id):
+        case Some(_):
+            pass
+        case _:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return StreamingResponse(
+        (
+            TaskResp.from_task(task).model_dump_json(by_alias=True) + "\n"
+            async for task in task_service.watch(task_id, SETTINGS.JOB_POLL_INTERVAL)
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.post("/mindmap", response_model=MindmapResp)
 async def translate_word(
     payload: MindmapReq,
@@ -0,0 +1,48 @@
+import asyncio
+
+from db_models.pool import pool_stats
+from fastapi import APIRouter, Depends
+from loguru import logger
+
+from app.core.cpu_pool import CpuPool, get_cpu_pool
+from app.core.intern_cache import intern_cache_stats
+from app.core.single_flight import single_flight_stats
+from app.db.engine import WRITE_QUEUE, engine
+from app.llm.metrics import LLM_METRICS
+from app.llm.scheduler import LLM_SCHEDULER
+from app.nlp.pipeline import language_loader_stats
+from repos import SESSION_STATS
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+# Worker stats wait for a free worker; past this the endpoint answers without them.
+LANGUAGE_STATS_TIMEOUT = 1.0
+
+
+async def _language_model_stats(cpu_pool: CpuPool) -> dict | None:
+    if cpu_pool.workers <= 0:
+        # Without worker processes the models are loaded in this one.
+        return language_loader_stats()
+    try:
+        # Sampled from whichever worker picks the task up.
+        return await asyncio.wait_for(
+            cpu_pool.run(language_loader_stats), LANGUAGE_STATS_TIMEOUT
+        )
+    except Exception as err:
+        logger.warning("Language model stats unavailable: {!r}", err)
+        return None
+
+
+@router.get("")
+async def get_metrics(cpu_pool: CpuPool = Depends(get_cpu_pool)) -> dict:
+    return {
+        "cpu_pool": cpu_pool.stats(),
+        "language_models": await _language_model_stats(cpu_pool),
+        "llm": LLM_METRICS.stats(),
+        "llm_scheduler": LLM_SCHEDULER.stats(),
+        "single_flight": single_flight_stats(),
+        "intern_cache": intern_cache_stats(),
+        "db_pool": pool_stats(engine),
+        "db_sessions": SESSION_STATS.as_dict(),
+        "write_queue": WRITE_QUEUE.stats() if WRITE_QUEUE is not None else None,
+    }
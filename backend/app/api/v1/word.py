@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
 from app.schemas import LookupReq, LookupResp
 from app.services.lookup_service import LookupService, get_lookup_service
@@ -13,3 +14,17 @@ async def translate_word(
     lookup_service: LookupService = Depends(get_lookup_service),
 ):
     return await lookup_service.lookup_word(payload, SETTINGS.LOCALE)
+
+
+@router.post("/lookup/stream")
+async def stream_lookup(
+    payload: list[LookupReq],
+    lookup_service: LookupService = Depends(get_lookup_service),
+):
+    """Stream one NDJSON ``LookupEvent`` per distinct (sentence, word): cache
+    hits first, then LLM results as they complete."""
+    events = lookup_service.stream_lookup(payload, SETTINGS.LOCALE)
+    return StreamingResponse(
+        (event.model_dump_json(by_alias=True) + "\n" async for event in events),
+        media_type="application/x-ndjson",
+    )
@@ -0,0 +1,124 @@
+import asyncio
+import multiprocessing
+from collections.abc import AsyncGenerator, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import ParamSpec, TypeVar
+
+from loguru import logger
+
+from app.core.settings import SETTINGS
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class CpuPool:
+    """Runs CPU-bound callables in worker processes so the event loop stays free.
+
+    With ``workers=0`` tasks fall back to the loop's default thread executor,
+    which keeps the loop responsive but shares the GIL with it.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        initializer: Callable[..., None] | None = None,
+        initargs: tuple = (),
+    ) -> None:
+        self._workers = workers
+        self._initializer = initializer
+        self._initargs = initargs
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def queue_depth(self) -> int:
+        """Tasks submitted but still waiting for a free worker."""
+        return max(0, self._pending - max(self._workers, 1))
+
+    def start(self) -> None:
+        if self._executor is not None or self._workers <= 0:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self._initializer,
+            initargs=self._initargs,
+        )
+        logger.info("Started CPU pool with {} worker process(es)", self._workers)
+
+    async def warm_up(self) -> None:
+        """Start every worker now so the initializer runs before the first task."""
+        self.start()
+        if self._executor is None:
+            if self._initializer is not None:
+                await asyncio.to_thread(self._initializer, *self._initargs)
+            return
+        await asyncio.gather(*(self.run(_noop) for _ in range(self._workers)))
+
+    def shutdown(self) -> None:
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    async def run(self, fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        self.start()
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        try:
+            result = await loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+        except BrokenProcessPool:
+            self._failed += 1
+            # Every task of the broken executor fails at once; the first one
+            # to get here swaps it out and the next run starts a fresh one.
+            if self._executor is executor and executor is not None:
+                logger.error("CPU pool worker died, restarting the pool")
+                self._executor = None
+                # The workers are already gone, so there is nothing to wait
+                # for; waiting would block the event loop.
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+        self._completed += 1
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self._workers,
+            "in_flight": min(self._pending, max(self._workers, 1)),
+            "queue_depth": self.queue_depth,
+            "completed": self._completed,
+            "failed": self._failed,
+        }
+
+
+def _init_worker() -> None:
+    # Imported here so the parent process does not pay for spaCy on import.
+    from app.services.language_loader_service import preload_languages
+
+    preload_languages()
+
+
+def _noop() -> None:
+    pass
+
+
+CPU_POOL = CpuPool(SETTINGS.CPU_POOL_WORKERS, initializer=_init_worker)
+
+
+async def get_cpu_pool() -> AsyncGenerator[CpuPool, None]:
+    yield CPU_POOL
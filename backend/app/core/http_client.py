@@ -0,0 +1,51 @@
+import importlib.util
+from collections.abc import AsyncGenerator
+
+import httpx
+from loguru import logger
+
+from app.core.settings import SETTINGS
+
+
+class SharedHttpClient:
+    """One pooled ``httpx.AsyncClient`` for fetching pages, kept for the
+    lifetime of the process so connections and TLS sessions are reused.
+
+    HTTP/2 is used when requested and the ``h2`` package is installed.
+    """
+
+    def __init__(self, limits: httpx.Limits, timeout: float, http2: bool) -> None:
+        self._limits = limits
+        self._timeout = timeout
+        self._http2 = http2
+        self._client: httpx.AsyncClient | None = None
+
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            http2 = self._http2 and importlib.util.find_spec("h2") is not None
+            if self._http2 and not http2:
+                logger.warning("h2 is not installed, fetching over HTTP/1.1")
+            self._client = httpx.AsyncClient(
+                limits=self._limits, timeout=self._timeout, http2=http2
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+HTTP_CLIENT = SharedHttpClient(
+    limits=httpx.Limits(
+        max_connections=SETTINGS.FETCH_MAX_CONNECTIONS,
+        max_keepalive_connections=SETTINGS.FETCH_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=SETTINGS.FETCH_KEEPALIVE_EXPIRY,
+    ),
+    timeout=SETTINGS.TIMEOUT_TIME,
+    http2=SETTINGS.FETCH_HTTP2,
+)
+
+
+async def get_http_client() -> AsyncGenerator[httpx.AsyncClient, None]:
+    yield HTTP_CLIENT.client()
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from uuid import UUID
+
+from app.core.settings import SETTINGS
+
+
+class InternCache:
+    """Bounded LRU map from interned text (a word or sentence) to its row id.
+
+    Ids never change once a row exists, so entries are never invalidated,
+    only evicted. Every method runs without awaiting, so coroutines on the
+    loop see each lookup and update as one step; two coroutines missing the
+    same text at once both fetch it and store the same id. A ``max_size``
+    of 0 disables the cache.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._ids: OrderedDict[str, UUID] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_many(self, texts: Iterable[str]) -> tuple[dict[str, UUID], list[str]]:
+        """Split ``texts`` into cached ids and the distinct texts still missing."""
+        found: dict[str, UUID] = {}
+        missing: list[str] = []
+        for text in dict.fromkeys(texts):
+            text_id = self._ids.get(text)
+            if text_id is None:
+                missing.append(text)
+            else:
+                self._ids.move_to_end(text)
+                found[text] = text_id
+        self._hits += len(found)
+        self._misses += len(missing)
+        return found, missing
+
+    def put_many(self, ids: Mapping[str, UUID]) -> None:
+        if self._max_size <= 0:
+            return
+        for text, text_id in ids.items():
+            self._ids[text] = text_id
+            self._ids.move_to_end(text)
+        while len(self._ids) > self._max_size:
+            self._ids.popitem(last=False)
+            self._evictions += 1
+
+    async def resolve(
+        self,
+        texts: Iterable[str],
+        fetch: Callable[[list[str]], Awaitable[Mapping[str, UUID]]],
+    ) -> tuple[dict[str, UUID], Mapping[str, UUID]]:
+        """Ids for ``texts``, calling ``fetch`` only for the cache misses.
+
+        Also returns what ``fetch`` returned, which is not cached here: rows
+        it created only exist once their transaction commits, so the caller
+        passes these to :meth:`put_many` after the commit.
+        """
+        found, missing = self.get_many(texts)
+        fetched: Mapping[str, UUID] = {}
+        if missing:
+            fetched = await fetch(missing)
+            found.update(fetched)
+        return found, fetched
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._ids),
+            "max_size": self._max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "evictions": self._evictions,
+        }
+
+
+WORD_IDS = InternCache(SETTINGS.WORD_ID_CACHE_SIZE)
+SENTENCE_IDS = InternCache(SETTINGS.SENTENCE_ID_CACHE_SIZE)
+
+
+def intern_cache_stats() -> dict:
+    return {"words": WORD_IDS.stats(), "sentences": SENTENCE_IDS.stats()}
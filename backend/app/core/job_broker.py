@@ -0,0 +1,39 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+from app.core.redis_client import get_redis_client
+from app.core.settings import SETTINGS
+
+_QUEUE_KEY = "flowlang:jobs:document_process"
+
+
+class JobBroker:
+    """Wakes idle workers when a task is submitted.
+
+    The database stays the source of truth: workers always claim tasks from
+    the task table, the broker only tells them when to look. With Redis each
+    submission pushes onto a list that idle workers block on; without it
+    workers simply poll every ``poll_interval`` seconds.
+    """
+
+    def __init__(self, use_redis: bool, poll_interval: float) -> None:
+        self._use_redis = use_redis
+        self._poll_interval = poll_interval
+
+    async def notify(self, task_id: int) -> None:
+        if self._use_redis:
+            await get_redis_client().lpush(_QUEUE_KEY, task_id)
+
+    async def wait(self) -> None:
+        """Return when a task may be available, or after one poll interval."""
+        if self._use_redis:
+            await get_redis_client().blpop([_QUEUE_KEY], timeout=self._poll_interval)
+        else:
+            await asyncio.sleep(self._poll_interval)
+
+
+JOB_BROKER = JobBroker(bool(SETTINGS.REDIS_URL), SETTINGS.JOB_POLL_INTERVAL)
+
+
+async def get_job_broker() -> AsyncGenerator[JobBroker, None]:
+    yield JOB_BROKER
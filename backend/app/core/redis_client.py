@@ -0,0 +1,22 @@
+from typing import Any
+
+from app.core.settings import SETTINGS
+
+_redis_client: Any = None
+
+
+def get_redis_client() -> Any:
+    global _redis_client
+    if _redis_client is None:
+        # Imported lazily: redis is only needed when REDIS_URL is configured.
+        from redis.asyncio import Redis
+
+        _redis_client = Redis.from_url(SETTINGS.REDIS_URL)
+    return _redis_client
+
+
+async def close_redis() -> None:
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
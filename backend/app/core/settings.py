@@ -7,8 +7,32 @@ load_dotenv(override=True)
 
 class Settings:
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./temp.db")
+    # Per process: the API and every job worker each hold their own pool, so
+    # the database sees up to (JOB_WORKERS + 1) * (size + overflow) connections.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Seconds before a connection is replaced; -1 keeps connections forever.
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    # Prepared statements cached per asyncpg connection; 0 behind PgBouncer.
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    # Connection pragmas applied when DATABASE_URL points at SQLite.
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", str(64 * 1024)))
+    # Most writes committed together by the SQLite writer; 0 lets every
+    # request write on its own.
+    SQLITE_WRITE_BATCH = int(os.getenv("SQLITE_WRITE_BATCH", "64"))
     DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
+    # zstd level for stored article HTML; 0 stores it uncompressed.
+    HTML_COMPRESSION_LEVEL = int(os.getenv("HTML_COMPRESSION_LEVEL", "0"))
     TIMEOUT_TIME = int(os.getenv("TIMEOUT_TIME", "30"))
+    FETCH_MAX_CONNECTIONS = int(os.getenv("FETCH_MAX_CONNECTIONS", "100"))
+    FETCH_MAX_KEEPALIVE_CONNECTIONS = int(
+        os.getenv("FETCH_MAX_KEEPALIVE_CONNECTIONS", "20")
+    )
+    FETCH_KEEPALIVE_EXPIRY = float(os.getenv("FETCH_KEEPALIVE_EXPIRY", "30"))
+    FETCH_HTTP2 = os.getenv("FETCH_HTTP2", "true").lower() == "true"
     ORIGIN_URLS = os.getenv(
         "ORIGIN_URLS",
         "http://localhost|http://localhost:5173|http://127.0.0.1|http://127.0.0.1:5173",
@@ -17,6 +41,50 @@ class Settings:
     MODEL_QUALITY = os.getenv("MODEL_QUALITY", "gpt-5.1")
     MODEL_BALANCED = os.getenv("MODEL_BALANCED", "gpt-5-mini")
     MODEL_SPEED = os.getenv("MODEL_SPEED", "gpt-5-nano")
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+    # Retries of throttled or timed-out calls, each queued again behind the
+    # scheduler's backoff; the provider clients themselves never retry.
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS = int(
+        os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")
+    )
+    LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+    # "model=concurrency,rpm,tpm|..."; empty fields fall back to the defaults above.
+    LLM_MODEL_LIMITS = os.getenv("LLM_MODEL_LIMITS", "")
+    LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+    LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+    LOOKUP_BATCH_TOKEN_BUDGET = int(os.getenv("LOOKUP_BATCH_TOKEN_BUDGET", "1500"))
+    LOOKUP_BATCH_MAX_WORDS = int(os.getenv("LOOKUP_BATCH_MAX_WORDS", "20"))
+    CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", "2"))
+    LANGUAGE_PRELOAD = os.getenv("LANGUAGE_PRELOAD", "")
+    LANGUAGE_WARMUP = os.getenv("LANGUAGE_WARMUP", "true").lower() == "true"
+    LANGUAGE_MEMORY_BUDGET_MB = int(os.getenv("LANGUAGE_MEMORY_BUDGET_MB", "0"))
+    LANGUAGE_IDLE_TTL = float(os.getenv("LANGUAGE_IDLE_TTL", "0"))
+    SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "256"))
+    # Processes per nlp.pipe call; ignored inside worker processes.
+    SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+    ARTICLE_STREAM_CHUNK_BLOCKS = int(os.getenv("ARTICLE_STREAM_CHUNK_BLOCKS", "4"))
+    WORD_ID_CACHE_SIZE = int(os.getenv("WORD_ID_CACHE_SIZE", "100000"))
+    SENTENCE_ID_CACHE_SIZE = int(os.getenv("SENTENCE_ID_CACHE_SIZE", "20000"))
+    # Most frequent words per language to load into the word id cache at startup.
+    WORD_ID_PREWARM = int(os.getenv("WORD_ID_PREWARM", "0"))
+    MINDMAP_CHUNK_TOKENS = int(os.getenv("MINDMAP_CHUNK_TOKENS", "6000"))
+    MINDMAP_PARALLELISM = int(os.getenv("MINDMAP_PARALLELISM", "4"))
+    REDIS_URL = os.getenv("REDIS_URL", "")
+    SINGLE_FLIGHT_LOCK_TTL = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "120"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    # Running tasks older than this are assumed orphaned by a dead worker.
+    JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "600"))
+    # Pause of a worker slot after an unexpected error, e.g. the database
+    # being unreachable, before it polls again.
+    JOB_ERROR_BACKOFF = float(os.getenv("JOB_ERROR_BACKOFF", "1"))
 
 
 SETTINGS = Settings()
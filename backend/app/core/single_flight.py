@@ -0,0 +1,190 @@
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Mapping
+from contextlib import asynccontextmanager
+from typing import Generic, TypeVar
+
+from loguru import logger
+
+from app.core.redis_client import get_redis_client
+from app.core.settings import SETTINGS
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_LOCK_POLL_INTERVAL = 0.1
+
+# Deletes the lock only if it still holds our token, so a lock that expired
+# and was taken over by another worker is left alone.
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _key_name(key: Hashable) -> str:
+    if isinstance(key, tuple):
+        return ":".join(str(part) for part in key)
+    return str(key)
+
+
+class RedisLock:
+    """Best-effort cross-worker lock on a set of keys.
+
+    Keys held by another worker are waited on until they are released or
+    ``ttl`` elapses; after that the caller proceeds anyway, so a crashed
+    worker can at worst cause one duplicate computation.
+    """
+
+    def __init__(self, namespace: str, ttl: float) -> None:
+        self._namespace = namespace
+        self._ttl = ttl
+
+    @asynccontextmanager
+    async def hold(self, keys: list[Hashable]) -> AsyncIterator[None]:
+        client = get_redis_client()
+        token = uuid.uuid4().hex
+        # Every worker takes the locks in the same (sorted) order and waits
+        # for each one before trying the next, so two workers with
+        # overlapping key sets can never each hold a lock the other needs.
+        names = sorted(
+            {f"flowlang:flight:{self._namespace}:{_key_name(key)}" for key in keys}
+        )
+        held: list[str] = []
+        deadline = time.monotonic() + self._ttl
+        try:
+            for name in names:
+                while not await client.set(
+                    name, token, nx=True, px=int(self._ttl * 1000)
+                ):
+                    if time.monotonic() >= deadline:
+                        break
+                    await asyncio.sleep(_LOCK_POLL_INTERVAL)
+                else:
+                    held.append(name)
+                    continue
+                break
+            if len(held) < len(names):
+                logger.warning(
+                    "Timed out waiting for {} {} lock(s), continuing without them",
+                    len(names) - len(held),
+                    self._namespace,
+                )
+            yield
+        finally:
+            for name in held:
+                await client.eval(_RELEASE_SCRIPT, 1, name, token)
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesces concurrent calls for the same keys into one shared task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    in flight await the same task instead of repeating it. The task is
+    shielded, so a caller that disconnects does not cancel the work for the
+    others. Results are not kept once the task finishes; the caller's own
+    cache (usually the database) serves later requests.
+    """
+
+    def __init__(self, name: str, lock: RedisLock | None = None) -> None:
+        self._name = name
+        self._lock = lock
+        self._flights: dict[K, asyncio.Future[Mapping[K, V]]] = {}
+        self._led = 0
+        self._joined = 0
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        """Resolve ``key`` with ``fn`` unless it is already in flight.
+
+        Raises ``KeyError`` when the flight joined was started by
+        :meth:`do_many` and could not resolve ``key``.
+        """
+
+        async def run(_: list[K]) -> Mapping[K, V]:
+            return {key: await fn()}
+
+        return (await self._join([key], run))[key][key]
+
+    async def do_many(
+        self,
+        keys: list[K],
+        fn: Callable[[list[K]], Awaitable[Mapping[K, V]]],
+    ) -> dict[K, V | None]:
+        """Resolve ``keys``, calling ``fn`` once for the keys not already in flight.
+
+        ``fn`` receives the keys this caller leads and returns a value for
+        each key it could resolve; keys missing from its result map to None.
+        """
+        results = await self._join(keys, fn)
+        return {key: result.get(key) for key, result in results.items()}
+
+    async def _join(
+        self,
+        keys: list[K],
+        fn: Callable[[list[K]], Awaitable[Mapping[K, V]]],
+    ) -> dict[K, Mapping[K, V]]:
+        """The result of the flight resolving each of ``keys``."""
+        flights: dict[K, asyncio.Future[Mapping[K, V]]] = {}
+        leading: list[K] = []
+        for key in dict.fromkeys(keys):
+            flight = self._flights.get(key)
+            if flight is None:
+                leading.append(key)
+            else:
+                flights[key] = flight
+        self._joined += len(flights)
+
+        if leading:
+            flight = asyncio.ensure_future(self._run(leading, fn))
+            for key in leading:
+                self._flights[key] = flight
+                flights[key] = flight
+            flight.add_done_callback(lambda done: self._land(leading, done))
+            self._led += len(leading)
+
+        unique = list(dict.fromkeys(flights.values()))
+        results = await asyncio.gather(*(asyncio.shield(flight) for flight in unique))
+        by_flight = dict(zip(unique, results))
+        return {key: by_flight[flight] for key, flight in flights.items()}
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "led": self._led,
+            "joined": self._joined,
+        }
+
+    async def _run(
+        self, keys: list[K], fn: Callable[[list[K]], Awaitable[Mapping[K, V]]]
+    ) -> Mapping[K, V]:
+        if self._lock is None:
+            return await fn(keys)
+        async with self._lock.hold(list(keys)):
+            return await fn(keys)
+
+    def _land(self, keys: list[K], flight: asyncio.Future) -> None:
+        for key in keys:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        # Mark the exception as retrieved even if every caller went away.
+        if not flight.cancelled():
+            flight.exception()
+
+
+_GROUPS: dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str) -> SingleFlight:
+    """Build a single-flight group, backed by a Redis lock when REDIS_URL is set."""
+    lock = (
+        RedisLock(name, SETTINGS.SINGLE_FLIGHT_LOCK_TTL) if SETTINGS.REDIS_URL else None
+    )
+    group = _GROUPS[name] = SingleFlight(name, lock)
+    return group
+
+
+def single_flight_stats() -> dict:
+    return {name: group.stats() for name, group in _GROUPS.items()}
@@ -0,0 +1,7 @@
+def estimate_tokens(text: str) -> int:
+    """Rough token count at ~3 UTF-8 bytes per token.
+
+    That is one token per CJK char and a slight overestimate for Latin
+    text, which averages closer to 4 bytes per token.
+    """
+    return len(text.encode()) // 3 + 1
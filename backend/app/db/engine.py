@@ -1,17 +1,49 @@
 from typing import AsyncIterable
 
+from db_models.compressed_text import set_html_compression
+from db_models.pool import pool_options
+from db_models.sqlite import configure_sqlite, is_sqlite
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core import SETTINGS
+from repos import WriteQueue, serialize_writes
 
 engine = create_async_engine(
     SETTINGS.DATABASE_URL,
     echo=SETTINGS.DEBUG_MODE,
     pool_pre_ping=True,
+    **pool_options(
+        SETTINGS.DATABASE_URL,
+        pool_size=SETTINGS.DB_POOL_SIZE,
+        max_overflow=SETTINGS.DB_MAX_OVERFLOW,
+        pool_timeout=SETTINGS.DB_POOL_TIMEOUT,
+        pool_recycle=SETTINGS.DB_POOL_RECYCLE,
+        statement_cache_size=SETTINGS.DB_STATEMENT_CACHE_SIZE,
+    ),
 )
 
+set_html_compression(SETTINGS.HTML_COMPRESSION_LEVEL)
+
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
+# SQLite allows one writer at a time, so writes queue inside the process
+# rather than contending for the lock.
+WRITE_QUEUE: WriteQueue | None = None
+if is_sqlite(SETTINGS.DATABASE_URL):
+    configure_sqlite(
+        engine,
+        busy_timeout_ms=SETTINGS.SQLITE_BUSY_TIMEOUT_MS,
+        mmap_size=SETTINGS.SQLITE_MMAP_SIZE,
+        cache_size_kib=SETTINGS.SQLITE_CACHE_SIZE_KIB,
+    )
+    if SETTINGS.SQLITE_WRITE_BATCH > 0:
+        WRITE_QUEUE = serialize_writes(AsyncSessionLocal, SETTINGS.SQLITE_WRITE_BATCH)
+
 
 async def get_async_session_maker() -> AsyncIterable[async_sessionmaker[AsyncSession]]:
     yield AsyncSessionLocal
+
+
+async def close_write_queue() -> None:
+    if WRITE_QUEUE is not None:
+        await WRITE_QUEUE.aclose()
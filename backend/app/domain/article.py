@@ -1,17 +1,104 @@
 import json
+from dataclasses import dataclass
 from functools import cached_property
 
 from bs4 import BeautifulSoup
 from langdetect import detect
-from trafilatura import extract
+from trafilatura import bare_extraction, extract
+from trafilatura.deduplication import content_fingerprint
+from trafilatura.htmlprocessing import build_html_output
+from trafilatura.settings import Document
+
+
+@dataclass(frozen=True)
+class _Extraction:
+    full_html: str
+    plain_text: str
+    content: str
+    metadata: dict
+
+
+def _extract_single_pass(raw_html: str) -> _Extraction:
+    """Run trafilatura once and derive every view of the article from its output.
+
+    Produces the same values as the per-property ``extract`` calls: the HTML
+    body of ``output_format="html"`` and the metadata keys of
+    ``output_format="json"``.
+    """
+    document = bare_extraction(
+        raw_html,
+        output_format="html",
+        include_formatting=True,
+        include_links=False,
+        include_images=False,
+        with_metadata=True,
+        include_comments=False,
+        include_tables=False,
+        as_dict=False,
+    )
+    # None when extraction fails; never a dict, since as_dict is False.
+    if not isinstance(document, Document):
+        raise ValueError("Failed to extract HTML content from raw input.")
+
+    document.fingerprint = content_fingerprint(
+        str(document.title) + " " + str(document.raw_text)
+    )
+    full_html = build_html_output(document)
+
+    soup = BeautifulSoup(full_html, "lxml")
+    plain_text = soup.get_text(separator="\n", strip=True)
+
+    body = soup.body
+    if body is None:
+        raise ValueError("Failed to extract HTML content from raw input.")
+
+    first_h1 = body.find("h1")
+    if first_h1:
+        first_h1.decompose()
+
+    metadata = {
+        slot: getattr(document, slot, None)
+        for slot in document.__slots__
+        if slot not in {"body", "commentsbody", "comments", "raw_text", "text"}
+    }
+    metadata.update(
+        {
+            "source": metadata.pop("url"),
+            "source-hostname": metadata.pop("sitename"),
+            "excerpt": metadata.pop("description"),
+            "categories": ";".join(metadata.pop("categories") or []),
+            "tags": ";".join(metadata.pop("tags") or []),
+        }
+    )
+
+    return _Extraction(
+        full_html=full_html,
+        plain_text=plain_text,
+        content=str(soup),
+        metadata=metadata,
+    )
 
 
 class Article:
-    def __init__(self, raw_html: str) -> None:
+    """Readable content and metadata of a raw HTML page.
+
+    By default the page goes through trafilatura once and every property is
+    derived from that single extraction. ``single_pass=False`` keeps the
+    original per-property extraction, mainly for comparison in benchmarks.
+    """
+
+    def __init__(self, raw_html: str, single_pass: bool = True) -> None:
         self.__raw_html = raw_html
+        self.__single_pass = single_pass
+
+    @cached_property
+    def __extraction(self) -> _Extraction:
+        return _extract_single_pass(self.__raw_html)
 
     @cached_property
     def full_html(self) -> str:
+        if self.__single_pass:
+            return self.__extraction.full_html
         if (
             result := extract(
                 self.__raw_html,
@@ -29,12 +116,16 @@ class Article:
 
     @cached_property
     def plain_text(self) -> str:
+        if self.__single_pass:
+            return self.__extraction.plain_text
         return BeautifulSoup(self.full_html, "lxml").get_text(
             separator="\n", strip=True
         )
 
     @cached_property
     def content(self) -> str:
+        if self.__single_pass:
+            return self.__extraction.content
         soup = BeautifulSoup(
             str(
                 self.full_html,
@@ -61,6 +152,8 @@ class Article:
 
     @cached_property
     def metadata(self) -> dict:
+        if self.__single_pass:
+            return self.__extraction.metadata
         if (
             result := extract(
                 self.__raw_html,
@@ -1,40 +1,176 @@
+import json
+import time
+from typing import Any, Type, TypeVar
+
+import httpx
 from langchain.chat_models import init_chat_model
-from typing import TypeVar, Type
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from loguru import logger
 from pydantic import BaseModel
 
+from app.core.settings import SETTINGS
+from app.core.tokens import estimate_tokens
+from app.llm.metrics import LLM_METRICS
+from app.llm.scheduler import LLM_SCHEDULER, Priority, is_retryable
+
 T = TypeVar("T", bound=BaseModel)
+R = TypeVar("R")
+
+_OPENAI_PROVIDERS = {"openai", "azure_openai"}
+_OPENAI_MODEL_PREFIXES = ("gpt-", "o1", "o3", "o4", "chatgpt")
+
+
+class ChatModelRegistry:
+    """Caches chat models per model name and kwargs.
+
+    Structured-output wrappers are cached per response model as well. OpenAI
+    models share one pooled ``httpx.AsyncClient``, so keep-alive connections
+    and TLS sessions are reused across calls instead of being rebuilt for
+    every prompt.
+    """
+
+    def __init__(
+        self,
+        limits: httpx.Limits,
+        timeout: float,
+        max_retries: int,
+    ) -> None:
+        self._limits = limits
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._http_client: httpx.AsyncClient | None = None
+        self._models: dict[tuple[str, str], BaseChatModel] = {}
+        self._structured: dict[tuple[str, str, type], Runnable] = {}
+
+    def model(self, model_name: str, **kargs) -> BaseChatModel:
+        key = (model_name, _kwargs_key(kargs))
+        if key not in self._models:
+            kargs.setdefault("timeout", self._timeout)
+            kargs.setdefault("max_retries", self._max_retries)
+            if _uses_openai_client(model_name, kargs):
+                kargs.setdefault("http_async_client", self._async_client())
+            self._models[key] = init_chat_model(model_name, **kargs)
+        return self._models[key]
+
+    def structured(
+        self, model_name: str, response_model: Type[T], **kargs
+    ) -> Runnable[Any, T]:
+        key = (model_name, _kwargs_key(kargs), response_model)
+        if key not in self._structured:
+            model = self.model(model_name, **kargs)
+            self._structured[key] = model.with_structured_output(response_model)
+        return self._structured[key]
+
+    async def aclose(self) -> None:
+        self._models.clear()
+        self._structured.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def _async_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                limits=self._limits, timeout=self._timeout
+            )
+        return self._http_client
+
+
+def _kwargs_key(kargs: dict) -> str:
+    return json.dumps(kargs, sort_keys=True, default=repr)
 
 
-async def invoke_model(model_name: str, conversation: list[dict], **kargs):
-    model = init_chat_model(model_name, **kargs)
-    return (await model.ainvoke(conversation)).content
+def _uses_openai_client(model_name: str, kargs: dict) -> bool:
+    provider = kargs.get("model_provider")
+    if provider is None and ":" in model_name:
+        provider = model_name.split(":", maxsplit=1)[0]
+    if provider is None and model_name.lower().startswith(_OPENAI_MODEL_PREFIXES):
+        provider = "openai"
+    return provider in _OPENAI_PROVIDERS
+
+
+CHAT_MODELS = ChatModelRegistry(
+    limits=httpx.Limits(
+        max_connections=SETTINGS.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=SETTINGS.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=SETTINGS.LLM_KEEPALIVE_EXPIRY,
+    ),
+    timeout=SETTINGS.LLM_TIMEOUT,
+    # Retried in _invoke instead, so that throttling reaches the scheduler.
+    max_retries=0,
+)
+
+
+async def _invoke(
+    model_name: str,
+    runnable: Runnable[Any, R],
+    conversation: list[dict],
+    priority: Priority,
+) -> R:
+    tokens = sum(estimate_tokens(str(message["content"])) for message in conversation)
+    # Throttled and timed-out calls are retried through the scheduler, which
+    # shrinks the model's concurrency and pauses its queue in between.
+    for attempt in range(SETTINGS.LLM_MAX_RETRIES + 1):
+        try:
+            async with LLM_SCHEDULER.slot(model_name, tokens, priority):
+                start = time.perf_counter()
+                ok = False
+                try:
+                    result = await runnable.ainvoke(conversation)
+                    ok = True
+                    return result
+                finally:
+                    LLM_METRICS.record_call(model_name, time.perf_counter() - start, ok)
+        except Exception as error:
+            if attempt == SETTINGS.LLM_MAX_RETRIES or not is_retryable(error):
+                raise
+            logger.info(
+                "Retrying {} call after {} (attempt {} of {})",
+                model_name,
+                type(error).__name__,
+                attempt + 2,
+                SETTINGS.LLM_MAX_RETRIES + 1,
+            )
+    raise AssertionError("unreachable")
+
+
+async def invoke_model(
+    model_name: str,
+    conversation: list[dict],
+    priority: Priority = Priority.INTERACTIVE,
+    **kargs,
+):
+    model = CHAT_MODELS.model(model_name, **kargs)
+    return (await _invoke(model_name, model, conversation, priority)).content
 
 
 async def invoke_prompts(
     model_name: str,
     system_prompt: str,
     user_prompt: str,
+    priority: Priority = Priority.INTERACTIVE,
     **kargs,
 ):
-    model = init_chat_model(model_name, **kargs)
+    model = CHAT_MODELS.model(model_name, **kargs)
 
     conversation = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt},
     ]
 
-    return (await model.ainvoke(conversation)).content
+    return (await _invoke(model_name, model, conversation, priority)).content
 
 
 async def invoke_model_structured(
     model_name: str,
     conversation: list[dict],
     response_model: Type[T],
+    priority: Priority = Priority.INTERACTIVE,
     **kargs,
 ) -> T:
-    model = init_chat_model(model_name, **kargs)
-    structured_model = model.with_structured_output(response_model)
-    return await structured_model.ainvoke(conversation)
+    structured_model = CHAT_MODELS.structured(model_name, response_model, **kargs)
+    return await _invoke(model_name, structured_model, conversation, priority)
 
 
 async def invoke_prompts_structured(
@@ -42,14 +178,14 @@ async def invoke_prompts_structured(
     system_prompt: str,
     user_prompt: str,
     response_model: Type[T],
+    priority: Priority = Priority.INTERACTIVE,
     **kargs,
 ) -> T:
-    model = init_chat_model(model_name, **kargs)
-    structured_model = model.with_structured_output(response_model)
+    structured_model = CHAT_MODELS.structured(model_name, response_model, **kargs)
 
     conversation = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt},
     ]
 
-    return await structured_model.ainvoke(conversation)
+    return await _invoke(model_name, structured_model, conversation, priority)
@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class _CallStats:
+    calls: int = 0
+    failures: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    first_seconds: float = 0.0
+    last_seconds: float = 0.0
+
+
+class LlmMetrics:
+    """Per-model latency of LLM calls.
+
+    ``first_ms`` is the latency of the first call, which includes connection
+    setup; compare it with ``avg_ms`` to see what reused connections save.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _CallStats] = {}
+
+    def record_call(self, model_name: str, seconds: float, ok: bool) -> None:
+        stats = self._calls.setdefault(model_name, _CallStats())
+        if stats.calls == 0:
+            stats.first_seconds = seconds
+        stats.calls += 1
+        stats.failures += 0 if ok else 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        stats.last_seconds = seconds
+
+    def stats(self) -> dict:
+        return {
+            model_name: {
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "avg_ms": stats.total_seconds / stats.calls * 1000,
+                "max_ms": stats.max_seconds * 1000,
+                "first_ms": stats.first_seconds * 1000,
+                "last_ms": stats.last_seconds * 1000,
+            }
+            for model_name, stats in self._calls.items()
+        }
+
+
+LLM_METRICS = LlmMetrics()
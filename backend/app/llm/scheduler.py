@@ -0,0 +1,314 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+import httpx
+from loguru import logger
+
+from app.core.settings import SETTINGS
+
+
+class Priority(IntEnum):
+    """Dispatch order within a model's queue; lower values go first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    concurrency: int
+    requests_per_minute: float = 0
+    tokens_per_minute: float = 0
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units per minute, holding at most one minute's worth.
+
+    A rate of 0 disables the bucket.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self._capacity = per_minute
+        self._rate = per_minute / 60
+        self._level = per_minute
+        self._updated = time.monotonic()
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken."""
+        if self._rate <= 0:
+            return 0.0
+        self._refill()
+        # Requests larger than the bucket wait for a full bucket, not forever.
+        amount = min(amount, self._capacity)
+        return max(0.0, (amount - self._level) / self._rate)
+
+    def take(self, amount: float) -> None:
+        if self._rate <= 0:
+            return
+        self._refill()
+        self._level -= min(amount, self._capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(
+            self._capacity, self._level + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+@dataclass
+class _WaitStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class _ModelQueue:
+    def __init__(self, limits: ModelLimits) -> None:
+        self.limits = limits
+        # Current cap; shrinks on throttling and grows back one step at a time.
+        self.limit = limits.concurrency
+        self.in_flight = 0
+        self.waiters: list[_Waiter] = []
+        self.requests = TokenBucket(limits.requests_per_minute)
+        self.tokens = TokenBucket(limits.tokens_per_minute)
+        self.paused_until = 0.0
+        self.backoff = 0.0
+        self.successes = 0
+        self.timer: asyncio.TimerHandle | None = None
+        self.throttled = 0
+        self.timeouts = 0
+        self.waits = {priority: _WaitStats() for priority in Priority}
+
+
+class LlmScheduler:
+    """Admits LLM calls per model under concurrency and rate limits.
+
+    Each model has its own queue, served in priority order: a call starts
+    once the model has a free slot and its requests-per-minute and
+    tokens-per-minute buckets can cover it. A 429 or timeout halves the
+    model's concurrency cap and pauses its queue with exponential backoff
+    (or the provider's Retry-After); successful calls restore the cap.
+    """
+
+    def __init__(
+        self,
+        default_limits: ModelLimits,
+        model_limits: dict[str, ModelLimits],
+        backoff_base: float,
+        backoff_max: float,
+    ) -> None:
+        self._default_limits = default_limits
+        self._model_limits = model_limits
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._queues: dict[str, _ModelQueue] = {}
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def slot(
+        self, model_name: str, tokens: int, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[None]:
+        queue = self._queue(model_name)
+        await self._acquire(queue, tokens, priority)
+        try:
+            yield
+        except BaseException as error:
+            self._release(queue, error)
+            raise
+        self._release(queue, None)
+
+    def stats(self) -> dict:
+        return {
+            model_name: {
+                "limit": queue.limit,
+                "max_limit": queue.limits.concurrency,
+                "in_flight": queue.in_flight,
+                "queued": sum(not w.future.done() for w in queue.waiters),
+                "throttled": queue.throttled,
+                "timeouts": queue.timeouts,
+                "paused_ms": max(0.0, queue.paused_until - time.monotonic()) * 1000,
+                "queue_wait": {
+                    priority.name.lower(): {
+                        "count": wait.count,
+                        "avg_ms": wait.total_seconds / wait.count * 1000
+                        if wait.count
+                        else 0.0,
+                        "max_ms": wait.max_seconds * 1000,
+                    }
+                    for priority, wait in queue.waits.items()
+                },
+            }
+            for model_name, queue in self._queues.items()
+        }
+
+    def _queue(self, model_name: str) -> _ModelQueue:
+        if model_name not in self._queues:
+            limits = self._model_limits.get(model_name, self._default_limits)
+            self._queues[model_name] = _ModelQueue(limits)
+        return self._queues[model_name]
+
+    async def _acquire(
+        self, queue: _ModelQueue, tokens: int, priority: Priority
+    ) -> None:
+        waiter = _Waiter(
+            priority=priority,
+            seq=next(self._seq),
+            tokens=tokens,
+            enqueued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(queue.waiters, waiter)
+        self._pump(queue)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # Granted and cancelled in the same tick: hand the slot back.
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(queue, None)
+            raise
+
+    def _release(self, queue: _ModelQueue, error: BaseException | None) -> None:
+        queue.in_flight -= 1
+        if error is None:
+            queue.successes += 1
+            queue.backoff = 0.0
+            if queue.successes >= queue.limit:
+                queue.limit = min(queue.limits.concurrency, queue.limit + 1)
+                queue.successes = 0
+        elif _is_throttled(error) or _is_timeout(error):
+            if _is_throttled(error):
+                queue.throttled += 1
+            else:
+                queue.timeouts += 1
+            queue.limit = max(1, queue.limit // 2)
+            queue.successes = 0
+            queue.backoff = min(
+                self._backoff_max, max(self._backoff_base, queue.backoff * 2)
+            )
+            pause = _retry_after(error) or queue.backoff
+            queue.paused_until = max(queue.paused_until, time.monotonic() + pause)
+            logger.warning(
+                "LLM call {} ({}); limit now {}, pausing {:.1f}s",
+                "throttled" if _is_throttled(error) else "timed out",
+                type(error).__name__,
+                queue.limit,
+                pause,
+            )
+        self._pump(queue)
+
+    def _pump(self, queue: _ModelQueue) -> None:
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+
+        while queue.waiters:
+            head = queue.waiters[0]
+            if head.future.done():
+                heapq.heappop(queue.waiters)
+                continue
+            if queue.in_flight >= queue.limit:
+                return
+
+            now = time.monotonic()
+            delay = max(
+                queue.paused_until - now,
+                queue.requests.delay(1),
+                queue.tokens.delay(head.tokens),
+            )
+            if delay > 0:
+                queue.timer = asyncio.get_running_loop().call_later(
+                    delay, self._pump, queue
+                )
+                return
+
+            heapq.heappop(queue.waiters)
+            queue.requests.take(1)
+            queue.tokens.take(head.tokens)
+            queue.in_flight += 1
+            wait = queue.waits[Priority(head.priority)]
+            wait.count += 1
+            wait.total_seconds += now - head.enqueued_at
+            wait.max_seconds = max(wait.max_seconds, now - head.enqueued_at)
+            head.future.set_result(None)
+
+
+def _status_code(error: BaseException) -> int | None:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    return getattr(error, "status_code", None)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether ``error`` is throttling or a timeout, which the scheduler backs
+    off from before the call is retried."""
+    return _is_throttled(error) or _is_timeout(error)
+
+
+def _is_throttled(error: BaseException) -> bool:
+    return _status_code(error) == 429
+
+
+def _is_timeout(error: BaseException) -> bool:
+    # openai.APITimeoutError does not subclass TimeoutError.
+    return isinstance(error, (TimeoutError, httpx.TimeoutException)) or (
+        type(error).__name__ == "APITimeoutError"
+    )
+
+
+def _retry_after(error: BaseException) -> float | None:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+def parse_model_limits(spec: str, default: ModelLimits) -> dict[str, ModelLimits]:
+    """Parse ``"model=concurrency,rpm,tpm|..."``; omitted fields use ``default``."""
+    limits: dict[str, ModelLimits] = {}
+    for entry in filter(None, spec.split("|")):
+        model_name, _, values = entry.partition("=")
+        fields = [float(v) if v else None for v in values.split(",")]
+        fields += [None] * (3 - len(fields))
+        concurrency, rpm, tpm = fields[:3]
+        limits[model_name.strip()] = ModelLimits(
+            concurrency=int(concurrency)
+            if concurrency is not None
+            else default.concurrency,
+            requests_per_minute=rpm if rpm is not None else default.requests_per_minute,
+            tokens_per_minute=tpm if tpm is not None else default.tokens_per_minute,
+        )
+    return limits
+
+
+_DEFAULT_LIMITS = ModelLimits(
+    concurrency=SETTINGS.LLM_MAX_CONCURRENCY,
+    requests_per_minute=SETTINGS.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=SETTINGS.LLM_TOKENS_PER_MINUTE,
+)
+
+LLM_SCHEDULER = LlmScheduler(
+    default_limits=_DEFAULT_LIMITS,
+    model_limits=parse_model_limits(SETTINGS.LLM_MODEL_LIMITS, _DEFAULT_LIMITS),
+    backoff_base=SETTINGS.LLM_BACKOFF_BASE,
+    backoff_max=SETTINGS.LLM_BACKOFF_MAX,
+)
@@ -3,4 +3,15 @@ from pydantic import BaseModel, Field
 
 class MindNode(BaseModel):
     text: str = Field(..., description="Text content of this node")
-    children: list["MindNode"] = Field(default_factory=list, description="Child nodes")
\ No newline at end of file
+    children: list["MindNode"] = Field(default_factory=list, description="Child nodes")
+
+
+class WordTranslation(BaseModel):
+    index: int = Field(..., description="Number of the word in the request")
+    translation: str = Field(..., description="Translation of the word in context")
+
+
+class WordTranslations(BaseModel):
+    translations: list[WordTranslation] = Field(
+        default_factory=list, description="One translation per requested word"
+    )
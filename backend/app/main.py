@@ -1,18 +1,39 @@
-import spacy
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import APIRouter, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1 import article, word
+from app.api.v1 import article, metrics, word
+from app.core.cpu_pool import CPU_POOL
+from app.core.http_client import HTTP_CLIENT
+from app.core.redis_client import close_redis
 from app.core.settings import SETTINGS
+from app.db.engine import AsyncSessionLocal, close_write_queue
+from app.llm.client import CHAT_MODELS
 from app.middlewares.exception_handler import http_exception_handler
+from app.services.article_service import prewarm_word_ids
+from repos.word_repo import WordRepository
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await CPU_POOL.warm_up()
+    if SETTINGS.WORD_ID_PREWARM:
+        await prewarm_word_ids(
+            WordRepository(AsyncSessionLocal), SETTINGS.WORD_ID_PREWARM
+        )
+    try:
+        yield
+    finally:
+        CPU_POOL.shutdown()
+        await CHAT_MODELS.aclose()
+        await HTTP_CLIENT.aclose()
+        await close_redis()
+        await close_write_queue()
 
-LANGUAGE_MODEL = {
-    "en": spacy.load("en_core_web_lg"),
-    "zh": spacy.load("zh_core_web_lg"),
-    "ja": spacy.load("ja_core_news_lg"),
-}
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.exception_handler(HTTPException)(http_exception_handler)
 
@@ -27,5 +48,6 @@ app.add_middleware(
 v1_router = APIRouter(prefix="/v1")
 v1_router.include_router(article.router)
 v1_router.include_router(word.router)
+v1_router.include_router(metrics.router)
 
 app.include_router(v1_router)
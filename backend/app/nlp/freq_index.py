@@ -0,0 +1,156 @@
+"""Precomputed lemma frequency index used for hard-word detection.
+
+The index is the ``word``/``log_score`` table of a frequency parquet file,
+deduplicated and sorted by word, stored as an uncompressed Arrow IPC file.
+Opening it memory-maps the file, so every worker process shares the same page
+cache, and lookups binary-search the sorted words instead of scanning the
+whole table.
+
+Build the index files next to the parquet sources with::
+
+    python -m app.nlp.freq_index [language ...]
+
+Each index records the SHA-256 of the parquet file it was built from in a
+``.sha256`` file beside it; an index whose source has changed since is
+ignored until it is rebuilt.
+"""
+
+import argparse
+import hashlib
+from collections.abc import Iterable
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+
+class FrequencyIndex:
+    def __init__(self, frame: pl.DataFrame) -> None:
+        self._words = frame.get_column("word")
+        self._log_scores = frame.get_column("log_score")
+
+    @classmethod
+    def from_frequencies(cls, word_freq: pl.DataFrame) -> "FrequencyIndex":
+        return cls(_prepare(word_freq))
+
+    @classmethod
+    def open(cls, path: str | Path) -> "FrequencyIndex":
+        return cls(pl.read_ipc(path, memory_map=True))
+
+    @classmethod
+    def load(cls, freq_path: str | Path) -> "FrequencyIndex":
+        """Open the prebuilt index for ``freq_path``, or build it in memory
+        when there is none or it was built from a different parquet file."""
+        path = index_path(freq_path)
+        if not path.exists():
+            logger.warning(
+                "No frequency index at {}, building it in memory from {}",
+                path,
+                freq_path,
+            )
+        elif _read_source_digest(path) != file_digest(freq_path):
+            logger.warning(
+                "Frequency index {} is stale for {}, building it in memory; "
+                "rebuild it with python -m app.nlp.freq_index",
+                path,
+                freq_path,
+            )
+        else:
+            return cls.open(path)
+        return cls.from_frequencies(pl.read_parquet(freq_path))
+
+    def estimated_size(self) -> int:
+        return int(self._words.estimated_size() + self._log_scores.estimated_size())
+
+    def lookup(self, words: Iterable[str]) -> pl.DataFrame:
+        """Return the ``word``/``log_score`` rows of the distinct known words."""
+        queries = pl.Series("word", list(words), dtype=pl.String).unique()
+        if queries.is_empty() or self._words.is_empty():
+            return pl.DataFrame(
+                schema={"word": pl.String, "log_score": self._log_scores.dtype}
+            )
+
+        positions = self._words.search_sorted(queries).clip(
+            upper_bound=self._words.len() - 1
+        )
+        found = self._words.gather(positions) == queries
+        return pl.DataFrame(
+            {
+                "word": queries.filter(found),
+                "log_score": self._log_scores.gather(positions).filter(found),
+            }
+        )
+
+
+def most_frequent_words(freq_path: str | Path, n: int) -> list[str]:
+    """The ``n`` most common words of a frequency parquet file (lowest
+    ``log_score`` first)."""
+    return (
+        pl.scan_parquet(freq_path)
+        .select("word", "log_score")
+        .drop_nulls("word")
+        .bottom_k(n, by="log_score")
+        .sort("log_score")
+        .collect()
+        .get_column("word")
+        .to_list()
+    )
+
+
+def index_path(freq_path: str | Path) -> Path:
+    return Path(freq_path).with_suffix(".arrow")
+
+
+def file_digest(path: str | Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def build_index(freq_path: str | Path) -> Path:
+    path = index_path(freq_path)
+    _prepare(pl.read_parquet(freq_path)).write_ipc(path, compression="uncompressed")
+    _digest_path(path).write_text(file_digest(freq_path) + "\n")
+    return path
+
+
+def _digest_path(path: Path) -> Path:
+    return path.with_name(path.name + ".sha256")
+
+
+def _read_source_digest(path: Path) -> str | None:
+    try:
+        return _digest_path(path).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _prepare(word_freq: pl.DataFrame) -> pl.DataFrame:
+    return (
+        word_freq.select("word", "log_score")
+        .drop_nulls("word")
+        .unique(subset="word", keep="first", maintain_order=True)
+        .sort("word")
+    )
+
+
+def main() -> None:
+    from app.services.language_loader_service import LANGUAGE_RESOURCES
+
+    parser = argparse.ArgumentParser(description="Build lemma frequency indexes.")
+    parser.add_argument(
+        "languages",
+        nargs="*",
+        metavar="language",
+        help=f"one of {', '.join(LANGUAGE_RESOURCES)} (default: all)",
+    )
+    args = parser.parse_args()
+    if unknown := [name for name in args.languages if name not in LANGUAGE_RESOURCES]:
+        parser.error(f"unknown language(s): {', '.join(unknown)}")
+
+    for language in args.languages or LANGUAGE_RESOURCES:
+        freq_path = LANGUAGE_RESOURCES[language].freq_path
+        logger.info("Built {} index at {}", language, build_index(freq_path))
+
+
+if __name__ == "__main__":
+    main()
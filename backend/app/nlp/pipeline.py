@@ -0,0 +1,455 @@
+"""CPU-bound article stages, written as plain functions so they can run in
+worker processes of :class:`app.core.cpu_pool.CpuPool`.
+
+An article is handled in two steps around the database interning done on the
+event loop: :func:`analyze_article` extracts and tokenizes the document, and
+:func:`render_article` writes the resolved sentence and word ids back into the
+HTML.
+
+Both steps work on the top-level blocks of the extracted content, and the
+rendered article is the concatenation of its rendered blocks. The streaming
+endpoint drives the same steps block by block through
+:func:`extract_outline`, :func:`analyze_blocks`, :func:`hard_word_threshold`
+and :func:`render_blocks`. It sets the hard-word threshold from the leading
+:data:`HARD_WORD_SAMPLE_TOKENS` lemmas instead of the whole article, so its
+renderings are cached under their own :func:`rendering_version`.
+"""
+
+import hashlib
+import multiprocessing
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from itertools import islice
+
+import polars as pl
+from bs4 import BeautifulSoup, Tag
+from bs4.element import Comment, Doctype, NavigableString, PageElement
+from langdetect import detect
+from spacy.tokens.span import Span
+from spacy.tokens.token import Token
+
+from app.core.settings import SETTINGS
+from app.core.tokens import estimate_tokens
+from app.domain import Article
+from app.nlp.word import lemma_of_word
+from app.services.language_loader_service import LANGUAGE_LOADER, LANGUAGE_RESOURCES
+
+# Bump whenever analyze_article or render_article change their output, so
+# that cached renderings are rebuilt.
+RENDERER_VERSION = "3"
+
+# Number of leading tokens whose lemma frequencies set the hard-word
+# threshold of a streamed article; a fixed prefix lets blocks be rendered
+# before the rest of the article has been tokenized.
+HARD_WORD_SAMPLE_TOKENS = 2000
+
+
+@dataclass(frozen=True)
+class TokenPlan:
+    text: str
+    whitespace: str
+    is_word: bool
+    lemma: str
+
+
+@dataclass(frozen=True)
+class SentencePlan:
+    text: str
+    tokens: tuple[TokenPlan, ...]
+
+    @property
+    def has_word(self) -> bool:
+        return any(token.is_word for token in self.tokens)
+
+
+@dataclass(frozen=True)
+class BlockPlan:
+    html: str
+    text_nodes: tuple[tuple[SentencePlan, ...], ...]
+
+
+@dataclass(frozen=True)
+class ArticleOutline:
+    title: str
+    author: str
+    language: str
+    blocks: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ArticleAnalysis:
+    title: str
+    author: str
+    language: str
+    blocks: tuple[BlockPlan, ...]
+    hard_word_threshold: float | None
+
+    def sentence_texts(self) -> list[str]:
+        return sentence_texts(self.blocks)
+
+    def word_texts(self) -> list[str]:
+        return word_texts(self.blocks)
+
+
+def sentence_texts(blocks: Sequence[BlockPlan]) -> list[str]:
+    return [sent.text for block in blocks for node in block.text_nodes for sent in node]
+
+
+def word_texts(blocks: Sequence[BlockPlan]) -> list[str]:
+    return [
+        token.text.strip()
+        for block in blocks
+        for node in block.text_nodes
+        for sent in node
+        for token in sent.tokens
+        if token.is_word
+    ]
+
+
+def lemmas(blocks: Sequence[BlockPlan]) -> list[str]:
+    return [
+        token.lemma
+        for block in blocks
+        for node in block.text_nodes
+        for sent in node
+        for token in sent.tokens
+    ]
+
+
+@cache
+def pipeline_version() -> str:
+    """Stamp identifying the models, frequency tables and renderer in use."""
+    parts = [f"renderer={RENDERER_VERSION}"]
+    for language, resource in sorted(LANGUAGE_RESOURCES.items()):
+        try:
+            model_version = version(resource.model_name)
+        except PackageNotFoundError:
+            model_version = "missing"
+        try:
+            with open(resource.freq_path, "rb") as f:
+                freq_version = hashlib.file_digest(f, "sha256").hexdigest()
+        except FileNotFoundError:
+            freq_version = "missing"
+        parts.append(f"{language}={model_version}:{freq_version}")
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+def rendering_version(streamed: bool = False) -> str:
+    """Cache key of a rendering: :func:`pipeline_version`, marked for streamed
+    renderings since their hard-word threshold comes from a prefix only."""
+    version = pipeline_version()
+    return f"{version}-stream" if streamed else version
+
+
+def language_loader_stats() -> dict:
+    return {"pid": os.getpid(), **LANGUAGE_LOADER.stats()}
+
+
+def extract_plain_text(raw_html: str) -> str:
+    return Article(raw_html).plain_text
+
+
+def split_text(text: str, max_tokens: int) -> list[str]:
+    """Split ``text`` into chunks of about ``max_tokens`` tokens.
+
+    Chunks break between paragraphs; a paragraph that is too long on its own
+    is broken between sentences when a spaCy model exists for its language.
+    """
+    units: list[str] = []
+    nlp = None
+    for paragraph in filter(None, (line.strip() for line in text.splitlines())):
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append(paragraph)
+            continue
+        if nlp is None:
+            language = detect(text)
+            if language not in LANGUAGE_RESOURCES:
+                units.append(paragraph)
+                continue
+            nlp = LANGUAGE_LOADER.model(language)
+        units.extend(sent.text.strip() for sent in nlp(paragraph).sents)
+
+    chunks: list[str] = []
+    chunk: list[str] = []
+    chunk_tokens = 0
+    for unit in units:
+        unit_tokens = estimate_tokens(unit)
+        if chunk and chunk_tokens + unit_tokens > max_tokens:
+            chunks.append("\n".join(chunk))
+            chunk, chunk_tokens = [], 0
+        chunk.append(unit)
+        chunk_tokens += unit_tokens
+    if chunk:
+        chunks.append("\n".join(chunk))
+    return chunks
+
+
+def extract_outline(raw_html: str) -> ArticleOutline:
+    article = Article(raw_html=raw_html)
+    soup = BeautifulSoup(article.content, "lxml")
+    root = soup.body if soup.body is not None else soup
+    return ArticleOutline(
+        title=article.title,
+        author=article.author,
+        language=article.language,
+        blocks=_blocks(root),
+    )
+
+
+def split_blocks(html: str) -> tuple[str, ...]:
+    """Split a rendered article back into top-level blocks.
+
+    Adjacent text blocks come back as one, but the blocks still concatenate
+    to ``html``.
+    """
+    return _blocks(_parse_block(html))
+
+
+def analyze_blocks(language: str, blocks: Sequence[str]) -> tuple[BlockPlan, ...]:
+    nlp = LANGUAGE_LOADER.model(language)
+    soups = [_parse_block(block) for block in blocks]
+    node_counts = [len(_text_nodes(soup)) for soup in soups]
+    docs = iter(
+        nlp.pipe(
+            (str(node) for soup in soups for node in _text_nodes(soup)),
+            batch_size=SETTINGS.SPACY_BATCH_SIZE,
+            n_process=_spacy_processes(),
+        )
+    )
+    return tuple(
+        BlockPlan(
+            html=block,
+            text_nodes=tuple(
+                tuple(_plan_sentence(sent, language) for sent in doc.sents)
+                for doc in islice(docs, count)
+            ),
+        )
+        for block, count in zip(blocks, node_counts)
+    )
+
+
+def hard_word_threshold(
+    language: str, sample_lemmas: Sequence[str], k: float = 1
+) -> float | None:
+    """Log-frequency score above which a lemma counts as hard."""
+    df = LANGUAGE_LOADER.freq_index(language).lookup(sample_lemmas)
+    if df.height == 0:
+        return None
+
+    mean, std = df.select(
+        pl.col("log_score").mean().alias("mean"),
+        pl.col("log_score").std().alias("std"),
+    ).row(0)
+
+    return mean + k * (std or 0)
+
+
+def render_blocks(
+    blocks: Sequence[BlockPlan],
+    language: str,
+    threshold: float | None,
+    sentence_ids: dict[str, str],
+    word_ids: dict[str, str],
+) -> list[str]:
+    hard_words = _get_hard_words(lemmas(blocks), language, threshold)
+    return [
+        _render_block(block, hard_words, sentence_ids, word_ids) for block in blocks
+    ]
+
+
+def analyze_article(raw_html: str) -> ArticleAnalysis:
+    outline = extract_outline(raw_html)
+    blocks = analyze_blocks(outline.language, outline.blocks)
+    return ArticleAnalysis(
+        title=outline.title,
+        author=outline.author,
+        language=outline.language,
+        blocks=blocks,
+        hard_word_threshold=hard_word_threshold(outline.language, lemmas(blocks)),
+    )
+
+
+def render_article(
+    analysis: ArticleAnalysis,
+    sentence_ids: dict[str, str],
+    word_ids: dict[str, str],
+) -> str:
+    return "".join(
+        render_blocks(
+            analysis.blocks,
+            analysis.language,
+            analysis.hard_word_threshold,
+            sentence_ids,
+            word_ids,
+        )
+    )
+
+
+def _spacy_processes() -> int:
+    # A worker process (of the CPU pool or a job worker) is already one of
+    # several; forking a nested pool of its own would only oversubscribe.
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return SETTINGS.SPACY_N_PROCESS
+
+
+def _blocks(root: Tag) -> tuple[str, ...]:
+    # Text is re-escaped so a block parses back to the same content; comments
+    # and doctypes carry no article text.
+    return tuple(
+        child.decode()
+        if isinstance(child, Tag)
+        else child.output_ready(formatter="minimal")
+        for child in root.children
+        if isinstance(child, (Tag, NavigableString))
+        and not isinstance(child, (Comment, Doctype))
+    )
+
+
+def _parse_block(block: str) -> BeautifulSoup:
+    # html.parser keeps a fragment as-is; lxml would wrap it in <html><body>.
+    return BeautifulSoup(block, "html.parser")
+
+
+def _render_block(
+    block: BlockPlan,
+    hard_words: set[str],
+    sentence_ids: dict[str, str],
+    word_ids: dict[str, str],
+) -> str:
+    soup = _parse_block(block.html)
+    for node, sentences in zip(_text_nodes(soup), block.text_nodes, strict=True):
+        new_nodes = [
+            _render_sentence(sent, soup, hard_words, sentence_ids, word_ids)
+            for sent in sentences
+        ]
+
+        for new in reversed(new_nodes):
+            node.insert_after(new)
+
+        node.extract()
+
+    return soup.decode()
+
+
+def _get_hard_words(
+    lemmas: list[str], language: str, threshold: float | None
+) -> set[str]:
+    if threshold is None:
+        return set()
+    df = LANGUAGE_LOADER.freq_index(language).lookup(lemmas)
+    return set(df.filter(pl.col("log_score") > threshold).get_column("word"))
+
+
+def _text_nodes(soup: BeautifulSoup) -> list[NavigableString]:
+    """Collect the non-blank text nodes to tokenize, in document order.
+
+    Both stages walk the same block, so the order is identical in
+    :func:`analyze_blocks` and :func:`render_blocks`.
+    """
+    text_nodes: list[NavigableString] = []
+    stack: list[PageElement] = [soup]
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (Tag, BeautifulSoup)):
+            if _should_skip_node(node):
+                continue
+
+            children = list(node.children)
+            for child in reversed(children):
+                stack.append(child)
+            continue
+
+        if (
+            isinstance(node, NavigableString)
+            and node.parent is not None
+            and str(node).strip() != ""
+        ):
+            text_nodes.append(node)
+
+    return text_nodes
+
+
+def _should_skip_node(node: Tag | BeautifulSoup) -> bool:
+    """Return True when we do not want to tokenize inside this element."""
+    return node.name in {"pre"}
+
+
+def _plan_sentence(sent: Span, language: str) -> SentencePlan:
+    return SentencePlan(
+        text=sent.text.strip(),
+        tokens=tuple(
+            TokenPlan(
+                text=token.text,
+                whitespace=token.whitespace_,
+                is_word=_is_word_token(token),
+                lemma=lemma_of_word(token, language),
+            )
+            for token in sent
+            if token.text
+        ),
+    )
+
+
+def _render_sentence(
+    sent: SentencePlan,
+    soup: BeautifulSoup,
+    hard_words: set[str],
+    sentence_ids: dict[str, str],
+    word_ids: dict[str, str],
+):
+    if not sent.has_word:
+        return soup.new_string(
+            "".join(token.text + token.whitespace for token in sent.tokens)
+        )
+
+    sent_span = soup.new_tag(
+        "span", attrs={"class": "sent", "sent-id": sentence_ids[sent.text]}
+    )
+
+    for token in sent.tokens:
+        if token.is_word:
+            sent_span.append(_build_word_node(token, soup, hard_words, word_ids))
+        else:
+            sent_span.append(soup.new_string(token.text))
+
+        if token.whitespace:
+            sent_span.append(soup.new_string(token.whitespace))
+
+    return sent_span
+
+
+def _build_word_node(
+    token: TokenPlan,
+    soup: BeautifulSoup,
+    hard_words: set[str],
+    word_ids: dict[str, str],
+) -> Tag:
+    word_span = soup.new_tag(
+        "span",
+        attrs={"word-id": word_ids[token.text.strip()]},
+    )
+
+    if token.lemma in hard_words:
+        word_span["class"] = "word hard-word"
+    else:
+        word_span["class"] = "word"
+    word_span.string = token.text
+    return word_span
+
+
+def _is_word_token(token: Token) -> bool:
+    is_number_word = token.pos_ == "NUM" and not token.like_num
+
+    return (
+        (token.is_alpha or is_number_word)
+        and not token.is_space
+        and not token.is_punct
+        and not token.like_url
+        and not token.like_email
+        and not token.text.isdigit()
+    )
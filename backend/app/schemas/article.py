@@ -1,3 +1,4 @@
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
@@ -19,3 +20,38 @@ class ArticleResp(BaseModel):
     author: str
     lang: str
     raw_html: str
+
+
+class _ArticleEvent(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid", alias_generator=to_camel, populate_by_name=True
+    )
+
+
+class ArticleMetaEvent(_ArticleEvent):
+    type: Literal["meta"] = "meta"
+    id: UUID
+    title: str
+    author: str
+    lang: str
+
+
+class ArticleBlockEvent(_ArticleEvent):
+    type: Literal["block"] = "block"
+    index: int
+    html: str
+
+
+class ArticleDoneEvent(_ArticleEvent):
+    type: Literal["done"] = "done"
+    blocks: int
+
+
+class ArticleErrorEvent(_ArticleEvent):
+    type: Literal["error"] = "error"
+    detail: str
+
+
+ArticleEvent = (
+    ArticleMetaEvent | ArticleBlockEvent | ArticleDoneEvent | ArticleErrorEvent
+)
@@ -18,3 +18,11 @@ class LookupResp(BaseModel):
     word_id: uuid.UUID
     language: str
     text: str | None
+
+
+class LookupEvent(LookupResp):
+    """One streamed lookup result; ``error`` is set when ``text`` could not be
+    resolved."""
+
+    sentence_id: uuid.UUID
+    error: str | None = None
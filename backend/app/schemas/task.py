@@ -0,0 +1,29 @@
+from uuid import UUID
+
+from db_models import DocumentProcessTask, TaskStatus
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
+
+
+class TaskResp(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid", alias_generator=to_camel, populate_by_name=True
+    )
+
+    id: int
+    status: TaskStatus
+    url: str
+    attempts: int
+    error: str | None
+    article_id: UUID | None
+
+    @classmethod
+    def from_task(cls, task: DocumentProcessTask) -> "TaskResp":
+        return cls(
+            id=task.id,
+            status=task.status,
+            url=task.url,
+            attempts=task.attempts,
+            error=task.error,
+            article_id=task.raw_article_id,
+        )
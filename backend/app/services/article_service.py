@@ -1,22 +1,49 @@
-from collections.abc import AsyncGenerator
+import asyncio
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Sequence
 
 import polars as pl
-from bs4 import BeautifulSoup, Tag
-from bs4.element import NavigableString, PageElement
 from db_models import RawArticle
 from fastapi import Depends
+from loguru import logger
 from returns.future import future_safe
-from spacy.language import Language
-from spacy.tokens.span import Span
-from spacy.tokens.token import Token
-
-from app.domain import Article
-from app.nlp.word import lemma_of_word
+from returns.maybe import Some
+
+from app.core.cpu_pool import CpuPool, get_cpu_pool
+from app.core.intern_cache import SENTENCE_IDS, WORD_IDS, InternCache
+from app.core.settings import SETTINGS
+from app.nlp.freq_index import most_frequent_words
+from app.nlp.pipeline import (
+    HARD_WORD_SAMPLE_TOKENS,
+    ArticleOutline,
+    BlockPlan,
+    analyze_article,
+    analyze_blocks,
+    extract_outline,
+    hard_word_threshold,
+    lemmas,
+    rendering_version,
+    render_article,
+    render_blocks,
+    sentence_texts,
+    split_blocks,
+    word_texts,
+)
+from app.services.language_loader_service import LANGUAGE_RESOURCES
+from repos import count_sessions
+from repos.rendered_article_repo import (
+    RenderedArticleRepository,
+    get_rendered_article_repo,
+)
 from repos.sentence_repo import SentenceRepository, get_sentence_repo
 from repos.word_repo import WordRepository, get_word_repo
 from app.schemas import ArticleResp
-
-from .language_loader_service import LanguageLoaderService, get_language_loader_service
+from app.schemas.article import (
+    ArticleBlockEvent,
+    ArticleDoneEvent,
+    ArticleEvent,
+    ArticleMetaEvent,
+)
 
 
 class ArticleService:
@@ -24,191 +51,236 @@ class ArticleService:
         self,
         word_repo: WordRepository,
         sentence_repo: SentenceRepository,
-        language_loader: LanguageLoaderService,
+        rendered_article_repo: RenderedArticleRepository,
+        cpu_pool: CpuPool,
+        word_ids: InternCache,
+        sentence_ids: InternCache,
     ) -> None:
         self.__word_repo = word_repo
         self.__sentence_repo = sentence_repo
-        self.__language_loader = language_loader
+        self.__rendered_article_repo = rendered_article_repo
+        self.__cpu_pool = cpu_pool
+        self.__word_ids = word_ids
+        self.__sentence_ids = sentence_ids
 
     @future_safe
     async def process_article(self, raw_article: RawArticle) -> ArticleResp:
-        article = Article(raw_html=raw_article.raw_html)
-        parsed_html = await self.__parse_html(article)
-        return ArticleResp(
-            id=raw_article.id,
-            title=article.title,
-            author=article.author,
-            lang=article.language,
-            raw_html=parsed_html,
+        async with count_sessions() as stats:
+            version = rendering_version()
+            cached = await self.__rendered_article_repo.get_by_raw_article(
+                raw_article.id, version
+            )
+            match cached:
+                case Some(rendered):
+                    article = ArticleResp(
+                        id=raw_article.id,
+                        title=rendered.title,
+                        author=rendered.author,
+                        lang=rendered.language,
+                        raw_html=rendered.html,
+                    )
+                case _:
+                    article = await self.__render(raw_article, version)
+        logger.debug(
+            "Article {}: {} session(s), {} commit(s), {} shared call(s)",
+            raw_article.id,
+            stats.sessions,
+            stats.commits,
+            stats.shared_calls,
         )
-
-    async def __parse_html(self, article: Article) -> str:
-        nlp = self.__language_loader.model(article.language)
-        hard_words = set(self.__get_hard_words(nlp, article))
-
-        soup = BeautifulSoup(article.content, "lxml")
-        await self.__tokenize_dom(soup, nlp, hard_words, article.language)
-
-        body = soup.body
-        if body is None:
-            return str(soup)
-
-        return body.decode_contents()
-
-    def __get_hard_words(
-        self, nlp: Language, article: Article, k: float = 1
-    ) -> list[str]:
-        language = article.language
-        word_freq = self.__language_loader.word_freq(language)
-
-        lemmas = [lemma_of_word(token, language) for token in nlp(article.plain_text)]
-
-        df = word_freq.filter(pl.col("word").is_in(lemmas))
-        if df.height == 0:
-            return []
-
-        mean, std = df.select(
-            pl.col("log_score").mean().alias("mean"),
-            pl.col("log_score").std().alias("std"),
-        ).row(0)
-
-        std = std or 0
-        threshold = mean + k * std
-
-        return df.filter(pl.col("log_score") > threshold).get_column("word").to_list()
-
-    async def __tokenize_dom(
-        self,
-        soup: BeautifulSoup,
-        nlp: Language,
-        hard_words: set[str],
-        language: str,
-    ) -> None:
-        stack: list[PageElement] = [soup]
-
-        while stack:
-            node = stack.pop()
-            if isinstance(node, (Tag, BeautifulSoup)):
-                if self.__should_skip_node(node):
-                    continue
-
-                children = list(node.children)
-                for child in reversed(children):
-                    stack.append(child)
-                continue
-
-            if isinstance(node, NavigableString):
-                await self.__tokenize_text_node(node, soup, nlp, hard_words, language)
-
-    @staticmethod
-    def __should_skip_node(node: Tag | BeautifulSoup) -> bool:
-        """Return True when we do not want to tokenize inside this element."""
-        return node.name in {"pre"}
-
-    async def __tokenize_text_node(
-        self,
-        node: NavigableString,
-        soup: BeautifulSoup,
-        nlp: Language,
-        hard_words: set[str],
-        language: str,
-    ) -> None:
-        parent = node.parent
-        if parent is None:
-            return
-
-        raw_text = str(node)
-        if raw_text.strip() == "":
-            return
-
-        doc = nlp(raw_text)
-        new_nodes = [
-            await self.__render_sentence(sent, soup, hard_words, language)
-            for sent in doc.sents
-        ]
-
-        for new in reversed(new_nodes):
-            node.insert_after(new)
-
-        node.extract()
-
-    async def __render_sentence(
-        self, sent: Span, soup: BeautifulSoup, hard_words: set[str], language: str
-    ):
-        sentence = await self.__sentence_repo.get_or_create(sent.text.strip())
-        sent_span = soup.new_tag(
-            "span", attrs={"class": "sent", "sent-id": str(sentence.id)}
+        return article
+
+    async def stream_article(
+        self, raw_article: RawArticle
+    ) -> AsyncIterator[ArticleEvent]:
+        """Yield the article metadata, then its rendered blocks in document order.
+
+        Blocks are analyzed in chunks of ``ARTICLE_STREAM_CHUNK_BLOCKS`` on the
+        CPU pool, and each chunk is interned and rendered as soon as it and
+        every chunk before it are ready.
+        """
+        version = rendering_version(streamed=True)
+        cached = await self.__rendered_article_repo.get_by_raw_article(
+            raw_article.id, version
         )
-        has_valid_word = False
-
-        for token in sent:
-            text = token.text
-            if not text:
-                continue
-
-            if self.__is_word_token(token):
-                word_node = await self.__build_word_node(
-                    token, soup, hard_words, language
+        match cached:
+            case Some(rendered):
+                yield ArticleMetaEvent(
+                    id=raw_article.id,
+                    title=rendered.title,
+                    author=rendered.author,
+                    lang=rendered.language,
                 )
-                has_valid_word = True
-                sent_span.append(word_node)
-            else:
-                sent_span.append(soup.new_string(text))
-
-            self.__append_whitespace(sent_span, soup, token)
-
-        if has_valid_word:
-            return sent_span
-
-        plain_text = "".join(tok.text_with_ws for tok in sent)
-        return soup.new_string(plain_text)
+                cached_blocks = await self.__cpu_pool.run(split_blocks, rendered.html)
+                for index, html in enumerate(cached_blocks):
+                    yield ArticleBlockEvent(index=index, html=html)
+                yield ArticleDoneEvent(blocks=len(cached_blocks))
+                return
+
+        outline = await self.__cpu_pool.run(extract_outline, raw_article.raw_html)
+        yield ArticleMetaEvent(
+            id=raw_article.id,
+            title=outline.title,
+            author=outline.author,
+            lang=outline.language,
+        )
 
-    async def __build_word_node(
+        chunks = self.__analyze_chunks(outline.language, outline.blocks)
+        rendered_blocks: list[str] = []
+        try:
+            # The hard-word threshold only needs the leading tokens, so the
+            # first chunks can be rendered before the rest are analyzed.
+            head: list[tuple[BlockPlan, ...]] = []
+            sample: list[str] = []
+            while len(sample) < HARD_WORD_SAMPLE_TOKENS and (
+                blocks := await anext(chunks, None)
+            ):
+                head.append(blocks)
+                sample.extend(lemmas(blocks))
+            threshold = await self.__cpu_pool.run(
+                hard_word_threshold,
+                outline.language,
+                sample[:HARD_WORD_SAMPLE_TOKENS],
+            )
+
+            for blocks in head:
+                for html in await self.__render_chunk(blocks, outline, threshold):
+                    yield ArticleBlockEvent(index=len(rendered_blocks), html=html)
+                    rendered_blocks.append(html)
+            async for blocks in chunks:
+                for html in await self.__render_chunk(blocks, outline, threshold):
+                    yield ArticleBlockEvent(index=len(rendered_blocks), html=html)
+                    rendered_blocks.append(html)
+        finally:
+            await chunks.aclose()
+
+        await self.__rendered_article_repo.get_or_create(
+            raw_article_id=raw_article.id,
+            version=version,
+            title=outline.title,
+            author=outline.author,
+            language=outline.language,
+            html="".join(rendered_blocks),
+            keep_versions=[rendering_version()],
+        )
+        yield ArticleDoneEvent(blocks=len(rendered_blocks))
+
+    async def __analyze_chunks(
+        self, language: str, blocks: tuple[str, ...]
+    ) -> AsyncGenerator[tuple[BlockPlan, ...], None]:
+        """Analyze ``blocks`` chunk by chunk, in order.
+
+        One chunk more than the pool has workers is kept in flight, so early
+        chunks are not queued behind the whole article.
+        """
+        size = SETTINGS.ARTICLE_STREAM_CHUNK_BLOCKS
+        starts = iter(range(0, len(blocks), size))
+        window = max(self.__cpu_pool.workers, 1) + 1
+        pending: deque[asyncio.Future[tuple[BlockPlan, ...]]] = deque()
+        try:
+            while True:
+                while (
+                    len(pending) < window and (start := next(starts, None)) is not None
+                ):
+                    pending.append(
+                        asyncio.ensure_future(
+                            self.__cpu_pool.run(
+                                analyze_blocks, language, blocks[start : start + size]
+                            )
+                        )
+                    )
+                if not pending:
+                    return
+                yield await pending.popleft()
+        finally:
+            for analysis in pending:
+                analysis.cancel()
+
+    async def __render_chunk(
         self,
-        token: Token,
-        soup: BeautifulSoup,
-        hard_words: set[str],
-        language: str,
-    ) -> Tag:
-        word = await self.__word_repo.get_or_create(token.text.strip())
-        lemma = lemma_of_word(token, language)
-
-        word_span = soup.new_tag(
-            "span",
-            attrs={"word-id": str(word.id)},
+        blocks: tuple[BlockPlan, ...],
+        outline: ArticleOutline,
+        threshold: float | None,
+    ) -> list[str]:
+        sentence_ids, word_ids = await self.__intern(blocks)
+        return await self.__cpu_pool.run(
+            render_blocks, blocks, outline.language, threshold, sentence_ids, word_ids
         )
 
-        if lemma in hard_words:
-            word_span["class"] = "word hard-word"
-        else:
-            word_span["class"] = "word"
-        word_span.string = token.text
-        return word_span
-
-    @staticmethod
-    def __append_whitespace(container: Tag, soup: BeautifulSoup, token: Token) -> None:
-        if token.whitespace_:
-            container.append(soup.new_string(token.whitespace_))
+    async def __intern(
+        self, blocks: Sequence[BlockPlan]
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        # One transaction for the cache misses of the whole batch. Rendering
+        # stays outside it so the write lock is not held across CPU work.
+        async with self.__sentence_repo.unit_of_work():
+            sentence_ids, new_sentence_ids = await self.__sentence_ids.resolve(
+                sentence_texts(blocks), self.__sentence_repo.get_or_create_ids
+            )
+            word_ids, new_word_ids = await self.__word_ids.resolve(
+                word_texts(blocks), self.__word_repo.get_or_create_ids
+            )
+        # Committed by now: a rolled-back batch leaves the caches untouched.
+        self.__sentence_ids.put_many(new_sentence_ids)
+        self.__word_ids.put_many(new_word_ids)
+        return (
+            {text: str(sentence_id) for text, sentence_id in sentence_ids.items()},
+            {text: str(word_id) for text, word_id in word_ids.items()},
+        )
 
-    @staticmethod
-    def __is_word_token(token: Token) -> bool:
-        is_number_word = token.pos_ == "NUM" and not token.like_num
+    async def __render(self, raw_article: RawArticle, version: str) -> ArticleResp:
+        analysis = await self.__cpu_pool.run(analyze_article, raw_article.raw_html)
+        sentence_ids, word_ids = await self.__intern(analysis.blocks)
 
-        return (
-            (token.is_alpha or is_number_word)
-            and not token.is_space
-            and not token.is_punct
-            and not token.like_url
-            and not token.like_email
-            and not token.text.isdigit()
+        parsed_html = await self.__cpu_pool.run(
+            render_article, analysis, sentence_ids, word_ids
+        )
+        await self.__rendered_article_repo.get_or_create(
+            raw_article_id=raw_article.id,
+            version=version,
+            title=analysis.title,
+            author=analysis.author,
+            language=analysis.language,
+            html=parsed_html,
+            keep_versions=[rendering_version(streamed=True)],
+        )
+        return ArticleResp(
+            id=raw_article.id,
+            title=analysis.title,
+            author=analysis.author,
+            lang=analysis.language,
+            raw_html=parsed_html,
         )
 
 
 async def get_article_service(
     word_repo: WordRepository = Depends(get_word_repo),
     sentence_repo: SentenceRepository = Depends(get_sentence_repo),
-    language_loader_service: LanguageLoaderService = Depends(
-        get_language_loader_service
+    rendered_article_repo: RenderedArticleRepository = Depends(
+        get_rendered_article_repo
     ),
+    cpu_pool: CpuPool = Depends(get_cpu_pool),
 ) -> AsyncGenerator[ArticleService, None]:
-    yield ArticleService(word_repo, sentence_repo, language_loader_service)
+    yield ArticleService(
+        word_repo,
+        sentence_repo,
+        rendered_article_repo,
+        cpu_pool,
+        WORD_IDS,
+        SENTENCE_IDS,
+    )
+
+
+async def prewarm_word_ids(word_repo: WordRepository, per_language: int) -> None:
+    """Load the ids of the ``per_language`` most frequent words of every
+    language into the word id cache. Words not stored yet are skipped."""
+    for language, resource in LANGUAGE_RESOURCES.items():
+        try:
+            words = await asyncio.to_thread(
+                most_frequent_words, resource.freq_path, per_language
+            )
+        except (OSError, pl.exceptions.PolarsError) as err:
+            logger.warning("Cannot prewarm {} word ids: {}", language, err)
+            continue
+        ids = await word_repo.get_ids(words)
+        WORD_IDS.put_many(ids)
+        logger.info("Prewarmed {} {} word id(s)", len(ids), language)
@@ -0,0 +1,55 @@
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator
+
+from db_models import DocumentProcessTask, TaskStatus
+from fastapi import Depends
+from returns.maybe import Maybe, Some
+
+from app.core.job_broker import JobBroker, get_job_broker
+from repos.document_process_task_repo import (
+    DocumentProcessTaskRepository,
+    get_document_process_task_repo,
+)
+
+FINISHED = (TaskStatus.SUCCESS, TaskStatus.FAILED)
+
+
+class DocumentTaskService:
+    def __init__(
+        self, task_repo: DocumentProcessTaskRepository, broker: JobBroker
+    ) -> None:
+        self.__task_repo = task_repo
+        self.__broker = broker
+
+    async def submit(self, url: str) -> DocumentProcessTask:
+        task = await self.__task_repo.create(url)
+        await self.__broker.notify(task.id)
+        return task
+
+    async def get_by_id(self, task_id: int) -> Maybe[DocumentProcessTask]:
+        return await self.__task_repo.get_by_id(task_id)
+
+    async def watch(
+        self, task_id: int, interval: float
+    ) -> AsyncIterator[DocumentProcessTask]:
+        """Yield the task whenever its status or attempt count changes, until
+        it finishes or disappears."""
+        seen = None
+        while True:
+            match await self.__task_repo.get_by_id(task_id):
+                case Some(task):
+                    if (task.status, task.attempts) != seen:
+                        seen = (task.status, task.attempts)
+                        yield task
+                    if task.status in FINISHED:
+                        return
+                case _:
+                    return
+            await asyncio.sleep(interval)
+
+
+async def get_document_task_service(
+    task_repo: DocumentProcessTaskRepository = Depends(get_document_process_task_repo),
+    broker: JobBroker = Depends(get_job_broker),
+) -> AsyncGenerator[DocumentTaskService, None]:
+    yield DocumentTaskService(task_repo, broker)
@@ -1,34 +1,104 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import AsyncGenerator
 from dataclasses import dataclass
 from typing import Mapping
 
-import polars as pl
 import spacy
+from loguru import logger
 from spacy.language import Language
 
+from app.core.settings import SETTINGS
+from app.nlp.freq_index import FrequencyIndex
+
 
 @dataclass(frozen=True)
 class LanguageResource:
     model_name: str
     freq_path: str
+    warmup_text: str = ""
 
 
 LANGUAGE_RESOURCES: dict[str, LanguageResource] = {
-    "en": LanguageResource("en_core_web_lg", "resources/english_freq.parquet"),
-    "zh-cn": LanguageResource("zh_core_web_lg", "resources/chinese_freq.parquet"),
-    "ja": LanguageResource("ja_core_news_lg", "resources/japanese_freq.parquet"),
+    "en": LanguageResource(
+        "en_core_web_lg",
+        "resources/english_freq.parquet",
+        "The quick brown fox jumps over the lazy dog.",
+    ),
+    "zh-cn": LanguageResource(
+        "zh_core_web_lg",
+        "resources/chinese_freq.parquet",
+        "我们今天一起读一篇文章。",
+    ),
+    "ja": LanguageResource(
+        "ja_core_news_lg",
+        "resources/japanese_freq.parquet",
+        "今日は一緒に記事を読みましょう。",
+    ),
 }
 
 
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclass
+class _LoadedLanguage:
+    nlp: Language
+    freq_index: FrequencyIndex
+    memory_bytes: int
+    last_used: float
+
+
+@dataclass
+class LanguageMetrics:
+    loads: int = 0
+    hits: int = 0
+    evictions: int = 0
+    last_load_seconds: float = 0.0
+    total_load_seconds: float = 0.0
+    memory_bytes: int = 0
+
+
+def _rss_bytes() -> int:
+    """Resident set size of this process, or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return 0
+
+
 class LanguageLoaderService:
-    """Lazy loader for spaCy models and word frequency tables."""
+    """Process-wide cache of spaCy models and word frequency indexes.
+
+    A language is loaded on first use, at most once at a time, and shared by
+    every caller in the process. Loaded languages are kept in LRU order: when
+    their estimated memory exceeds ``memory_budget_mb``, or one has not been
+    used for ``idle_ttl`` seconds, the least recently used ones are evicted and
+    reloaded on their next use. A zero budget or TTL disables that limit.
+    Idle languages are also swept by a background thread, so they are
+    dropped even if the process sees no further work.
+    """
 
     def __init__(
-        self, resources: Mapping[str, LanguageResource] = LANGUAGE_RESOURCES
+        self,
+        resources: Mapping[str, LanguageResource] = LANGUAGE_RESOURCES,
+        memory_budget_mb: int = 0,
+        idle_ttl: float = 0,
+        warmup: bool = True,
     ) -> None:
         self._resources = resources
-        self._nlp_cache: dict[str, Language] = {}
-        self._freq_cache: dict[str, pl.DataFrame] = {}
+        self._memory_budget = memory_budget_mb * 1024 * 1024
+        self._idle_ttl = idle_ttl
+        self._warmup = warmup
+        self._lock = threading.Lock()
+        self._load_locks = {language: threading.Lock() for language in resources}
+        self._loaded: OrderedDict[str, _LoadedLanguage] = OrderedDict()
+        self._metrics = {language: LanguageMetrics() for language in resources}
+        self._sweeper: threading.Thread | None = None
 
     def _resource(self, language: str) -> LanguageResource:
         if language not in self._resources:
@@ -36,17 +106,156 @@ class LanguageLoaderService:
         return self._resources[language]
 
     def model(self, language: str) -> Language:
-        if language not in self._nlp_cache:
-            resource = self._resource(language)
-            self._nlp_cache[language] = spacy.load(resource.model_name)
-        return self._nlp_cache[language]
+        return self._get(language).nlp
+
+    def freq_index(self, language: str) -> FrequencyIndex:
+        return self._get(language).freq_index
+
+    def preload(self, languages: list[str]) -> None:
+        for language in languages:
+            self._get(language)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": list(self._loaded),
+                "memory_bytes": sum(
+                    loaded.memory_bytes for loaded in self._loaded.values()
+                ),
+                "memory_budget_bytes": self._memory_budget,
+                "languages": {
+                    language: {
+                        "loads": metrics.loads,
+                        "hits": metrics.hits,
+                        "evictions": metrics.evictions,
+                        "last_load_seconds": metrics.last_load_seconds,
+                        "total_load_seconds": metrics.total_load_seconds,
+                        "memory_bytes": metrics.memory_bytes,
+                    }
+                    for language, metrics in self._metrics.items()
+                },
+            }
+
+    def _get(self, language: str) -> _LoadedLanguage:
+        resource = self._resource(language)
+        if (loaded := self._touch(language)) is not None:
+            return loaded
+
+        with self._load_locks[language]:
+            if (loaded := self._touch(language)) is not None:
+                return loaded
+
+            loaded = self._load(language, resource)
+            with self._lock:
+                self._loaded[language] = loaded
+                evicted = self._evict(keep=language)
+                self._start_sweeper()
+
+        if evicted:
+            gc.collect()
+        return loaded
+
+    def _touch(self, language: str) -> _LoadedLanguage | None:
+        with self._lock:
+            loaded = self._loaded.get(language)
+            if loaded is None:
+                return None
+            loaded.last_used = time.monotonic()
+            self._loaded.move_to_end(language)
+            self._metrics[language].hits += 1
+            return loaded
+
+    def _load(self, language: str, resource: LanguageResource) -> _LoadedLanguage:
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+
+        nlp = spacy.load(resource.model_name)
+        freq_index = FrequencyIndex.load(resource.freq_path)
+        if self._warmup and resource.warmup_text:
+            nlp(resource.warmup_text)
+
+        elapsed = time.perf_counter() - start
+        memory_bytes = max(_rss_bytes() - rss_before, freq_index.estimated_size())
+
+        with self._lock:
+            metrics = self._metrics[language]
+            metrics.loads += 1
+            metrics.last_load_seconds = elapsed
+            metrics.total_load_seconds += elapsed
+            metrics.memory_bytes = memory_bytes
+
+        logger.info(
+            "Loaded language {} ({}) in {:.2f}s, ~{} MiB",
+            language,
+            resource.model_name,
+            elapsed,
+            memory_bytes // (1024 * 1024),
+        )
+        return _LoadedLanguage(nlp, freq_index, memory_bytes, time.monotonic())
+
+    def _start_sweeper(self) -> None:
+        """Start the idle sweep once. Must hold ``self._lock``."""
+        if not self._idle_ttl or self._sweeper is not None:
+            return
+        self._sweeper = threading.Thread(
+            target=self._sweep_idle, name="language-idle-sweep", daemon=True
+        )
+        self._sweeper.start()
+
+    def _sweep_idle(self) -> None:
+        # Checking twice per TTL evicts a language at most 1.5 TTLs after its
+        # last use.
+        while True:
+            time.sleep(self._idle_ttl / 2)
+            with self._lock:
+                evicted = self._evict(keep=None)
+            if evicted:
+                gc.collect()
+
+    def _evict(self, keep: str | None) -> list[str]:
+        """Drop idle or over-budget languages. Must hold ``self._lock``."""
+        now = time.monotonic()
+        evicted = [
+            language
+            for language, loaded in self._loaded.items()
+            if language != keep
+            and self._idle_ttl
+            and now - loaded.last_used > self._idle_ttl
+        ]
+        for language in evicted:
+            del self._loaded[language]
+
+        if self._memory_budget:
+            for language in list(self._loaded):
+                total = sum(loaded.memory_bytes for loaded in self._loaded.values())
+                if total <= self._memory_budget:
+                    break
+                if language != keep:
+                    del self._loaded[language]
+                    evicted.append(language)
+
+        for language in evicted:
+            self._metrics[language].evictions += 1
+            logger.info("Evicted language {}", language)
+        return evicted
+
+
+def _preload_languages() -> list[str]:
+    return [language for language in SETTINGS.LANGUAGE_PRELOAD.split("|") if language]
+
+
+# One registry per process: the API process and every CPU pool worker each
+# hold their own copy.
+LANGUAGE_LOADER = LanguageLoaderService(
+    memory_budget_mb=SETTINGS.LANGUAGE_MEMORY_BUDGET_MB,
+    idle_ttl=SETTINGS.LANGUAGE_IDLE_TTL,
+    warmup=SETTINGS.LANGUAGE_WARMUP,
+)
+
 
-    def word_freq(self, language: str) -> pl.DataFrame:
-        if language not in self._freq_cache:
-            resource = self._resource(language)
-            self._freq_cache[language] = pl.read_parquet(resource.freq_path)
-        return self._freq_cache[language]
+def preload_languages() -> None:
+    LANGUAGE_LOADER.preload(_preload_languages())
 
 
 async def get_language_loader_service() -> AsyncGenerator[LanguageLoaderService, None]:
-    yield LanguageLoaderService()
+    yield LANGUAGE_LOADER
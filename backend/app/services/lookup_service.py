@@ -1,151 +1,352 @@
 import asyncio
-from collections.abc import AsyncGenerator
+import uuid
+from collections.abc import AsyncGenerator, AsyncIterator
+from dataclasses import dataclass
 
 from fastapi import Depends
-from app.llm.client import invoke_prompts
+from app.llm.client import invoke_prompts_structured
+from app.llm.schemas import WordTranslations
 from loguru import logger
-from returns.future import FutureResult, future_safe
-from returns.io import IOFailure, IOResult
+from returns.future import future_safe
+from returns.io import IOFailure, IOSuccess
 from returns.result import Failure, Success
 
 from app.core.settings import SETTINGS
-from repos.sentence_repo import SentenceRepository, get_sentence_repo
+from app.core.tokens import estimate_tokens
+from app.core.single_flight import SingleFlight, single_flight
 from repos.word_lookup_repo import WordLookupRepository, get_word_lookup_repo
-from repos.word_repo import WordRepository, get_word_repo
-from app.schemas.lookup import LookupReq, LookupResp
+from app.schemas.lookup import LookupEvent, LookupReq, LookupResp
+
+
+@dataclass(frozen=True)
+class PendingLookup:
+    sentence_id: uuid.UUID
+    word_id: uuid.UUID
+    sentence: str
+    word: str
+
+
+def pack_lookups(
+    lookups: list[PendingLookup], token_budget: int, max_words: int
+) -> list[list[PendingLookup]]:
+    """Group lookups by sentence and pack the groups into prompt-sized batches.
+
+    A sentence is sent once per batch no matter how many of its words are
+    looked up; a batch is closed when adding the next sentence or word would
+    exceed ``token_budget`` or ``max_words``.
+    """
+    by_sentence: dict[uuid.UUID, list[PendingLookup]] = {}
+    for lookup in lookups:
+        by_sentence.setdefault(lookup.sentence_id, []).append(lookup)
+
+    batches: list[list[PendingLookup]] = []
+    batch: list[PendingLookup] = []
+    batch_tokens = 0
+    for group in by_sentence.values():
+        sentence_tokens = estimate_tokens(group[0].sentence)
+        for position, lookup in enumerate(group):
+            word_tokens = estimate_tokens(lookup.word)
+            cost = word_tokens + (sentence_tokens if position == 0 else 0)
+            if batch and (
+                batch_tokens + cost > token_budget or len(batch) >= max_words
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+                cost = word_tokens + sentence_tokens
+            batch.append(lookup)
+            batch_tokens += cost
+    if batch:
+        batches.append(batch)
+    return batches
 
 
 @future_safe
-async def lookup_word(sentence: str, word: str, language: str) -> str:
+async def lookup_words(lookups: list[PendingLookup], language: str) -> list[str | None]:
     system_prompt = f"""
 You are a translation disambiguation assistant.
 Given:
-- a sentence
-- a target word from that sentence
+- one or more sentences
+- numbered target words taken from each sentence
 - an output language code: {language}
 Task:
-Provide the most accurate translation of the target word **as it is used in the sentence**, considering its contextual meaning. 
+For every numbered word, provide the most accurate translation of the word **as it is used in its sentence**, considering its contextual meaning.
 Constraints:
-- Output ONLY the translation, no explanations.
-- Translation must be in the language specified by {language}.
-- Keep the output short: ideally around 20 tokens or fewer.
-- Do NOT translate the whole sentence; only the given word in context."""
-    user_prompt = f"""
-sentence: {sentence}
-word: {word} """
-    return str(await invoke_prompts(SETTINGS.MODEL_SPEED, system_prompt, user_prompt))
+- Return exactly one translation per number, using the same number as index.
+- Output ONLY the translations, no explanations.
+- Translations must be in the language specified by {language}.
+- Keep each translation short: ideally around 20 tokens or fewer.
+- Do NOT translate the whole sentence; only the given words in context."""
+
+    lines: list[str] = []
+    sentence_id = None
+    for index, lookup in enumerate(lookups):
+        if lookup.sentence_id != sentence_id:
+            sentence_id = lookup.sentence_id
+            lines.append(f"sentence: {lookup.sentence}")
+        lines.append(f"  [{index}] word: {lookup.word}")
+    user_prompt = "\n".join(lines)
+
+    result: WordTranslations = await invoke_prompts_structured(
+        SETTINGS.MODEL_SPEED,
+        system_prompt,
+        user_prompt,
+        response_model=WordTranslations,
+    )
+
+    translations: list[str | None] = [None] * len(lookups)
+    for item in result.translations:
+        if 0 <= item.index < len(lookups):
+            translations[item.index] = item.translation
+    return translations
+
+
+LookupKey = tuple[uuid.UUID, uuid.UUID]
+FlightKey = tuple[uuid.UUID, uuid.UUID, str]
+
+LOOKUP_FLIGHTS: SingleFlight[FlightKey, str | None] = single_flight("word_lookup")
 
 
 class LookupService:
     def __init__(
         self,
-        word_repository: WordRepository,
-        sentence_repository: SentenceRepository,
         word_lookup_repository: WordLookupRepository,
+        flights: SingleFlight[FlightKey, str | None],
     ) -> None:
-        self.__word_repository = word_repository
-        self.__sentence_repository = sentence_repository
         self.__word_lookup_repository = word_lookup_repository
+        self.__flights = flights
 
     async def lookup_word(
         self, lookup_requests: list[LookupReq], language: str
     ) -> list[LookupResp]:
+        texts: dict[LookupKey, str | None] = {}
+        async for event in self.__lookup_events(lookup_requests, language):
+            texts[(event.sentence_id, event.word_id)] = event.text
+
+        return [
+            LookupResp(
+                word_id=req.word_id,
+                language=language,
+                text=texts.get((req.sentence_id, req.word_id)),
+            )
+            for req in lookup_requests
+        ]
+
+    async def stream_lookup(
+        self, lookup_requests: list[LookupReq], language: str
+    ) -> AsyncIterator[LookupEvent]:
+        """Yield one event per distinct (sentence, word) as soon as it resolves.
+
+        Cache hits come first, then LLM batches in completion order. Failures
+        are reported on the affected items instead of ending the stream.
+        """
+        unresolved = {(req.sentence_id, req.word_id) for req in lookup_requests}
+        try:
+            async for event in self.__lookup_events(lookup_requests, language):
+                unresolved.discard((event.sentence_id, event.word_id))
+                yield event
+        except Exception as error:
+            logger.exception("Lookup stream failed")
+            for sentence_id, word_id in unresolved:
+                yield LookupEvent(
+                    sentence_id=sentence_id,
+                    word_id=word_id,
+                    language=language,
+                    text=None,
+                    error=str(error),
+                )
+
+    async def __lookup_events(
+        self, lookup_requests: list[LookupReq], language: str
+    ) -> AsyncIterator[LookupEvent]:
         logger.info(
             "Received {} lookup request(s) for word explanations",
             len(lookup_requests),
         )
 
-        lookup_coroutines = [
-            self.__process_lookup_request(lookup_request, language)
-            for lookup_request in lookup_requests
-        ]
+        unique_keys = list(
+            dict.fromkeys((req.sentence_id, req.word_id) for req in lookup_requests)
+        )
+        # Both reads share one session; it closes before anything is yielded,
+        # so the stream never holds a connection while the client reads.
+        async with self.__word_lookup_repository.unit_of_work(read_only=True):
+            cached_lookups = (
+                await self.__word_lookup_repository.get_many_by_sentence_and_word(
+                    unique_keys, language
+                )
+            )
+            misses = [key for key in unique_keys if key not in cached_lookups]
+            pending = await self.__load_pending(misses) if misses else []
+        for (sentence_id, word_id), lookup in cached_lookups.items():
+            yield LookupEvent(
+                sentence_id=sentence_id,
+                word_id=word_id,
+                language=language,
+                text=lookup.text,
+            )
 
-        results = await asyncio.gather(*lookup_coroutines)
+        logger.debug(
+            "{} cache hit(s), {} miss(es)", len(unique_keys) - len(misses), len(misses)
+        )
+        async for (sentence_id, word_id), text, error in self.__stream_misses(
+            misses, pending, language
+        ):
+            yield LookupEvent(
+                sentence_id=sentence_id,
+                word_id=word_id,
+                language=language,
+                text=text,
+                error=error if text is None else None,
+            )
 
         logger.info("Finished processing {} lookup request(s)", len(lookup_requests))
-        return results
 
-    async def __process_lookup_request(
-        self, lookup_request: LookupReq, language: str
-    ) -> LookupResp:
-        sentence_id = lookup_request.sentence_id
-        word_id = lookup_request.word_id
+    async def __stream_misses(
+        self, misses: list[LookupKey], pending: list[PendingLookup], language: str
+    ) -> AsyncIterator[tuple[LookupKey, str | None, str | None]]:
+        if not misses:
+            return
+
+        known = {(lookup.sentence_id, lookup.word_id) for lookup in pending}
+        for key in misses:
+            if key not in known:
+                yield key, None, "Unknown sentence or word"
 
+        batches = pack_lookups(
+            pending,
+            SETTINGS.LOOKUP_BATCH_TOKEN_BUDGET,
+            SETTINGS.LOOKUP_BATCH_MAX_WORDS,
+        )
         logger.debug(
-            "Processing lookup request: sentence_id={}, word_id={}",
-            sentence_id,
-            word_id,
+            "Fetching {} lookup(s) in {} LLM request(s)", len(pending), len(batches)
         )
 
-        cached_lookup = await self.__word_lookup_repository.get_by_sentence_and_word(
-            sentence_id, word_id, language
-        )
-        cached_lookup = cached_lookup.value_or(None)
+        flights = [
+            asyncio.ensure_future(self.__fly_batch(batch, language))
+            for batch in batches
+        ]
+        try:
+            for next_flight in asyncio.as_completed(flights):
+                batch, texts = await next_flight
+                keys = [(lookup.sentence_id, lookup.word_id) for lookup in batch]
+                if isinstance(texts, Exception):
+                    logger.warning(
+                        "Failed to fetch {} definition(s) due to error: {}",
+                        len(batch),
+                        texts,
+                    )
+                    for key in keys:
+                        yield key, None, str(texts)
+                    continue
+                for key in keys:
+                    yield key, texts.get(key), "No translation returned"
+        finally:
+            # Shared flights keep running for other callers; only our
+            # interest in them is dropped.
+            for flight in flights:
+                flight.cancel()
 
-        if cached_lookup is not None:
-            logger.debug(
-                "Cache hit for sentence_id={} word_id={}",
-                sentence_id,
-                word_id,
-            )
-            return LookupResp(
-                word_id=word_id,
-                language=cached_lookup.language,
-                text=cached_lookup.text,
+    async def __fly_batch(
+        self, batch: list[PendingLookup], language: str
+    ) -> tuple[list[PendingLookup], dict[LookupKey, str | None] | Exception]:
+        """Fly ``batch``, returning it with its texts or the error it failed with."""
+        try:
+            return batch, await self.__fly(batch, language)
+        except Exception as error:
+            return batch, error
+
+    async def __fly(
+        self, batch: list[PendingLookup], language: str
+    ) -> dict[LookupKey, str | None]:
+        """Resolve one LLM batch, sharing work with identical in-flight lookups."""
+        by_key = {
+            (lookup.sentence_id, lookup.word_id, language): lookup for lookup in batch
+        }
+
+        async def resolve(flight_keys: list[FlightKey]) -> dict[FlightKey, str | None]:
+            texts = await self.__resolve_batch(
+                [by_key[key] for key in flight_keys], language
             )
+            return {
+                (sentence_id, word_id, language): text
+                for (sentence_id, word_id), text in texts.items()
+            }
 
-        logger.debug(
-            "Cache miss for sentence_id={} word_id={}, fetching.",
-            sentence_id,
-            word_id,
-        )
+        resolved = await self.__flights.do_many(list(by_key), resolve)
+        return {
+            (sentence_id, word_id): text
+            for (sentence_id, word_id, _), text in resolved.items()
+        }
 
-        match await FutureResult.do(
-            definition_text
-            for sentence in await self.__sentence_repository.get_by_id(sentence_id)
-            for word in await self.__word_repository.get_by_id(word_id)
-            for definition_text in await lookup_word(sentence.text, word.text, language)
-        ):
-            case IOResult(Success(definition_text)):
-                logger.info(
-                    "Successfully fetched definition for sentence_id={} word_id={}",
-                    sentence_id,
-                    word_id,
-                )
+    async def __resolve_batch(
+        self, batch: list[PendingLookup], language: str
+    ) -> dict[LookupKey, str | None]:
+        keys = [(lookup.sentence_id, lookup.word_id) for lookup in batch]
 
-                created_or_existing_lookup = (
-                    await self.__word_lookup_repository.get_or_create(
-                        sentence_id, word_id, definition_text, language
-                    )
-                )
-                return LookupResp(
-                    word_id=word_id,
-                    language=language,
-                    text=created_or_existing_lookup.text,
-                )
+        # An earlier flight, possibly on another worker, may have stored some
+        # of these between our first probe and taking the lead.
+        stored = await self.__word_lookup_repository.get_many_by_sentence_and_word(
+            keys, language
+        )
+        texts: dict[LookupKey, str | None] = {
+            key: lookup.text for key, lookup in stored.items()
+        }
+        remaining = [
+            lookup
+            for lookup in batch
+            if (lookup.sentence_id, lookup.word_id) not in stored
+        ]
+        if remaining:
+            texts.update(await self.__fetch_batch(remaining, language))
+        return texts
+
+    async def __load_pending(self, misses: list[LookupKey]) -> list[PendingLookup]:
+        sentence_texts, word_texts = await self.__word_lookup_repository.get_texts(
+            misses
+        )
 
-            case IOResult(Failure(error)) | IOFailure(error):
+        pending: list[PendingLookup] = []
+        for sentence_id, word_id in misses:
+            if sentence_id not in sentence_texts or word_id not in word_texts:
                 logger.warning(
-                    "Failed to fetch definition for sentence_id={} word_id={} due to error: {}",
+                    "Unknown sentence_id={} or word_id={}, skipping lookup",
                     sentence_id,
                     word_id,
-                    error,
                 )
-                return LookupResp(word_id=word_id, language=language, text=None)
-
-            case other:
-                logger.error(
-                    "Unexpected lookup result for sentence_id={} word_id={}: {!r}",
+                continue
+            pending.append(
+                PendingLookup(
                     sentence_id,
                     word_id,
-                    other,
+                    sentence_texts[sentence_id],
+                    word_texts[word_id],
+                )
+            )
+        return pending
+
+    async def __fetch_batch(
+        self, batch: list[PendingLookup], language: str
+    ) -> dict[LookupKey, str | None]:
+        match await lookup_words(batch, language):
+            case IOSuccess(Success(translations)):
+                logger.info("Successfully fetched {} definition(s)", len(batch))
+                stored = await self.__word_lookup_repository.get_or_create_many(
+                    {
+                        (lookup.sentence_id, lookup.word_id): translation
+                        for lookup, translation in zip(batch, translations)
+                        if translation is not None
+                    },
+                    language,
                 )
-                return LookupResp(word_id=word_id, language=language, text=None)
+                return {key: lookup.text for key, lookup in stored.items()}
+
+            case IOFailure(Failure(error)):
+                raise error
+
+            case other:
+                raise RuntimeError(f"Unexpected lookup result: {other!r}")
 
 
 async def get_lookup_service(
-    word_repo: WordRepository = Depends(get_word_repo),
-    sentence_repo: SentenceRepository = Depends(get_sentence_repo),
     word_lookup_repo: WordLookupRepository = Depends(get_word_lookup_repo),
 ) -> AsyncGenerator[LookupService, None]:
-    yield LookupService(word_repo, sentence_repo, word_lookup_repo)
+    yield LookupService(word_lookup_repo, LOOKUP_FLIGHTS)
@@ -1,47 +1,93 @@
+import asyncio
 from collections.abc import AsyncGenerator
 
 from db_models import Mindmap, RawArticle
 from fastapi import Depends
+from loguru import logger
 from returns.future import future_safe
 from returns.io import IOResultE, IOSuccess
 from returns.maybe import Some
 
+from app.core.cpu_pool import CpuPool, get_cpu_pool
 from app.core.settings import SETTINGS
-from app.domain.article import Article
+from app.core.single_flight import SingleFlight, single_flight
+from app.core.tokens import estimate_tokens
 from app.llm.client import invoke_prompts_structured
 from app.llm.schemas import MindNode
+from app.nlp.pipeline import extract_plain_text, split_text
+from repos.hashing import content_hash
 from repos.mindmap_repo import MindmapRepository, get_minimap_repo
 
 
+MINDMAP_FLIGHTS: SingleFlight[tuple[str, str], IOResultE[Mindmap]] = single_flight(
+    "mindmap"
+)
+
+
 class MindmapService:
     def __init__(
         self,
         mindmap_repo: MindmapRepository,
+        cpu_pool: CpuPool,
+        flights: SingleFlight[tuple[str, str], IOResultE[Mindmap]],
     ) -> None:
         self.__mindmap_repo = mindmap_repo
+        self.__cpu_pool = cpu_pool
+        self.__flights = flights
 
     async def get_mindmap(
         self, raw_article: RawArticle, language: str
     ) -> IOResultE[Mindmap]:
-        artilce = Article(raw_article.raw_html)
-        text = artilce.plain_text
-        preview_result = await self.__mindmap_repo.get_by_text_and_language(
-            text, language
+        text = await self.__cpu_pool.run(extract_plain_text, raw_article.raw_html)
+        text_hash = content_hash(text)
+        return await self.__flights.do(
+            (text_hash, language),
+            lambda: self.__load_mindmap(text, text_hash, language),
+        )
+
+    async def __load_mindmap(
+        self, text: str, text_hash: str, language: str
+    ) -> IOResultE[Mindmap]:
+        preview_result = await self.__mindmap_repo.get_by_hash_and_language(
+            text_hash, language
         )
         match preview_result:
             case Some(result):
                 return IOSuccess(result)
             case _:
-                return await self.__fetch_mindmap(text, language)
+                return await self.__fetch_mindmap(text, text_hash, language)
 
     @future_safe
-    async def __fetch_mindmap(self, text: str, language: str):
+    async def __fetch_mindmap(self, text: str, text_hash: str, language: str):
         mind_node = await self.__generate_mindmap(text, language)
         return await self.__mindmap_repo.get_or_create(
-            text, language, mind_node.model_dump()
+            text_hash, language, mind_node.model_dump()
         )
 
     async def __generate_mindmap(self, text: str, language: str) -> MindNode:
+        max_tokens = SETTINGS.MINDMAP_CHUNK_TOKENS
+        if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+            return await self.__map_text(text, language)
+
+        chunks = await self.__cpu_pool.run(split_text, text, max_tokens)
+        if len(chunks) == 1:
+            return await self.__map_text(chunks[0], language)
+
+        logger.info("Generating mindmap from {} chunk(s)", len(chunks))
+        semaphore = asyncio.Semaphore(SETTINGS.MINDMAP_PARALLELISM)
+
+        async def map_chunk(index: int, chunk: str) -> MindNode:
+            async with semaphore:
+                return await self.__map_text(chunk, language, (index, len(chunks)))
+
+        trees = await asyncio.gather(
+            *(map_chunk(index, chunk) for index, chunk in enumerate(chunks))
+        )
+        return await self.__reduce_trees(trees, language)
+
+    async def __map_text(
+        self, text: str, language: str, part: tuple[int, int] | None = None
+    ) -> MindNode:
         system_prompt = f"""
     You are a hierarchical knowledge decomposition assistant.
     Your task:
@@ -55,8 +101,15 @@ class MindmapService:
     - All node texts must be in the target language: {language}.
     """
 
+        if part is None:
+            source = "Input text:"
+        else:
+            source = (
+                f"Input text (part {part[0] + 1} of {part[1]} of a longer document):"
+            )
+
         user_prompt = f"""
-    Input text:
+    {source}
     {text}
 
     Generate a mindmap describing the structure of this content.
@@ -71,8 +124,42 @@ class MindmapService:
 
         return result
 
+    async def __reduce_trees(self, trees: list[MindNode], language: str) -> MindNode:
+        system_prompt = f"""
+    You are a hierarchical knowledge decomposition assistant.
+    Your task:
+    - You receive mindmaps of consecutive parts of one document, in order.
+    - Merge them into a single **mindmap** for the whole document.
+    - The root node must summarize the whole document.
+    - Combine topics that appear in several parts; keep the document's order.
+    - Output format MUST be a valid JSON object that follows the MindNode schema.
+    - Keep the structure concise but meaningful.
+    - All node texts must be in the target language: {language}.
+    """
+
+        parts = "\n".join(
+            f"Part {index + 1}: {tree.model_dump_json()}"
+            for index, tree in enumerate(trees)
+        )
+        user_prompt = f"""
+    Partial mindmaps:
+    {parts}
+
+    Merge them into one mindmap.
+    """
+
+        result: MindNode = await invoke_prompts_structured(
+            SETTINGS.MODEL_SPEED,
+            system_prompt,
+            user_prompt,
+            response_model=MindNode,
+        )
+
+        return result
+
 
 async def get_mindmap_service(
     mindmap_repo: MindmapRepository = Depends(get_minimap_repo),
+    cpu_pool: CpuPool = Depends(get_cpu_pool),
 ) -> AsyncGenerator[MindmapService, None]:
-    yield MindmapService(mindmap_repo)
+    yield MindmapService(mindmap_repo, cpu_pool, MINDMAP_FLIGHTS)
@@ -5,25 +5,48 @@ import httpx
 from db_models import RawArticle
 from fastapi import Depends
 from returns.future import future_safe
-from returns.maybe import Maybe
+from returns.maybe import Maybe, Some
 
-from app.core.settings import SETTINGS
+from app.core.http_client import get_http_client
 from repos.raw_article_repo import RawArticleRepository, get_raw_article_repo
 
 
 class RawArticleService:
-    def __init__(self, raw_article_repo: RawArticleRepository) -> None:
+    def __init__(
+        self, raw_article_repo: RawArticleRepository, http_client: httpx.AsyncClient
+    ) -> None:
         self.__raw_article_repo = raw_article_repo
+        self.__http_client = http_client
 
     async def get_or_create(self, url: str, raw_html: str) -> RawArticle:
         return await self.__raw_article_repo.get_or_create(url, raw_html)
 
     @future_safe
     async def fetch_raw_article(self, url: str) -> RawArticle:
-        async with httpx.AsyncClient(timeout=SETTINGS.TIMEOUT_TIME) as client:
-            r = await client.get(url)
-            r.raise_for_status()
-            return await self.get_or_create(url=url, raw_html=r.text)
+        """Fetch ``url``, revalidating the last stored copy when there is one.
+
+        A 304 returns the stored row as is, so its rendered article stays a
+        cache hit downstream.
+        """
+        stored = await self.__raw_article_repo.get_latest_by_url(url)
+        headers = {}
+        match stored:
+            case Some(raw_article):
+                if raw_article.etag:
+                    headers["If-None-Match"] = raw_article.etag
+                if raw_article.last_modified:
+                    headers["If-Modified-Since"] = raw_article.last_modified
+
+        r = await self.__http_client.get(url, headers=headers)
+        if r.status_code == httpx.codes.NOT_MODIFIED and headers:
+            return stored.unwrap()
+        r.raise_for_status()
+        return await self.__raw_article_repo.get_or_create(
+            url,
+            r.text,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+        )
 
     async def get_by_id(self, raw_article_id: UUID) -> Maybe[RawArticle]:
         return await self.__raw_article_repo.get_by_id(raw_article_id)
@@ -31,5 +54,6 @@ class RawArticleService:
 
 async def get_raw_article_service(
     raw_article_repo: RawArticleRepository = Depends(get_raw_article_repo),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
 ) -> AsyncGenerator[RawArticleService, None]:
-    yield RawArticleService(raw_article_repo)
+    yield RawArticleService(raw_article_repo, http_client)
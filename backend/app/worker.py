@@ -0,0 +1,186 @@
+"""Process submitted document tasks in the background.
+
+Run with ``python -m app.worker [--workers N]``. Each worker process claims
+pending tasks from the task table, fetches the URL, runs the article
+pipeline and records the outcome; ``JOB_CONCURRENCY`` tasks run at once
+per process since most of a task is spent waiting on the network or the
+database.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+from datetime import timedelta
+
+from db_models import DocumentProcessTask
+from loguru import logger
+from returns.io import IOFailure, IOSuccess
+from returns.maybe import Some
+from returns.result import Failure, Success
+
+from app.core.cpu_pool import CpuPool
+from app.core.http_client import HTTP_CLIENT
+from app.core.intern_cache import SENTENCE_IDS, WORD_IDS
+from app.core.job_broker import JOB_BROKER, JobBroker
+from app.core.redis_client import close_redis
+from app.core.settings import SETTINGS
+from app.db.engine import AsyncSessionLocal, close_write_queue, engine
+from app.llm.client import CHAT_MODELS
+from app.services.article_service import ArticleService, prewarm_word_ids
+from app.services.raw_article_service import RawArticleService
+from repos.document_process_task_repo import DocumentProcessTaskRepository
+from repos.raw_article_repo import RawArticleRepository
+from repos.rendered_article_repo import RenderedArticleRepository
+from repos.sentence_repo import SentenceRepository
+from repos.word_repo import WordRepository
+
+
+class Worker:
+    def __init__(
+        self,
+        worker_id: str,
+        task_repo: DocumentProcessTaskRepository,
+        raw_article_service: RawArticleService,
+        article_service: ArticleService,
+        broker: JobBroker,
+    ) -> None:
+        self.__worker_id = worker_id
+        self.__task_repo = task_repo
+        self.__raw_article_service = raw_article_service
+        self.__article_service = article_service
+        self.__broker = broker
+        self.__stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Finish the tasks in hand, then return from ``run``."""
+        self.__stopping.set()
+
+    async def run(self, concurrency: int) -> None:
+        await asyncio.gather(
+            *(self.__loop(f"{self.__worker_id}:{slot}") for slot in range(concurrency))
+        )
+
+    async def __loop(self, slot_id: str) -> None:
+        while not self.__stopping.is_set():
+            try:
+                await self.__step(slot_id)
+            except Exception:
+                # A task claimed before the error stays running until it is
+                # requeued as stale.
+                logger.exception(
+                    "Worker slot {} failed, retrying in {}s",
+                    slot_id,
+                    SETTINGS.JOB_ERROR_BACKOFF,
+                )
+                await asyncio.sleep(SETTINGS.JOB_ERROR_BACKOFF)
+
+    async def __step(self, slot_id: str) -> None:
+        match await self.__task_repo.claim(slot_id):
+            case Some(task):
+                await self.__process(slot_id, task)
+            case _:
+                requeued = await self.__task_repo.requeue_stale(
+                    timedelta(seconds=SETTINGS.JOB_STALE_AFTER),
+                    SETTINGS.JOB_MAX_ATTEMPTS,
+                )
+                if requeued:
+                    logger.warning("Requeued {} stale task(s)", requeued)
+                    return
+                await self.__broker.wait()
+
+    async def __process(self, slot_id: str, task: DocumentProcessTask) -> None:
+        logger.info("Task {} attempt {}: {}", task.id, task.attempts, task.url)
+        result = await self.__raw_article_service.fetch_raw_article(task.url).bind(
+            self.__article_service.process_article
+        )
+        match result:
+            case IOSuccess(Success(article)):
+                recorded = await self.__task_repo.succeed(task.id, slot_id, article.id)
+            case IOFailure(Failure(err)):
+                logger.warning("Task {} failed: {}", task.id, err)
+                recorded = await self.__task_repo.fail(
+                    task.id, slot_id, str(err), SETTINGS.JOB_MAX_ATTEMPTS
+                )
+            case _:
+                raise RuntimeError("unreachable")
+        if not recorded:
+            logger.warning("Task {} was requeued while {} ran it", task.id, slot_id)
+
+
+def build_worker(worker_id: str) -> Worker:
+    # This process is itself one of the pool's workers, so the NLP stages run
+    # in threads here instead of a nested process pool.
+    cpu_pool = CpuPool(0)
+    return Worker(
+        worker_id,
+        DocumentProcessTaskRepository(AsyncSessionLocal),
+        RawArticleService(
+            RawArticleRepository(AsyncSessionLocal), HTTP_CLIENT.client()
+        ),
+        ArticleService(
+            WordRepository(AsyncSessionLocal),
+            SentenceRepository(AsyncSessionLocal),
+            RenderedArticleRepository(AsyncSessionLocal),
+            cpu_pool,
+            WORD_IDS,
+            SENTENCE_IDS,
+        ),
+        JOB_BROKER,
+    )
+
+
+async def serve(worker_id: str, concurrency: int) -> None:
+    worker = build_worker(worker_id)
+    if SETTINGS.WORD_ID_PREWARM:
+        await prewarm_word_ids(
+            WordRepository(AsyncSessionLocal), SETTINGS.WORD_ID_PREWARM
+        )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    logger.info("Worker {} started with {} slot(s)", worker_id, concurrency)
+    try:
+        await worker.run(concurrency)
+    finally:
+        await CHAT_MODELS.aclose()
+        await HTTP_CLIENT.aclose()
+        await close_redis()
+        await close_write_queue()
+        await engine.dispose()
+    logger.info("Worker {} stopped", worker_id)
+
+
+def _run_process(concurrency: int) -> None:
+    asyncio.run(serve(f"{socket.gethostname()}:{os.getpid()}", concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--workers", type=int, default=SETTINGS.JOB_WORKERS)
+    parser.add_argument("--concurrency", type=int, default=SETTINGS.JOB_CONCURRENCY)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_run_process, args=(args.concurrency,))
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(*_) -> None:
+        for process in processes:
+            process.terminate()
+
+    # Ctrl-C reaches the children directly through the process group.
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
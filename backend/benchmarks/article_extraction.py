@@ -0,0 +1,100 @@
+"""Compare single-pass and per-property extraction in ``app.domain.Article``.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.article_extraction --repeat 5
+"""
+
+import argparse
+import statistics
+import time
+
+from app.domain import Article
+
+PARAGRAPH = (
+    "Reading a classic is not a duty but a pleasure that returns every time we "
+    "open the book again, and each reading offers as much discovery as the "
+    "first one did. The books we call classics exert a peculiar influence, "
+    "both when they refuse to be eradicated from the mind and when they "
+    "conceal themselves in the folds of memory."
+)
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Why we read classics</title>
+<meta name="author" content="Italo Calvino">
+<meta name="description" content="An essay on the books we keep rereading.">
+<meta property="og:site_name" content="Benchmark Press">
+<meta property="article:published_time" content="2024-05-01">
+</head>
+<body>
+<header><nav>{nav}</nav></header>
+<aside>{aside}</aside>
+<main><article>
+<h1>Why we read classics</h1>
+<p class="byline">By Italo Calvino</p>
+{paragraphs}
+</article></main>
+<footer>{footer}</footer>
+</body>
+</html>
+"""
+
+
+def build_page(paragraphs: int) -> str:
+    return PAGE_TEMPLATE.format(
+        nav="".join(f'<a href="/section/{i}">Section {i}</a>' for i in range(30)),
+        aside="".join(
+            f'<p><a href="/related/{i}">Related {i}</a></p>' for i in range(20)
+        ),
+        paragraphs="\n".join(
+            f"<h2>Part {i}</h2>" if i % 10 == 0 else f"<p>{PARAGRAPH} ({i})</p>"
+            for i in range(paragraphs)
+        ),
+        footer="".join(f'<a href="/legal/{i}">Legal {i}</a>' for i in range(10)),
+    )
+
+
+def extract_all(raw_html: str, single_pass: bool) -> tuple[str, ...]:
+    article = Article(raw_html, single_pass=single_pass)
+    return (
+        article.full_html,
+        article.plain_text,
+        article.content,
+        article.title,
+        article.author,
+    )
+
+
+def measure(raw_html: str, single_pass: bool, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract_all(raw_html, single_pass)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000, 3000])
+    args = parser.parse_args()
+
+    print(
+        f"{'paragraphs':>10} {'KiB':>8} {'legacy ms':>10} {'single ms':>10} {'speedup':>8}"
+    )
+    for size in args.sizes:
+        raw_html = build_page(size)
+        legacy = measure(raw_html, single_pass=False, repeat=args.repeat)
+        single = measure(raw_html, single_pass=True, repeat=args.repeat)
+        print(
+            f"{size:>10} {len(raw_html.encode()) / 1024:>8.0f} "
+            f"{legacy * 1000:>10.1f} {single * 1000:>10.1f} {legacy / single:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
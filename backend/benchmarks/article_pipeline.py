@@ -0,0 +1,353 @@
+"""Time the article pipeline stage by stage on the saved corpus.
+
+Run from the ``backend`` directory, with the spaCy models and frequency
+tables of the benchmarked languages installed::
+
+    python -m benchmarks.article_pipeline --repeat 5
+    python -m benchmarks.article_pipeline --save-baseline
+
+Stages, per page of ``benchmarks/pages``:
+
+* ``extract``: ``Article`` extraction and the split into top-level blocks.
+* ``tokenize``: DOM text nodes of every block through spaCy.
+* ``hard_words``: the hard-word threshold and the set of hard lemmas.
+* ``render``: sentence and word ids written back into the HTML.
+* ``process_article``: ``ArticleService.process_article`` end to end on a
+  fresh SQLite database (in memory, or a file with ``--db sqlite``), so
+  interning and storing the rendering are included.
+
+Each stage reports its median wall time, throughput in article tokens per
+second and peak Python memory; memory is traced in a separate, untimed run
+so tracing does not skew the timings. Results are compared with the
+baseline file when it exists, and the exit status is 1 when a stage got
+slower or bigger than ``--tolerance`` allows. Nothing touches the network.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from db_models import Base, RawArticle
+from db_models.sqlite import configure_sqlite
+from langdetect import DetectorFactory
+from loguru import logger
+from returns.io import IOFailure, IOSuccess
+from returns.result import Failure, Success
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.cpu_pool import CpuPool
+from app.core.intern_cache import InternCache
+from app.core.settings import SETTINGS
+from app.nlp.pipeline import (
+    ArticleAnalysis,
+    _get_hard_words,
+    analyze_blocks,
+    extract_outline,
+    hard_word_threshold,
+    lemmas,
+    pipeline_version,
+    render_article,
+    sentence_texts,
+    word_texts,
+)
+from app.services.article_service import ArticleService
+from benchmarks.corpus import PHRASES, SIZES, Page, load_pages
+from repos.rendered_article_repo import RenderedArticleRepository
+from repos.sentence_repo import SentenceRepository
+from repos.word_repo import WordRepository
+
+STAGES = ("extract", "tokenize", "hard_words", "render", "process_article")
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+BASELINE_FORMAT = 1
+
+
+@dataclass(frozen=True)
+class StageResult:
+    ms: float
+    tokens_per_s: float
+    peak_kib: float
+
+
+def measure(call: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    """Median seconds over ``repeat`` calls, and the peak bytes of one more."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+@dataclass(frozen=True)
+class Fixture:
+    run: Callable[[], Awaitable[Any]]
+    close: Callable[[], Awaitable[None]]
+
+
+async def measure_async(
+    prepare: Callable[[], Awaitable[Fixture]], repeat: int
+) -> tuple[float, int]:
+    """Like :func:`measure`, with a fresh fixture for every call; preparing
+    and closing it are not timed."""
+    timings = []
+    for _ in range(repeat):
+        fixture = await prepare()
+        try:
+            start = time.perf_counter()
+            await fixture.run()
+            timings.append(time.perf_counter() - start)
+        finally:
+            await fixture.close()
+    fixture = await prepare()
+    try:
+        tracemalloc.start()
+        try:
+            await fixture.run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        await fixture.close()
+    return statistics.median(timings), peak
+
+
+def fake_ids(texts: list[str]) -> dict[str, str]:
+    return {text: str(uuid.uuid4()) for text in dict.fromkeys(texts)}
+
+
+async def process_article_fixture(raw_html: str, db: str, work_dir: Path) -> Fixture:
+    """An ``ArticleService`` on a fresh database and empty id caches, ready to
+    process ``raw_html`` once."""
+    if db == "sqlite":
+        url = f"sqlite+aiosqlite:///{work_dir / f'{uuid.uuid4()}.db'}"
+        engine = create_async_engine(url)
+        configure_sqlite(engine)
+    else:
+        engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    raw_article = RawArticle(
+        id=uuid.uuid4(), url="https://bench.invalid/", raw_html=raw_html
+    )
+    async with session_maker.begin() as session:
+        session.add(raw_article)
+
+    service = ArticleService(
+        WordRepository(session_maker),
+        SentenceRepository(session_maker),
+        RenderedArticleRepository(session_maker),
+        CpuPool(0),
+        InternCache(SETTINGS.WORD_ID_CACHE_SIZE),
+        InternCache(SETTINGS.SENTENCE_ID_CACHE_SIZE),
+    )
+
+    async def run() -> None:
+        match await service.process_article(raw_article):
+            case IOSuccess(Success(_)):
+                pass
+            case IOFailure(Failure(err)):
+                raise err
+
+    return Fixture(run, engine.dispose)
+
+
+def bench_page(
+    page: Page, stages: list[str], repeat: int, db: str, work_dir: Path
+) -> dict[str, StageResult]:
+    outline = extract_outline(page.raw_html)
+    blocks = analyze_blocks(outline.language, outline.blocks)
+    sample = lemmas(blocks)
+    threshold = hard_word_threshold(outline.language, sample)
+    analysis = ArticleAnalysis(
+        title=outline.title,
+        author=outline.author,
+        language=outline.language,
+        blocks=blocks,
+        hard_word_threshold=threshold,
+    )
+    sentence_ids = fake_ids(sentence_texts(blocks))
+    word_ids = fake_ids(word_texts(blocks))
+    tokens = len(sample)
+
+    def hard_words() -> None:
+        _get_hard_words(
+            sample,
+            outline.language,
+            hard_word_threshold(outline.language, sample),
+        )
+
+    calls: dict[str, Callable[[], Any]] = {
+        "extract": lambda: extract_outline(page.raw_html),
+        "tokenize": lambda: analyze_blocks(outline.language, outline.blocks),
+        "hard_words": hard_words,
+        "render": lambda: render_article(analysis, sentence_ids, word_ids),
+    }
+
+    results: dict[str, StageResult] = {}
+    for stage in stages:
+        if stage == "process_article":
+            seconds, peak = asyncio.run(
+                measure_async(
+                    lambda: process_article_fixture(page.raw_html, db, work_dir),
+                    repeat,
+                )
+            )
+        else:
+            seconds, peak = measure(calls[stage], repeat)
+        results[stage] = StageResult(
+            ms=seconds * 1000,
+            tokens_per_s=tokens / seconds if seconds else 0.0,
+            peak_kib=peak / 1024,
+        )
+    return results
+
+
+def load_baseline(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    if baseline.get("format") != BASELINE_FORMAT:
+        print(f"Ignoring {path}: unknown baseline format", file=sys.stderr)
+        return None
+    return baseline
+
+
+def compare(current: StageResult, base: dict | None, tolerance: float) -> str:
+    """Time and peak memory relative to the baseline, marked ``!`` when
+    either grew by more than ``tolerance``."""
+    if base is None:
+        return ""
+    time_change = current.ms / base["ms"] - 1 if base["ms"] else 0.0
+    peak_change = current.peak_kib / base["peak_kib"] - 1 if base["peak_kib"] else 0.0
+    flag = " !" if max(time_change, peak_change) > tolerance else ""
+    return f"{time_change:+7.1%} {peak_change:+7.1%}{flag}"
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "pipeline_version": pipeline_version(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument(
+        "--languages", nargs="+", choices=list(PHRASES), default=list(PHRASES)
+    )
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--db",
+        choices=["memory", "sqlite"],
+        default="memory",
+        help="database behind process_article (default memory)",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="write these results to --baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="relative growth in time or memory reported as a regression",
+    )
+    args = parser.parse_args()
+
+    # Language detection is randomised unless seeded.
+    DetectorFactory.seed = 0
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    if baseline is not None and baseline["environment"] != environment():
+        print(
+            f"Baseline environment differs: {baseline['environment']}",
+            file=sys.stderr,
+        )
+
+    pages = load_pages(args.languages, args.sizes)
+    results: dict[str, dict[str, StageResult]] = {}
+    regressions = 0
+    print(
+        f"{'page':<14} {'stage':<16} {'ms':>10} {'tokens/s':>11} {'peak KiB':>10}"
+        + (f" {'time':>7} {'memory':>7}" if baseline is not None else "")
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        for page in pages:
+            # Untimed run loading the language's model and frequency table.
+            bench_page(page, args.stages, 1, args.db, Path(work_dir))
+            results[page.name] = bench_page(
+                page, args.stages, args.repeat, args.db, Path(work_dir)
+            )
+            for stage, result in results[page.name].items():
+                base = (
+                    baseline["pages"].get(page.name, {}).get(stage)
+                    if baseline is not None
+                    else None
+                )
+                change = compare(result, base, args.tolerance)
+                regressions += change.endswith("!")
+                print(
+                    f"{page.name:<14} {stage:<16} {result.ms:>10.1f} "
+                    f"{result.tokens_per_s:>11,.0f} {result.peak_kib:>10,.0f} {change}"
+                )
+
+    max_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Peak RSS of the run: {max_rss_mib:,.0f} MiB")
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "format": BASELINE_FORMAT,
+                    "environment": environment(),
+                    "repeat": args.repeat,
+                    "pages": {
+                        name: {
+                            stage: asdict(result) for stage, result in stages.items()
+                        }
+                        for name, stages in results.items()
+                    },
+                },
+                indent=2,
+                ensure_ascii=False,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        print(f"Saved baseline to {args.baseline}")
+    elif baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to store one")
+    elif regressions:
+        print(f"{regressions} stage(s) regressed beyond {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+"""Saved HTML pages used by the pipeline benchmarks.
+
+The pages in ``benchmarks/pages`` are checked in so every run reads the same
+bytes. They were generated by this module, which can rebuild them::
+
+    python -m benchmarks.corpus
+
+Each page wraps a synthetic article in the boilerplate of a news site
+(navigation, related links, scripts, comments, footer) so that extraction
+has something to discard. Sentences are drawn from per-language phrase
+tables with a fixed seed: the text reads naturally enough for the
+tokenizers, and repeats little, so interning sees realistic cache misses.
+"""
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+PAGES_DIR = Path(__file__).parent / "pages"
+
+# Paragraphs per article body.
+SIZES = {"small": 8, "medium": 60, "large": 300}
+
+
+@dataclass(frozen=True)
+class Page:
+    name: str
+    language: str
+    size: str
+    raw_html: str
+
+
+@dataclass(frozen=True)
+class _Phrases:
+    lang: str
+    title: str
+    author: str
+    subjects: tuple[str, ...]
+    verbs: tuple[str, ...]
+    objects: tuple[str, ...]
+    settings: tuple[str, ...]
+    headings: tuple[str, ...]
+    boilerplate: tuple[str, ...]
+
+    def sentence(self, rng: random.Random) -> str:
+        subject = rng.choice(self.subjects)
+        verb = rng.choice(self.verbs)
+        obj = rng.choice(self.objects)
+        setting = rng.choice(self.settings)
+        match self.lang:
+            case "en":
+                return f"{subject} {verb} {obj} {setting}."
+            case "zh-cn":
+                return f"{setting}，{subject}{verb}{obj}。"
+            case "ja":
+                return f"{subject}は{setting}、{obj}を{verb}。"
+            case _:
+                raise ValueError(self.lang)
+
+
+_EN = _Phrases(
+    lang="en",
+    title="How a small river town rebuilt its library",
+    author="Margaret Ellison",
+    subjects=(
+        "The city council",
+        "A young engineer",
+        "Our neighbours",
+        "The old librarian",
+        "Most economists",
+        "The research team",
+        "A retired teacher",
+        "The festival committee",
+        "Several volunteers",
+        "The regional newspaper",
+        "Her grandmother",
+        "The museum director",
+        "A group of students",
+        "The local bakery",
+        "The harbour master",
+        "Two historians",
+        "The mayor's office",
+        "An anonymous donor",
+        "The school choir",
+        "Independent architects",
+    ),
+    verbs=(
+        "announced",
+        "discovered",
+        "rebuilt",
+        "questioned",
+        "celebrated",
+        "documented",
+        "postponed",
+        "translated",
+        "borrowed",
+        "repainted",
+        "measured",
+        "defended",
+        "abandoned",
+        "inherited",
+        "photographed",
+        "restored",
+        "criticised",
+        "catalogued",
+        "negotiated",
+        "rediscovered",
+    ),
+    objects=(
+        "a forgotten collection of maps",
+        "the crumbling stone bridge",
+        "an ambitious plan for the waterfront",
+        "the budget for the coming decade",
+        "a series of handwritten letters",
+        "the stained glass in the reading room",
+        "an unusual agreement with the railway",
+        "the neglected gardens behind the hall",
+        "a controversial proposal about parking",
+        "the archive of nineteenth-century photographs",
+        "several rare botanical illustrations",
+        "the tradition of the autumn market",
+        "a surprisingly detailed census record",
+        "the oak shelves donated by the mill",
+        "an exhibition about flood defences",
+        "the timetable of the evening ferry",
+        "a manuscript describing the first bridge",
+        "the foundations of the customs house",
+        "a petition signed by three thousand residents",
+        "the clock above the market square",
+    ),
+    settings=(
+        "after months of careful negotiation",
+        "despite the objections of several councillors",
+        "during an unusually wet spring",
+        "before the river flooded the lower streets",
+        "with help from the university",
+        "while the main hall was closed for repairs",
+        "in front of a surprisingly large crowd",
+        "without telling the national press",
+        "as part of a long-term restoration effort",
+        "once the insurance claim had been settled",
+        "to the delight of the younger readers",
+        "at a meeting that lasted well past midnight",
+        "on the first morning of the harvest festival",
+        "although nobody could agree on the cost",
+        "shortly after the old printing works closed",
+    ),
+    headings=(
+        "A building with a long memory",
+        "The flood of the century",
+        "Money, patience and volunteers",
+        "What the archive revealed",
+        "Opening day",
+        "Looking ahead",
+    ),
+    boilerplate=(
+        "Home",
+        "World",
+        "Business",
+        "Culture",
+        "Science",
+        "Opinion",
+        "Sport",
+        "Travel",
+    ),
+)
+
+_ZH = _Phrases(
+    lang="zh-cn",
+    title="一座河边小镇如何重建它的图书馆",
+    author="林晓雯",
+    subjects=(
+        "市政府",
+        "一位年轻的工程师",
+        "我们的邻居",
+        "老图书管理员",
+        "大多数经济学家",
+        "研究团队",
+        "一位退休教师",
+        "节日筹备委员会",
+        "几位志愿者",
+        "地方报纸",
+        "她的祖母",
+        "博物馆馆长",
+        "一群大学生",
+        "街角的面包店",
+        "港口管理员",
+        "两位历史学家",
+        "市长办公室",
+        "一位匿名捐赠者",
+        "学校合唱团",
+        "独立建筑师",
+    ),
+    verbs=(
+        "宣布了",
+        "发现了",
+        "重建了",
+        "质疑了",
+        "庆祝了",
+        "记录了",
+        "推迟了",
+        "翻译了",
+        "借走了",
+        "重新粉刷了",
+        "测量了",
+        "捍卫了",
+        "放弃了",
+        "继承了",
+        "拍摄了",
+        "修复了",
+        "批评了",
+        "整理了",
+        "谈妥了",
+        "重新发现了",
+    ),
+    objects=(
+        "一批被遗忘的旧地图",
+        "那座摇摇欲坠的石桥",
+        "一项雄心勃勃的滨水区计划",
+        "未来十年的预算",
+        "一系列手写的信件",
+        "阅览室里的彩色玻璃",
+        "与铁路公司之间一份不寻常的协议",
+        "大厅后面荒废已久的花园",
+        "一项关于停车的争议提案",
+        "十九世纪照片档案",
+        "几幅珍贵的植物插图",
+        "秋季集市的传统",
+        "一份出奇详细的人口普查记录",
+        "磨坊捐赠的橡木书架",
+        "一场关于防洪工程的展览",
+        "晚班渡轮的时刻表",
+        "一份描述第一座桥的手稿",
+        "海关大楼的地基",
+        "三千名居民签名的请愿书",
+        "集市广场上方的大钟",
+    ),
+    settings=(
+        "经过几个月的谨慎协商",
+        "尽管几位议员表示反对",
+        "在一个格外多雨的春天",
+        "在河水淹没低处街道之前",
+        "在大学的帮助下",
+        "在主厅因维修而关闭期间",
+        "当着一大群围观者的面",
+        "在没有通知全国媒体的情况下",
+        "作为长期修复工作的一部分",
+        "保险理赔结束之后",
+        "令年轻读者们十分高兴的是",
+        "在一场持续到深夜的会议上",
+        "在丰收节的第一个早晨",
+        "虽然没有人能就费用达成一致",
+        "老印刷厂关闭后不久",
+    ),
+    headings=(
+        "一座有着漫长记忆的建筑",
+        "百年一遇的洪水",
+        "资金、耐心与志愿者",
+        "档案揭示了什么",
+        "开馆之日",
+        "展望未来",
+    ),
+    boilerplate=("首页", "国际", "财经", "文化", "科技", "评论", "体育", "旅游"),
+)
+
+_JA = _Phrases(
+    lang="ja",
+    title="川沿いの小さな町が図書館を再建するまで",
+    author="佐藤美咲",
+    subjects=(
+        "市議会",
+        "若い技術者",
+        "近所の人たち",
+        "年配の司書",
+        "多くの経済学者",
+        "研究チーム",
+        "退職した教師",
+        "祭りの実行委員会",
+        "何人かのボランティア",
+        "地元の新聞社",
+        "彼女の祖母",
+        "博物館の館長",
+        "大学生のグループ",
+        "角のパン屋",
+        "港の管理人",
+        "二人の歴史家",
+        "市長室",
+        "匿名の寄付者",
+        "学校の合唱団",
+        "独立系の建築家",
+    ),
+    verbs=(
+        "発表しました",
+        "発見しました",
+        "再建しました",
+        "疑問視しました",
+        "祝いました",
+        "記録しました",
+        "延期しました",
+        "翻訳しました",
+        "借りました",
+        "塗り直しました",
+        "測量しました",
+        "擁護しました",
+        "断念しました",
+        "受け継ぎました",
+        "撮影しました",
+        "修復しました",
+        "批判しました",
+        "整理しました",
+        "まとめました",
+        "再発見しました",
+    ),
+    objects=(
+        "忘れられていた古い地図の束",
+        "崩れかけた石橋",
+        "川沿いの地区の大胆な計画",
+        "今後十年の予算",
+        "手書きの手紙の束",
+        "閲覧室のステンドグラス",
+        "鉄道会社との珍しい協定",
+        "ホールの裏の荒れた庭",
+        "駐車場をめぐる議論の多い提案",
+        "十九世紀の写真の資料",
+        "貴重な植物画",
+        "秋の市場の伝統",
+        "驚くほど詳しい国勢調査の記録",
+        "製粉所から寄贈された樫の本棚",
+        "洪水対策についての展示",
+        "夜の渡し船の時刻表",
+        "最初の橋について書かれた写本",
+        "税関の建物の土台",
+        "三千人の住民が署名した請願書",
+        "市場の広場の上の時計",
+    ),
+    settings=(
+        "何か月にもわたる慎重な交渉の末に",
+        "何人かの議員の反対にもかかわらず",
+        "雨の多い春の間に",
+        "川が低い通りにあふれる前に",
+        "大学の協力を得て",
+        "本館が改修のために閉まっている間に",
+        "大勢の見物人の前で",
+        "全国紙に知らせないまま",
+        "長期的な修復事業の一環として",
+        "保険の手続きが終わってから",
+        "若い読者たちが喜ぶなかで",
+        "夜遅くまで続いた会議で",
+        "収穫祭の最初の朝に",
+        "費用について誰も合意できなかったが",
+        "古い印刷所が閉じてまもなく",
+    ),
+    headings=(
+        "長い記憶を持つ建物",
+        "百年に一度の洪水",
+        "資金と忍耐とボランティア",
+        "資料が明らかにしたこと",
+        "開館の日",
+        "これから",
+    ),
+    boilerplate=(
+        "ホーム",
+        "国際",
+        "経済",
+        "文化",
+        "科学",
+        "オピニオン",
+        "スポーツ",
+        "旅行",
+    ),
+)
+
+PHRASES = {phrases.lang: phrases for phrases in (_EN, _ZH, _JA)}
+
+_PAGE = """<!DOCTYPE html>
+<html lang="{lang}">
+<head>
+<meta charset="utf-8">
+<title>{title} | Riverside Herald</title>
+<meta name="author" content="{author}">
+<meta name="description" content="{description}">
+<meta property="og:site_name" content="Riverside Herald">
+<meta property="article:published_time" content="2024-09-14">
+<link rel="stylesheet" href="/static/site.css">
+<script>window.dataLayer = window.dataLayer || []; dataLayer.push({{"page": "article"}});</script>
+</head>
+<body>
+<header class="site-header">
+<a class="logo" href="/">Riverside Herald</a>
+<nav><ul>{nav}</ul></nav>
+<form class="search" action="/search"><input name="q" type="search"></form>
+</header>
+<div class="ad-slot" id="top-banner"><a href="/ads/1">{ad}</a></div>
+<main>
+<article>
+<h1>{title}</h1>
+<p class="byline">{author}</p>
+<time datetime="2024-09-14">2024-09-14</time>
+{body}
+</article>
+<section class="comments"><h3>{comments_title}</h3>{comments}</section>
+</main>
+<aside class="related"><h3>{related_title}</h3><ul>{related}</ul></aside>
+<footer><p>&copy; 2024 Riverside Herald</p><ul>{footer}</ul></footer>
+<script src="/static/analytics.js" async></script>
+</body>
+</html>
+"""
+
+
+def build_page(language: str, paragraphs: int, seed: int = 0) -> str:
+    phrases = PHRASES[language]
+    rng = random.Random(f"{language}:{paragraphs}:{seed}")
+    joiner = " " if language == "en" else ""
+
+    def paragraph() -> str:
+        return joiner.join(phrases.sentence(rng) for _ in range(rng.randint(3, 6)))
+
+    body: list[str] = []
+    for i in range(paragraphs):
+        if i and i % 12 == 0:
+            body.append(
+                f"<h2>{phrases.headings[(i // 12) % len(phrases.headings)]}</h2>"
+            )
+        match i % 17:
+            case 5:
+                body.append(f"<blockquote><p>{paragraph()}</p></blockquote>")
+            case 9:
+                items = "".join(f"<li>{phrases.sentence(rng)}</li>" for _ in range(4))
+                body.append(f"<ul>{items}</ul>")
+            case 13:
+                body.append(
+                    f"<p><strong>{phrases.sentence(rng)}</strong> "
+                    f"<em>{phrases.sentence(rng)}</em> {paragraph()}</p>"
+                )
+            case _:
+                body.append(f"<p>{paragraph()}</p>")
+    if paragraphs >= 17:
+        body.append("<pre>flood_level_cm = [112, 140, 187, 203]</pre>")
+
+    links = phrases.boilerplate
+    return _PAGE.format(
+        lang=language,
+        title=phrases.title,
+        author=phrases.author,
+        description=phrases.sentence(rng),
+        nav="".join(
+            f'<li><a href="/{i}">{name}</a></li>' for i, name in enumerate(links)
+        ),
+        ad=phrases.sentence(rng),
+        body="\n".join(body),
+        comments_title=links[5],
+        comments="".join(
+            f'<div class="comment"><p>{phrases.sentence(rng)}</p></div>'
+            for _ in range(5)
+        ),
+        related_title=links[3],
+        related="".join(
+            f'<li><a href="/related/{i}">{phrases.sentence(rng)}</a></li>'
+            for i in range(8)
+        ),
+        footer="".join(
+            f'<li><a href="/about/{i}">{name}</a></li>' for i, name in enumerate(links)
+        ),
+    )
+
+
+def page_name(language: str, size: str) -> str:
+    return f"{language}-{size}"
+
+
+def load_pages(
+    languages: list[str] | None = None, sizes: list[str] | None = None
+) -> list[Page]:
+    pages = []
+    for language in languages or list(PHRASES):
+        for size in sizes or list(SIZES):
+            name = page_name(language, size)
+            raw_html = (PAGES_DIR / f"{name}.html").read_text(encoding="utf-8")
+            pages.append(Page(name, language, size, raw_html))
+    return pages
+
+
+def main() -> None:
+    PAGES_DIR.mkdir(exist_ok=True)
+    for language in PHRASES:
+        for size, paragraphs in SIZES.items():
+            path = PAGES_DIR / f"{page_name(language, size)}.html"
+            path.write_text(build_page(language, paragraphs), encoding="utf-8")
+            print(f"{path.name}: {path.stat().st_size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""mindmap text hash
+
+Revision ID: 07e12b9bdfa1
+Revises: ce6b22fb1b5c
+Create Date: 2026-10-18 03:01:05.495027
+
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '07e12b9bdfa1'
+down_revision: Union[str, Sequence[str], None] = 'ce6b22fb1b5c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def _content_hash(text: str | None) -> str:
+    # Frozen copy of repos.hashing.content_hash at the time of this revision.
+    normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFC", text or "")).strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def _backfill_text_hash() -> None:
+    bind = op.get_bind()
+    mindmap = sa.table(
+        "mindmap",
+        sa.column("id", sa.Integer),
+        sa.column("text", sa.Text),
+        sa.column("text_hash", sa.Text),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(mindmap.c.id, mindmap.c.text)
+            .where(mindmap.c.id > last_id)
+            .order_by(mindmap.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.update(mindmap)
+            .where(mindmap.c.id == sa.bindparam("row_id"))
+            .values(text_hash=sa.bindparam("row_hash")),
+            [{"row_id": row.id, "row_hash": _content_hash(row.text)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('mindmap', sa.Column('text_hash', sa.Text(), nullable=True))
+    _backfill_text_hash()
+    # Keep the oldest mindmap of every (text_hash, language) group so the
+    # unique index can be created.
+    op.execute(
+        """
+        DELETE FROM mindmap
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM mindmap GROUP BY text_hash, language
+        )
+        """
+    )
+    op.create_index('ix_mindmap_text_hash_language', 'mindmap', ['text_hash', 'language'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_mindmap_text_hash_language', table_name='mindmap')
+    op.drop_column('mindmap', 'text_hash')
@@ -0,0 +1,47 @@
+"""document process task queue
+
+Revision ID: 70313beba941
+Revises: 07e12b9bdfa1
+Create Date: 2026-10-18 03:04:05.269089
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '70313beba941'
+down_revision: Union[str, Sequence[str], None] = '07e12b9bdfa1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Batch mode so the foreign key can be added on SQLite as well.
+    with op.batch_alter_table('document_process_task') as batch_op:
+        batch_op.add_column(sa.Column('url', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('worker_id', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('raw_article_id', sa.UUID(), nullable=True))
+        batch_op.add_column(sa.Column('error', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('started_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.create_index('ix_document_process_task_status_id', ['status', 'id'], unique=False)
+        batch_op.create_foreign_key(op.f('fk_document_process_task_raw_article_id_raw_article'), 'raw_article', ['raw_article_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('document_process_task') as batch_op:
+        batch_op.drop_constraint(op.f('fk_document_process_task_raw_article_id_raw_article'), type_='foreignkey')
+        batch_op.drop_index('ix_document_process_task_status_id')
+        batch_op.drop_column('finished_at')
+        batch_op.drop_column('started_at')
+        batch_op.drop_column('error')
+        batch_op.drop_column('raw_article_id')
+        batch_op.drop_column('worker_id')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('url')
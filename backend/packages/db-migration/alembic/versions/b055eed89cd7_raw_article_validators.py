@@ -0,0 +1,32 @@
+"""raw article validators
+
+Revision ID: b055eed89cd7
+Revises: 70313beba941
+Create Date: 2026-10-18 03:12:50.139475
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b055eed89cd7'
+down_revision: Union[str, Sequence[str], None] = '70313beba941'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('raw_article', sa.Column('etag', sa.Text(), nullable=True))
+    op.add_column('raw_article', sa.Column('last_modified', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_raw_article_url'), 'raw_article', ['url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_raw_article_url'), table_name='raw_article')
+    op.drop_column('raw_article', 'last_modified')
+    op.drop_column('raw_article', 'etag')
@@ -0,0 +1,146 @@
+"""article content hash and binary html
+
+Revision ID: bb2b619e1409
+Revises: b055eed89cd7
+Create Date: 2026-10-18 03:14:40.099407
+
+"""
+import hashlib
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb2b619e1409'
+down_revision: Union[str, Sequence[str], None] = 'b055eed89cd7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# Every zstd frame starts with these bytes; valid UTF-8 text never does.
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+HTML_COLUMNS = {"raw_article": ["raw_html"], "article": ["raw_html", "clean_html"]}
+
+
+def _digest(text: str | None) -> str:
+    # Frozen copy of repos.hashing.digest at the time of this revision.
+    return hashlib.sha256((text or "").encode()).hexdigest()
+
+
+def _backfill_content_hash(table_name: str) -> None:
+    bind = op.get_bind()
+    table = sa.table(
+        table_name,
+        sa.column("id"),
+        sa.column("raw_html", sa.Text),
+        sa.column("content_hash", sa.Text),
+    )
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c.raw_html)
+            .where(table.c.content_hash.is_(None))
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.update(table)
+            .where(table.c.id == sa.bindparam("row_id"))
+            .values(content_hash=sa.bindparam("row_hash")),
+            [{"row_id": row.id, "row_hash": _digest(row.raw_html)} for row in rows],
+        )
+
+
+def _rewrite_html(table_name: str, convert) -> None:
+    """Apply ``convert`` to every stored HTML value of ``table_name``."""
+    bind = op.get_bind()
+    columns = HTML_COLUMNS[table_name]
+    table = sa.table(
+        table_name,
+        sa.column("id"),
+        *(sa.column(name, sa.LargeBinary) for name in columns),
+    )
+    ids = bind.execute(sa.select(table.c.id)).scalars().all()
+    for start in range(0, len(ids), BATCH_SIZE):
+        rows = bind.execute(
+            sa.select(table).where(table.c.id.in_(ids[start : start + BATCH_SIZE]))
+        ).all()
+        bind.execute(
+            sa.update(table)
+            .where(table.c.id == sa.bindparam("row_id"))
+            .values({name: sa.bindparam(f"new_{name}") for name in columns}),
+            [
+                {
+                    "row_id": row.id,
+                    **{f"new_{name}": convert(getattr(row, name)) for name in columns},
+                }
+                for row in rows
+            ],
+        )
+
+
+def _compressor(level: int):
+    import zstandard
+
+    compressor = zstandard.ZstdCompressor(level=level)
+
+    def compress(value: bytes | None) -> bytes | None:
+        if value is None or bytes(value).startswith(ZSTD_MAGIC):
+            return value
+        return compressor.compress(bytes(value))
+
+    return compress
+
+
+def _decompress(value: bytes | None) -> bytes | None:
+    if value is None or not bytes(value).startswith(ZSTD_MAGIC):
+        return value
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompress(bytes(value))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, columns in HTML_COLUMNS.items():
+        op.add_column(table_name, sa.Column('content_hash', sa.Text(), nullable=True))
+        _backfill_content_hash(table_name)
+        op.create_index(op.f(f'ix_{table_name}_content_hash'), table_name, ['content_hash'], unique=False)
+        with op.batch_alter_table(table_name) as batch_op:
+            for name in columns:
+                batch_op.alter_column(
+                    name,
+                    existing_type=sa.Text(),
+                    type_=sa.LargeBinary(),
+                    existing_nullable=True,
+                    postgresql_using=f"convert_to({name}, 'UTF8')",
+                )
+
+    # Stored HTML is only compressed here when asked for; otherwise rows stay
+    # plain UTF-8 and new ones follow HTML_COMPRESSION_LEVEL at runtime.
+    level = int(os.getenv("HTML_COMPRESSION_LEVEL", "0"))
+    if level > 0:
+        for table_name in HTML_COLUMNS:
+            _rewrite_html(table_name, _compressor(level))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, columns in HTML_COLUMNS.items():
+        _rewrite_html(table_name, _decompress)
+        with op.batch_alter_table(table_name) as batch_op:
+            for name in columns:
+                batch_op.alter_column(
+                    name,
+                    existing_type=sa.LargeBinary(),
+                    type_=sa.Text(),
+                    existing_nullable=True,
+                    postgresql_using=f"convert_from({name}, 'UTF8')",
+                )
+        op.drop_index(op.f(f'ix_{table_name}_content_hash'), table_name=table_name)
+        op.drop_column(table_name, 'content_hash')
@@ -6,9 +6,11 @@ from sqlalchemy import (
     UUID,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     MetaData,
     Text,
+    UniqueConstraint,
     func,
 )
 from sqlalchemy import (
@@ -16,6 +18,8 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from .compressed_text import CompressedText
+
 convention = {
     "ix": "ix_%(column_0_label)s",
     "uq": "uq_%(table_name)s_%(column_0_name)s",
@@ -61,11 +65,20 @@ class Word(Base):
 
 class WordLookup(Base):
     __tablename__ = "word_lookups"
+    __table_args__ = (
+        Index(
+            "ix_word_lookups_sentence_id_word_id_language",
+            "sentence_id",
+            "word_id",
+            "language",
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
     sentence_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("sentences.id"), nullable=True, index=True
+        ForeignKey("sentences.id"), nullable=True
     )
     word_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("words.id"), nullable=True, index=True
@@ -88,8 +101,10 @@ class Article(Base):
 
     url: Mapped[str] = mapped_column(Text, nullable=True)
 
-    raw_html: Mapped[str] = mapped_column(Text, nullable=True)
-    clean_html: Mapped[str] = mapped_column(Text, nullable=True)
+    raw_html: Mapped[str] = mapped_column(CompressedText, nullable=True)
+    clean_html: Mapped[str] = mapped_column(CompressedText, nullable=True)
+    # repos.hashing.digest of raw_html, so duplicates are found by index.
+    content_hash: Mapped[str] = mapped_column(Text, nullable=True, index=True)
 
     language: Mapped[str] = mapped_column(Text, nullable=True)
     site_name: Mapped[str] = mapped_column(Text, nullable=True)
@@ -111,8 +126,32 @@ class RawArticle(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
 
-    url: Mapped[str] = mapped_column(Text, nullable=True)
-    raw_html: Mapped[str] = mapped_column(Text, nullable=True)
+    url: Mapped[str] = mapped_column(Text, nullable=True, index=True)
+    raw_html: Mapped[str] = mapped_column(CompressedText, nullable=True)
+    # repos.hashing.digest of raw_html, so duplicates are found by index.
+    content_hash: Mapped[str] = mapped_column(Text, nullable=True, index=True)
+    # Validators from the response, sent back on refetch as a conditional GET.
+    etag: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+
+class RenderedArticle(Base):
+    __tablename__ = "rendered_article"
+    __table_args__ = (UniqueConstraint("raw_article_id", "version"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    raw_article_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("raw_article.id"))
+    version: Mapped[str] = mapped_column(Text)
+
+    title: Mapped[str] = mapped_column(Text, nullable=True)
+    author: Mapped[str] = mapped_column(Text, nullable=True)
+    language: Mapped[str] = mapped_column(Text, nullable=True)
+    html: Mapped[str] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -121,9 +160,14 @@ class RawArticle(Base):
 
 class Mindmap(Base):
     __tablename__ = "mindmap"
+    __table_args__ = (
+        Index("ix_mindmap_text_hash_language", "text_hash", "language", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     text: Mapped[str] = mapped_column(Text, nullable=True)
+    # repos.hashing.content_hash of the source text; new rows leave text empty.
+    text_hash: Mapped[str] = mapped_column(Text, nullable=True)
     language: Mapped[str] = mapped_column(Text, nullable=True)
     data: Mapped[dict] = mapped_column(JSON)
 
@@ -141,8 +185,13 @@ class TaskStatus(Enum):
 
 class DocumentProcessTask(Base):
     __tablename__ = "document_process_task"
+    __table_args__ = (
+        # Workers claim the oldest pending task first.
+        Index("ix_document_process_task_status_id", "status", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    url: Mapped[str] = mapped_column(Text, nullable=True)
     status: Mapped[TaskStatus] = mapped_column(
         SQLEnum(
             TaskStatus,
@@ -152,6 +201,16 @@ class DocumentProcessTask(Base):
         ),
         default=TaskStatus.PENDING,
     )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    worker_id: Mapped[str] = mapped_column(Text, nullable=True)
+    raw_article_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("raw_article.id"), nullable=True
+    )
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    started_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     updated_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
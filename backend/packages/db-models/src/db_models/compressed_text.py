@@ -0,0 +1,55 @@
+from typing import Any
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+# Every zstd frame starts with these bytes; valid UTF-8 text never does.
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+_level = 0
+
+
+def set_html_compression(level: int) -> None:
+    """Compress HTML written from now on with zstd at ``level``; 0 disables it.
+
+    Rows already stored are read back either way, so the setting can be
+    changed at any time without rewriting the table.
+    """
+    global _level
+    if level > 0:
+        # Imported eagerly so a missing optional dependency fails at startup.
+        import zstandard  # noqa: F401
+    _level = level
+
+
+class CompressedText(TypeDecorator[str]):
+    """Text stored as bytes: plain UTF-8, or a zstd frame when compression
+    is enabled."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect: Any) -> bytes | None:
+        if value is None:
+            return None
+        data = value.encode()
+        if _level > 0:
+            import zstandard
+
+            # A compressor per call: zstd contexts are not safe to share
+            # between threads.
+            return zstandard.ZstdCompressor(level=_level).compress(data)
+        return data
+
+    def process_result_value(self, value: Any, dialect: Any) -> str | None:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # SQLite keeps values written before the column became binary.
+            return value
+        data = bytes(value)
+        if data.startswith(ZSTD_MAGIC):
+            import zstandard
+
+            data = zstandard.ZstdDecompressor().decompress(data)
+        return data.decode()
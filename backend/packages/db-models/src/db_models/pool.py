@@ -0,0 +1,116 @@
+import os
+import time
+from typing import Any
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """The async queue pool, also recording how long checkouts wait for a
+    free connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._timeouts = 0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        # Past the overflow limit a checkout blocks until another returns.
+        exhausted = 0 <= self._max_overflow <= self.overflow() and (
+            self.checkedin() == 0
+        )
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self._timeouts += 1
+            raise
+        finally:
+            self._checkouts += 1
+            if exhausted:
+                waited = time.perf_counter() - start
+                self._waits += 1
+                self._wait_seconds += waited
+                self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self._checkouts,
+            "waits": self._waits,
+            "wait_seconds": self._wait_seconds,
+            "mean_wait_seconds": (
+                self._wait_seconds / self._waits if self._waits else 0.0
+            ),
+            "max_wait_seconds": self._max_wait_seconds,
+            "timeouts": self._timeouts,
+        }
+
+
+def pool_options(
+    url: str,
+    *,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: float,
+    pool_recycle: int,
+    statement_cache_size: int,
+) -> dict[str, Any]:
+    """Keyword arguments for ``create_async_engine`` sizing its pool.
+
+    In-memory SQLite keeps its single static connection. On asyncpg,
+    ``statement_cache_size`` bounds the prepared statements kept per
+    connection; 0 disables them, as PgBouncer in transaction mode requires.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return {}
+
+    options: dict[str, Any] = {
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+    }
+    if parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            # SQLAlchemy prepares through its own per-connection cache, and
+            # asyncpg keeps another for statements run without it.
+            "prepared_statement_cache_size": statement_cache_size,
+            "statement_cache_size": statement_cache_size,
+        }
+    return options
+
+
+def pool_options_from_env(url: str) -> dict[str, Any]:
+    """:func:`pool_options` sized by the ``DB_POOL_*`` and
+    ``DB_STATEMENT_CACHE_SIZE`` environment variables, with the app's defaults,
+    for processes that run without its settings."""
+    return pool_options(
+        url,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "-1")),
+        statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")),
+    )
+
+
+def pool_stats(engine: AsyncEngine) -> dict | None:
+    pool = engine.pool
+    return pool.stats() if isinstance(pool, TimedQueuePool) else None
@@ -0,0 +1,60 @@
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# Execution options for a connection that will write: on SQLite it takes the
+# write lock when its transaction begins; other backends ignore them.
+BEGIN_IMMEDIATE = {"sqlite_begin_immediate": True}
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def configure_sqlite(
+    engine: AsyncEngine,
+    *,
+    busy_timeout_ms: int = 5000,
+    mmap_size: int = 256 * 1024 * 1024,
+    cache_size_kib: int = 64 * 1024,
+) -> None:
+    """Tune every connection ``engine`` opens for concurrent use.
+
+    WAL lets readers run alongside the single writer, and ``synchronous =
+    NORMAL`` syncs the log at checkpoints rather than on every commit, which
+    stays safe against corruption in WAL mode. Writers wait up to
+    ``busy_timeout_ms`` for the lock instead of failing with "database is
+    locked".
+
+    The driver's own transaction handling is switched off in favour of an
+    explicit BEGIN, so savepoints nest inside the outer transaction instead
+    of committing on release. Connections opened with :data:`BEGIN_IMMEDIATE`
+    begin with ``BEGIN IMMEDIATE``: a deferred transaction that reads first
+    fails with ``SQLITE_BUSY_SNAPSHOT`` when it tries to write after another
+    process has committed, and ``busy_timeout`` does not help with that.
+    """
+    sync_engine: Engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection: Any, _: Any) -> None:
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+            cursor.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+            # Negative sizes are in KiB rather than pages.
+            cursor.execute(f"PRAGMA cache_size = {-int(cache_size_kib)}")
+        finally:
+            cursor.close()
+
+    @event.listens_for(sync_engine, "begin")
+    def _on_begin(connection: Any) -> None:
+        if connection.get_execution_options().get("sqlite_begin_immediate"):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            connection.exec_driver_sql("BEGIN")
@@ -1,47 +1,148 @@
+import argparse
 import asyncio
+import logging
+import sys
+from collections.abc import Iterable
+from pathlib import Path
+from typing import get_args
 
-from playwright.async_api import async_playwright
 from repos.article_repo import ArticleRepository
-from returns.result import safe
 
-from document_ingestion.engine import AsyncSessionLocal
+from document_ingestion.engine import WRITE_QUEUE, AsyncSessionLocal, engine
 
 from .article import Article
+from .browser_pool import BrowserPool, LoadState
+from .checkpoint import Checkpoint
+
+logger = logging.getLogger(__name__)
 
 
 def main() -> None:
-    asyncio.run(fetch())
+    parser = argparse.ArgumentParser(
+        description="Fetch, extract and store articles for a list of URLs."
+    )
+    parser.add_argument(
+        "urls",
+        nargs="?",
+        default="-",
+        help="file with one URL per line, or - for stdin (default)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="browser contexts (default 4)"
+    )
+    parser.add_argument(
+        "--wait-until",
+        choices=get_args(LoadState),
+        default="load",
+        help="load state to wait for before reading the page (default load)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60, help="per-page timeout in seconds"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="progress file for resuming; defaults to <urls>.checkpoint.jsonl "
+        "when reading from a file",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.urls == "-":
+        urls = read_urls(sys.stdin)
+        checkpoint_path = args.checkpoint
+    else:
+        with open(args.urls, encoding="utf-8") as file:
+            urls = read_urls(file)
+        checkpoint_path = args.checkpoint or Path(f"{args.urls}.checkpoint.jsonl")
 
+    asyncio.run(
+        ingest(
+            urls,
+            concurrency=args.concurrency,
+            wait_until=args.wait_until,
+            timeout=args.timeout * 1000,
+            checkpoint=Checkpoint(checkpoint_path),
+        )
+    )
 
-async def fetch():
+
+def read_urls(lines: Iterable[str]) -> list[str]:
+    """Non-blank, non-comment lines, deduplicated in order."""
+    return list(
+        dict.fromkeys(
+            line.strip()
+            for line in lines
+            if line.strip() and not line.lstrip().startswith("#")
+        )
+    )
+
+
+async def ingest(
+    urls: list[str],
+    *,
+    concurrency: int,
+    wait_until: LoadState,
+    timeout: float,
+    checkpoint: Checkpoint,
+) -> None:
+    pending = [url for url in urls if not checkpoint.is_done(url)]
+    logger.info(
+        "%d URL(s), %d already done, %d to fetch",
+        len(urls),
+        len(urls) - len(pending),
+        len(pending),
+    )
+    if not pending:
+        checkpoint.close()
+        return
+
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for url in pending:
+        queue.put_nowait(url)
     repo = ArticleRepository(AsyncSessionLocal)
-    raw_html = await fetch_article(
-        "https://www.penguin.co.uk/discover/articles/why-we-read-classics-italo-calvino"
-    )
-    # article_wrap = raw_html.map(lambda html: Article(html))
-    article_wrap = Article(raw_html)
-    await repo.get_or_create(
-        url="https://www.penguin.co.uk/discover/articles/why-we-read-classics-italo-calvino",
-        raw_html=raw_html,
-        clean_html=article_wrap.full_html,
-        language=article_wrap.language,
-        site_name="",
-        title=article_wrap.title,
-        date=article_wrap.date,
-        hostname=article_wrap.hostname,
-        description=article_wrap.description,
-        fingerprint=article_wrap.fingerprint,
-    )
-
-
-# @safe
-async def fetch_article(url: str, timeout: float = 60 * 1000) -> str:
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        try:
-            page = await browser.new_page()
-            await page.goto(url, timeout=timeout)
-            await page.wait_for_load_state("networkidle", timeout=timeout)
-            return await page.content()
-        finally:
-            await browser.close()
+    failed = 0
+
+    async def work(pool: BrowserPool) -> None:
+        nonlocal failed
+        while not queue.empty():
+            url = queue.get_nowait()
+            try:
+                raw_html = await pool.fetch_html(url, wait_until, timeout)
+                await store_article(repo, url, raw_html)
+            except Exception as err:
+                failed += 1
+                logger.warning("Failed %s: %s", url, err)
+                checkpoint.mark_failed(url, str(err))
+            else:
+                checkpoint.mark_done(url)
+                logger.info("Stored %s", url)
+
+    try:
+        async with BrowserPool(concurrency) as pool:
+            await asyncio.gather(*(work(pool) for _ in range(concurrency)))
+    finally:
+        checkpoint.close()
+        if WRITE_QUEUE is not None:
+            await WRITE_QUEUE.aclose()
+        await engine.dispose()
+    logger.info("Finished: %d stored, %d failed", len(pending) - failed, failed)
+
+
+async def store_article(repo: ArticleRepository, url: str, raw_html: str) -> None:
+    # Extraction is CPU-bound; a thread keeps the other pages loading meanwhile.
+    article_wrap = await asyncio.to_thread(_extract_fields, raw_html)
+    await repo.get_or_create(url=url, raw_html=raw_html, site_name="", **article_wrap)
+
+
+def _extract_fields(raw_html: str) -> dict[str, str]:
+    article = Article(raw_html)
+    return {
+        "clean_html": article.full_html,
+        "language": article.language,
+        "title": article.title,
+        "date": article.date,
+        "hostname": article.hostname,
+        "description": article.description,
+        "fingerprint": article.fingerprint,
+    }
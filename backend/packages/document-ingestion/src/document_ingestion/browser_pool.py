@@ -0,0 +1,80 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Literal
+
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    Route,
+    async_playwright,
+)
+
+LoadState = Literal["commit", "domcontentloaded", "load", "networkidle"]
+
+# Article text never depends on these, and they dominate page weight.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+
+async def _block_heavy_resources(route: Route) -> None:
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """A single Chromium process shared by ``size`` long-lived browser contexts.
+
+    Each page borrows a context for as long as it is open, so at most
+    ``size`` pages load at once; callers beyond that wait for a free context.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._contexts: asyncio.Queue[BrowserContext] = asyncio.Queue()
+
+    async def __aenter__(self) -> "BrowserPool":
+        playwright = self._playwright = await async_playwright().start()
+        try:
+            browser = self._browser = await playwright.chromium.launch()
+            for _ in range(self._size):
+                context = await browser.new_context()
+                await context.route("**/*", _block_heavy_resources)
+                self._contexts.put_nowait(context)
+        except BaseException:
+            await self.__aexit__()
+            raise
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        if self._browser is not None:
+            # Closing the browser closes every context with it.
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        context = await self._contexts.get()
+        try:
+            page = await context.new_page()
+            try:
+                yield page
+            finally:
+                await page.close()
+        finally:
+            self._contexts.put_nowait(context)
+
+    async def fetch_html(
+        self, url: str, wait_until: LoadState = "load", timeout: float = 60 * 1000
+    ) -> str:
+        async with self.page() as page:
+            await page.goto(url, wait_until=wait_until, timeout=timeout)
+            return await page.content()
@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+from typing import TextIO
+
+
+class Checkpoint:
+    """Append-only JSONL record of processed URLs, so an interrupted run can
+    resume where it stopped.
+
+    Every outcome is flushed as soon as it is known. Only successful URLs
+    are skipped on resume; failed ones are tried again.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self._path = path
+        self._done: set[str] = set()
+        self._file: TextIO | None = None
+        if path is None:
+            return
+
+        if path.exists():
+            with path.open(encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A run killed mid-write leaves a partial last line.
+                        continue
+                    if entry.get("status") == "done":
+                        self._done.add(entry["url"])
+        self._file = path.open("a", encoding="utf-8")
+        if self._file.tell() > 0:
+            # Terminate a partial last line so the next entry starts cleanly.
+            with path.open("rb") as file:
+                file.seek(-1, 2)
+                if file.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def is_done(self, url: str) -> bool:
+        return url in self._done
+
+    def mark_done(self, url: str) -> None:
+        self._done.add(url)
+        self._write({"url": url, "status": "done"})
+
+    def mark_failed(self, url: str, error: str) -> None:
+        self._write({"url": url, "status": "failed", "error": error})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, entry: dict) -> None:
+        if self._file is None:
+            return
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
@@ -1,19 +1,38 @@
 import os
 from typing import AsyncIterable
 
+from db_models.compressed_text import set_html_compression
+from db_models.pool import pool_options_from_env
+from db_models.sqlite import configure_sqlite, is_sqlite
 from dotenv import load_dotenv
+from repos import WriteQueue, serialize_writes
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 load_dotenv(override=True)
 
 
+DATABASE_URL = os.getenv("MIGRATION_DATABASE_URL", "sqlite+aiosqlite:///../../temp.db")
+
 engine = create_async_engine(
-    os.getenv("MIGRATION_DATABASE_URL", "sqlite+aiosqlite:///../../temp.db"),
-    pool_pre_ping=True,
+    DATABASE_URL, pool_pre_ping=True, **pool_options_from_env(DATABASE_URL)
 )
 
+set_html_compression(int(os.getenv("HTML_COMPRESSION_LEVEL", "0")))
+
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
+WRITE_QUEUE: WriteQueue | None = None
+if is_sqlite(DATABASE_URL):
+    configure_sqlite(
+        engine,
+        busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        cache_size_kib=int(os.getenv("SQLITE_CACHE_SIZE_KIB", str(64 * 1024))),
+    )
+    write_batch = int(os.getenv("SQLITE_WRITE_BATCH", "64"))
+    if write_batch > 0:
+        WRITE_QUEUE = serialize_writes(AsyncSessionLocal, write_batch)
+
 
 async def get_async_session_maker() -> AsyncIterable[async_sessionmaker[AsyncSession]]:
     yield AsyncSessionLocal
@@ -1,3 +1,18 @@
-from .base_repo import BaseRepository
+from .base_repo import (
+    SESSION_STATS,
+    BaseRepository,
+    SessionStats,
+    count_sessions,
+    unit_of_work,
+)
+from .write_queue import WriteQueue, serialize_writes
 
-__all__ = ["BaseRepository"]
+__all__ = [
+    "SESSION_STATS",
+    "BaseRepository",
+    "SessionStats",
+    "WriteQueue",
+    "count_sessions",
+    "serialize_writes",
+    "unit_of_work",
+]
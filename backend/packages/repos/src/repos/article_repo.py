@@ -5,6 +5,7 @@ from returns.maybe import Maybe
 from sqlalchemy import select
 
 from repos import BaseRepository
+from repos.hashing import digest
 
 
 class ArticleRepository(BaseRepository):
@@ -22,14 +23,16 @@ class ArticleRepository(BaseRepository):
         description: str,
         fingerprint: str,
     ) -> Article:
-        async with self.session() as session:
+        html_hash = digest(raw_html)
+        async with self.write_session() as session:
             stmt = (
                 select(Article)
                 .where(Article.url == url)
-                .where(Article.raw_html == raw_html)
+                .where(Article.content_hash == html_hash)
+                .limit(1)
             )
             result = await session.execute(stmt)
-            existing = result.scalar_one_or_none()
+            existing = result.scalars().first()
 
             if existing:
                 return existing
@@ -37,6 +40,7 @@ class ArticleRepository(BaseRepository):
             word = Article(
                 url=url,
                 raw_html=raw_html,
+                content_hash=html_hash,
                 clean_html=clean_html,
                 language=language,
                 site_name=site_name,
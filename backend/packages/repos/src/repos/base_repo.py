@@ -1,8 +1,155 @@
-from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Any, TypeVar
 
+from sqlalchemy import Insert, insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+if TYPE_CHECKING:
+    from repos.write_queue import WriteQueue
+
+# Keeps multi-row statements below SQLite's bound-parameter limit.
+BATCH_SIZE = 500
+
+T = TypeVar("T")
+
+
+def batched(items: Iterable[T], size: int = BATCH_SIZE) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@dataclass
+class SessionStats:
+    sessions: int = 0
+    commits: int = 0
+    # Repository calls that ran in an enclosing unit of work's session.
+    shared_calls: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+# Totals for the process; count_sessions adds per-operation counters.
+SESSION_STATS = SessionStats()
+_counters: ContextVar[tuple[SessionStats, ...]] = ContextVar(
+    "repos_session_counters", default=()
+)
+
+
+def _count(field: str, counters: Iterable[SessionStats] | None = None) -> None:
+    """Add one to ``field`` of the process totals and of ``counters``, by
+    default those active in the current context."""
+    for stats in (SESSION_STATS, *(_counters.get() if counters is None else counters)):
+        setattr(stats, field, getattr(stats, field) + 1)
+
+
+@asynccontextmanager
+async def count_sessions() -> AsyncIterator[SessionStats]:
+    """Count the sessions and commits of the repository calls made inside,
+    including those of tasks started inside."""
+    stats = SessionStats()
+    token = _counters.set((*_counters.get(), stats))
+    try:
+        yield stats
+    finally:
+        _counters.reset(token)
+
+
+@dataclass(eq=False)
+class _UnitOfWork:
+    session_maker: async_sessionmaker[AsyncSession]
+    session: AsyncSession
+    owner: asyncio.Task | None
+    # Write-queue turns are closed once their owner's block has exited.
+    turn: bool = False
+    closed: bool = False
+
+
+_unit_of_work: ContextVar[_UnitOfWork | None] = ContextVar(
+    "repos_unit_of_work", default=None
+)
+
+
+def _active_unit_of_work(
+    session_maker: async_sessionmaker[AsyncSession],
+) -> _UnitOfWork | None:
+    unit = _unit_of_work.get()
+    # Tasks started inside a unit of work inherit the context variable, but
+    # an AsyncSession must not be used concurrently, so only the task that
+    # opened it shares the session; the others fall back to their own.
+    if (
+        unit is None
+        or unit.session_maker is not session_maker
+        or unit.owner is not asyncio.current_task()
+    ):
+        return None
+    return unit
+
+
+def _refuse_nested_turn(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Fail fast when a task started inside a write-queue turn writes.
+
+    Its own turn would queue behind the enclosing one, which may be waiting
+    for the task, so both would wait forever.
+    """
+    unit = _unit_of_work.get()
+    if (
+        unit is not None
+        and unit.session_maker is session_maker
+        and unit.turn
+        and not unit.closed
+    ):
+        raise RuntimeError(
+            "A task started inside a write-queue turn cannot write until the "
+            "turn ends; write from the task that opened it instead"
+        )
+
+
+# Session makers whose writes go through a single writer; see write_queue.
+_write_queues: dict[async_sessionmaker[AsyncSession], "WriteQueue"] = {}
+
+
+@asynccontextmanager
+async def unit_of_work(
+    session_maker: async_sessionmaker[AsyncSession], *, read_only: bool = False
+) -> AsyncIterator[AsyncSession]:
+    """Run every repository call inside the block in one session and one
+    transaction, committed when the block exits and rolled back if it raises.
+
+    Outside a unit of work each repository call still gets its own session
+    and transaction. Nested units of work join the outermost one. When
+    writes on ``session_maker`` are serialized, a unit of work takes one
+    turn in the write queue unless it is ``read_only``.
+    """
+    if (unit := _active_unit_of_work(session_maker)) is not None:
+        yield unit.session
+        return
+
+    if not read_only and (queue := _write_queues.get(session_maker)) is not None:
+        _refuse_nested_turn(session_maker)
+        async with queue.turn() as session:
+            yield session
+        return
+
+    async with session_maker() as session:
+        _count("sessions")
+        async with session.begin():
+            token = _unit_of_work.set(
+                _UnitOfWork(session_maker, session, asyncio.current_task())
+            )
+            try:
+                yield session
+            finally:
+                _unit_of_work.reset(token)
+        _count("commits")
+
 
 class BaseRepository:
     def __init__(self, session_maker: async_sessionmaker[AsyncSession]):
@@ -10,6 +157,50 @@ class BaseRepository:
 
     @asynccontextmanager
     async def session(self) -> AsyncIterator[AsyncSession]:
+        if (unit := _active_unit_of_work(self._session_maker)) is not None:
+            _count("shared_calls")
+            yield unit.session
+            return
+
         async with self._session_maker() as session:
+            _count("sessions")
             async with session.begin():
                 yield session
+            _count("commits")
+
+    @asynccontextmanager
+    async def write_session(self) -> AsyncIterator[AsyncSession]:
+        """Like :meth:`session`, for calls that write: these take a turn in
+        the session maker's write queue when it has one."""
+        queue = _write_queues.get(self._session_maker)
+        if queue is None or _active_unit_of_work(self._session_maker) is not None:
+            async with self.session() as session:
+                yield session
+            return
+
+        _refuse_nested_turn(self._session_maker)
+        async with queue.turn() as session:
+            yield session
+
+    def unit_of_work(
+        self, *, read_only: bool = False
+    ) -> AbstractAsyncContextManager[AsyncSession]:
+        """A :func:`unit_of_work` on this repository's session maker."""
+        return unit_of_work(self._session_maker, read_only=read_only)
+
+    @staticmethod
+    def insert_ignore_conflicts(
+        session: AsyncSession, model: Any, *index_elements: Any
+    ) -> Insert:
+        """Build an INSERT that silently skips rows violating a unique index."""
+        match session.get_bind().dialect.name:
+            case "postgresql":
+                return postgresql.insert(model).on_conflict_do_nothing(
+                    index_elements=index_elements
+                )
+            case "sqlite":
+                return sqlite.insert(model).on_conflict_do_nothing(
+                    index_elements=index_elements
+                )
+            case _:
+                return insert(model)
@@ -0,0 +1,137 @@
+import uuid
+from collections.abc import AsyncGenerator
+from datetime import datetime, timedelta, timezone
+from typing import cast
+
+from db_models import DocumentProcessTask, TaskStatus
+from fastapi import Depends
+from returns.maybe import Maybe
+from sqlalchemy import CursorResult, case, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.engine import get_async_session_maker
+from repos import BaseRepository
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _retry_or_fail(max_attempts: int):
+    """Status for a failed attempt: back to pending while attempts remain."""
+    status_type = DocumentProcessTask.status.type
+    return case(
+        (
+            DocumentProcessTask.attempts >= max_attempts,
+            literal(TaskStatus.FAILED, status_type),
+        ),
+        else_=literal(TaskStatus.PENDING, status_type),
+    )
+
+
+class DocumentProcessTaskRepository(BaseRepository):
+    async def create(self, url: str) -> DocumentProcessTask:
+        async with self.write_session() as session:
+            task = DocumentProcessTask(url=url, status=TaskStatus.PENDING)
+            session.add(task)
+
+            await session.flush()
+            await session.refresh(task)
+            return task
+
+    async def get_by_id(self, task_id: int) -> Maybe[DocumentProcessTask]:
+        async with self.session() as session:
+            stmt = select(DocumentProcessTask).where(DocumentProcessTask.id == task_id)
+            result = await session.execute(stmt)
+            return Maybe.from_optional(result.scalar_one_or_none())
+
+    async def claim(self, worker_id: str) -> Maybe[DocumentProcessTask]:
+        """Atomically move the oldest pending task to running for ``worker_id``.
+
+        The status guard on the UPDATE makes the claim safe on SQLite, where
+        writers are serialized; on Postgres ``SKIP LOCKED`` additionally lets
+        concurrent workers pick different rows instead of queueing on one.
+        """
+        async with self.write_session() as session:
+            candidate = (
+                select(DocumentProcessTask.id)
+                .where(DocumentProcessTask.status == TaskStatus.PENDING)
+                .order_by(DocumentProcessTask.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            stmt = (
+                update(DocumentProcessTask)
+                .where(DocumentProcessTask.id == candidate)
+                .where(DocumentProcessTask.status == TaskStatus.PENDING)
+                .values(
+                    status=TaskStatus.RUNNING,
+                    worker_id=worker_id,
+                    attempts=DocumentProcessTask.attempts + 1,
+                    started_at=_now(),
+                )
+                .returning(DocumentProcessTask)
+            )
+            result = await session.execute(stmt)
+            return Maybe.from_optional(result.scalar_one_or_none())
+
+    async def succeed(
+        self, task_id: int, worker_id: str, raw_article_id: uuid.UUID
+    ) -> bool:
+        async with self.write_session() as session:
+            stmt = (
+                update(DocumentProcessTask)
+                .where(DocumentProcessTask.id == task_id)
+                .where(DocumentProcessTask.worker_id == worker_id)
+                .where(DocumentProcessTask.status == TaskStatus.RUNNING)
+                .values(
+                    status=TaskStatus.SUCCESS,
+                    raw_article_id=raw_article_id,
+                    error=None,
+                    finished_at=_now(),
+                )
+            )
+            result = cast(CursorResult, await session.execute(stmt))
+            return result.rowcount == 1
+
+    async def fail(
+        self, task_id: int, worker_id: str, error: str, max_attempts: int
+    ) -> bool:
+        """Record a failed attempt; the task is retried until ``max_attempts``."""
+        async with self.write_session() as session:
+            stmt = (
+                update(DocumentProcessTask)
+                .where(DocumentProcessTask.id == task_id)
+                .where(DocumentProcessTask.worker_id == worker_id)
+                .where(DocumentProcessTask.status == TaskStatus.RUNNING)
+                .values(
+                    status=_retry_or_fail(max_attempts),
+                    error=error,
+                    finished_at=_now(),
+                )
+            )
+            result = cast(CursorResult, await session.execute(stmt))
+            return result.rowcount == 1
+
+    async def requeue_stale(self, older_than: timedelta, max_attempts: int) -> int:
+        """Release running tasks whose worker has not reported back in time."""
+        async with self.write_session() as session:
+            stmt = (
+                update(DocumentProcessTask)
+                .where(DocumentProcessTask.status == TaskStatus.RUNNING)
+                .where(DocumentProcessTask.started_at < _now() - older_than)
+                .values(
+                    status=_retry_or_fail(max_attempts),
+                    error="Worker timed out",
+                    finished_at=_now(),
+                )
+            )
+            result = cast(CursorResult, await session.execute(stmt))
+            return result.rowcount
+
+
+async def get_document_process_task_repo(
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_async_session_maker),
+) -> AsyncGenerator[DocumentProcessTaskRepository, None]:
+    yield DocumentProcessTaskRepository(session_maker)
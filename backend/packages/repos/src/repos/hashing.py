@@ -0,0 +1,20 @@
+import hashlib
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize and collapse whitespace so cosmetic differences hash equal."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def digest(text: str) -> str:
+    """Hex SHA-256 of the text exactly as given."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def content_hash(text: str) -> str:
+    """Hex SHA-256 of the normalized text, used as a cache and dedup key."""
+    return digest(normalize_text(text))
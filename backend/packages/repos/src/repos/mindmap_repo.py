@@ -8,34 +8,29 @@ from repos import BaseRepository
 
 
 class MindmapRepository(BaseRepository):
-    async def get_or_create(self, text: str, language: str, data: dict) -> Mindmap:
-        async with self.session() as session:
+    async def get_or_create(self, text_hash: str, language: str, data: dict) -> Mindmap:
+        async with self.write_session() as session:
+            await session.execute(
+                self.insert_ignore_conflicts(
+                    session, Mindmap, Mindmap.text_hash, Mindmap.language
+                ),
+                {"text_hash": text_hash, "language": language, "data": data},
+            )
             stmt = (
                 select(Mindmap)
-                .where(Mindmap.text == text)
+                .where(Mindmap.text_hash == text_hash)
                 .where(Mindmap.language == language)
-                .where(Mindmap.data == data)
             )
             result = await session.execute(stmt)
-            existing = result.scalar_one_or_none()
-
-            if existing:
-                return existing
-
-            word = Mindmap(text=text, language=language, data=data)
-            session.add(word)
-
-            await session.flush()
-            await session.refresh(word)
-            return word
+            return result.scalar_one()
 
-    async def get_by_text_and_language(
-        self, text: str, language: str
+    async def get_by_hash_and_language(
+        self, text_hash: str, language: str
     ) -> Maybe[Mindmap]:
         async with self.session() as session:
             stmt = (
                 select(Mindmap)
-                .where(Mindmap.text == text)
+                .where(Mindmap.text_hash == text_hash)
                 .where(Mindmap.language == language)
             )
             result = await session.execute(stmt)
@@ -5,29 +5,59 @@ from returns.maybe import Maybe
 from sqlalchemy import select
 
 from repos import BaseRepository
+from repos.hashing import digest
 
 
 class RawArticleRepository(BaseRepository):
-    async def get_or_create(self, url: str, raw_html: str) -> RawArticle:
-        async with self.session() as session:
+    async def get_or_create(
+        self,
+        url: str,
+        raw_html: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> RawArticle:
+        html_hash = digest(raw_html)
+        async with self.write_session() as session:
             stmt = (
                 select(RawArticle)
                 .where(RawArticle.url == url)
-                .where(RawArticle.raw_html == raw_html)
+                .where(RawArticle.content_hash == html_hash)
+                .limit(1)
             )
             result = await session.execute(stmt)
-            existing = result.scalar_one_or_none()
+            existing = result.scalars().first()
 
             if existing:
+                # Same content under new validators: keep the latest ones.
+                if (existing.etag, existing.last_modified) != (etag, last_modified):
+                    existing.etag = etag
+                    existing.last_modified = last_modified
                 return existing
 
-            word = RawArticle(url=url, raw_html=raw_html)
+            word = RawArticle(
+                url=url,
+                raw_html=raw_html,
+                content_hash=html_hash,
+                etag=etag,
+                last_modified=last_modified,
+            )
             session.add(word)
 
             await session.flush()
             await session.refresh(word)
             return word
 
+    async def get_latest_by_url(self, url: str) -> Maybe[RawArticle]:
+        async with self.session() as session:
+            stmt = (
+                select(RawArticle)
+                .where(RawArticle.url == url)
+                .order_by(RawArticle.created_at.desc(), RawArticle.id.desc())
+                .limit(1)
+            )
+            result = await session.execute(stmt)
+            return Maybe.from_optional(result.scalar_one_or_none())
+
     async def get_by_id(self, raw_article_id: uuid.UUID) -> Maybe[RawArticle]:
         async with self.session() as session:
             stmt = select(RawArticle).where(RawArticle.id == raw_article_id)
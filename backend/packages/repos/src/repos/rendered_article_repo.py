@@ -0,0 +1,75 @@
+import uuid
+from collections.abc import AsyncGenerator, Collection
+
+from db_models import RenderedArticle
+from fastapi import Depends
+from returns.maybe import Maybe
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.engine import get_async_session_maker
+from repos import BaseRepository
+
+
+class RenderedArticleRepository(BaseRepository):
+    async def get_by_raw_article(
+        self, raw_article_id: uuid.UUID, version: str
+    ) -> Maybe[RenderedArticle]:
+        async with self.session() as session:
+            stmt = (
+                select(RenderedArticle)
+                .where(RenderedArticle.raw_article_id == raw_article_id)
+                .where(RenderedArticle.version == version)
+            )
+            result = await session.execute(stmt)
+            return Maybe.from_optional(result.scalar_one_or_none())
+
+    async def get_or_create(
+        self,
+        *,
+        raw_article_id: uuid.UUID,
+        version: str,
+        title: str,
+        author: str,
+        language: str,
+        html: str,
+        keep_versions: Collection[str] = (),
+    ) -> RenderedArticle:
+        """Store a rendering and drop the ones made by other pipeline versions,
+        except ``keep_versions``."""
+        async with self.write_session() as session:
+            await session.execute(
+                delete(RenderedArticle)
+                .where(RenderedArticle.raw_article_id == raw_article_id)
+                .where(RenderedArticle.version.not_in([version, *keep_versions]))
+            )
+
+            await session.execute(
+                self.insert_ignore_conflicts(
+                    session,
+                    RenderedArticle,
+                    RenderedArticle.raw_article_id,
+                    RenderedArticle.version,
+                ).values(
+                    raw_article_id=raw_article_id,
+                    version=version,
+                    title=title,
+                    author=author,
+                    language=language,
+                    html=html,
+                )
+            )
+
+            stmt = (
+                select(RenderedArticle)
+                .where(RenderedArticle.raw_article_id == raw_article_id)
+                .where(RenderedArticle.version == version)
+            )
+            result = await session.execute(stmt)
+            return result.scalar_one()
+
+
+async def get_rendered_article_repo(
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_async_session_maker),
+) -> AsyncGenerator[RenderedArticleRepository, None]:
+    yield RenderedArticleRepository(session_maker)
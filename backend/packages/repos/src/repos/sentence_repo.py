@@ -1,10 +1,12 @@
 import uuid
+from collections.abc import Iterable
 
 from db_models import Sentence
 from returns.maybe import Maybe
 from sqlalchemy import select
 
 from repos import BaseRepository
+from repos.base_repo import batched
 
 
 class SentenceRepository(BaseRepository):
@@ -12,7 +14,7 @@ class SentenceRepository(BaseRepository):
         self,
         text: str,
     ) -> Sentence:
-        async with self.session() as session:
+        async with self.write_session() as session:
             stmt = select(Sentence).where(Sentence.text == text)
             result = await session.execute(stmt)
             existing = result.scalar_one_or_none()
@@ -27,6 +29,63 @@ class SentenceRepository(BaseRepository):
             await session.refresh(word)
             return word
 
+    async def get_or_create_many(self, texts: Iterable[str]) -> dict[str, Sentence]:
+        unique_texts = list(dict.fromkeys(texts))
+        sentences: dict[str, Sentence] = {}
+        if not unique_texts:
+            return sentences
+
+        async with self.write_session() as session:
+            for batch in batched(unique_texts):
+                stmt = select(Sentence).where(Sentence.text.in_(batch))
+                result = await session.execute(stmt)
+                sentences.update((row.text, row) for row in result.scalars())
+
+            missing = [text for text in unique_texts if text not in sentences]
+            for batch in batched(missing):
+                await session.execute(
+                    self.insert_ignore_conflicts(session, Sentence, Sentence.text),
+                    [{"id": uuid.uuid4(), "text": text} for text in batch],
+                )
+                stmt = select(Sentence).where(Sentence.text.in_(batch))
+                result = await session.execute(stmt)
+                sentences.update((row.text, row) for row in result.scalars())
+
+        return sentences
+
+    async def get_ids(self, texts: Iterable[str]) -> dict[str, uuid.UUID]:
+        """Ids of the existing rows among ``texts``; nothing is created."""
+        ids: dict[str, uuid.UUID] = {}
+        async with self.session() as session:
+            for batch in batched(dict.fromkeys(texts)):
+                stmt = select(Sentence.text, Sentence.id).where(
+                    Sentence.text.in_(batch)
+                )
+                result = await session.execute(stmt)
+                ids.update(result.tuples().all())
+        return ids
+
+    async def get_or_create_ids(self, texts: Iterable[str]) -> dict[str, uuid.UUID]:
+        """Like :meth:`get_or_create_many`, but only loads the ids."""
+        unique_texts = list(dict.fromkeys(texts))
+        ids = await self.get_ids(unique_texts)
+        missing = [text for text in unique_texts if text not in ids]
+        if not missing:
+            return ids
+
+        async with self.write_session() as session:
+            for batch in batched(missing):
+                await session.execute(
+                    self.insert_ignore_conflicts(session, Sentence, Sentence.text),
+                    [{"id": uuid.uuid4(), "text": text} for text in batch],
+                )
+                stmt = select(Sentence.text, Sentence.id).where(
+                    Sentence.text.in_(batch)
+                )
+                result = await session.execute(stmt)
+                ids.update(result.tuples().all())
+        return ids
+
     async def get_by_id(self, sentence_id: uuid.UUID) -> Maybe[Sentence]:
         async with self.session() as session:
             stmt = select(Sentence).where(Sentence.id == sentence_id)
@@ -1,10 +1,15 @@
 import uuid
+from collections.abc import Iterable
 
-from db_models import WordLookup
+from db_models import Sentence, Word, WordLookup
 from returns.maybe import Maybe
-from sqlalchemy import Integer, select
+from sqlalchemy import Integer, literal, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from repos import BaseRepository
+from repos.base_repo import batched
+
+LookupKey = tuple[uuid.UUID, uuid.UUID]
 
 
 class WordLookupRepository(BaseRepository):
@@ -24,7 +29,7 @@ class WordLookupRepository(BaseRepository):
     async def get_or_create(
         self, sentence_id: uuid.UUID, word_id: uuid.UUID, text: str, language: str
     ) -> WordLookup:
-        async with self.session() as session:
+        async with self.write_session() as session:
             stmt = (
                 select(WordLookup)
                 .where(WordLookup.sentence_id == sentence_id)
@@ -46,6 +51,90 @@ class WordLookupRepository(BaseRepository):
             await session.refresh(lookup)
             return lookup
 
+    async def get_many_by_sentence_and_word(
+        self, keys: Iterable[LookupKey], language: str
+    ) -> dict[LookupKey, WordLookup]:
+        unique_keys = list(dict.fromkeys(keys))
+        lookups: dict[LookupKey, WordLookup] = {}
+        if not unique_keys:
+            return lookups
+
+        async with self.session() as session:
+            for batch in batched(unique_keys):
+                lookups.update(await self.__select_many(session, batch, language))
+        return lookups
+
+    async def get_texts(
+        self, keys: Iterable[LookupKey]
+    ) -> tuple[dict[uuid.UUID, str], dict[uuid.UUID, str]]:
+        """Load the sentence and word texts behind ``keys`` in one round trip."""
+        unique_keys = list(dict.fromkeys(keys))
+        sentence_texts: dict[uuid.UUID, str] = {}
+        word_texts: dict[uuid.UUID, str] = {}
+        if not unique_keys:
+            return sentence_texts, word_texts
+
+        async with self.session() as session:
+            for batch in batched(unique_keys):
+                sentence_ids = list({sentence_id for sentence_id, _ in batch})
+                word_ids = list({word_id for _, word_id in batch})
+                stmt = union_all(
+                    select(
+                        literal(True).label("is_sentence"), Sentence.id, Sentence.text
+                    ).where(Sentence.id.in_(sentence_ids)),
+                    select(
+                        literal(False).label("is_sentence"), Word.id, Word.text
+                    ).where(Word.id.in_(word_ids)),
+                )
+                result = await session.execute(stmt)
+                for is_sentence, id_, text in result:
+                    (sentence_texts if is_sentence else word_texts)[id_] = text
+        return sentence_texts, word_texts
+
+    async def get_or_create_many(
+        self, texts: dict[LookupKey, str], language: str
+    ) -> dict[LookupKey, WordLookup]:
+        lookups: dict[LookupKey, WordLookup] = {}
+        if not texts:
+            return lookups
+
+        async with self.write_session() as session:
+            for batch in batched(list(texts)):
+                await session.execute(
+                    self.insert_ignore_conflicts(
+                        session,
+                        WordLookup,
+                        WordLookup.sentence_id,
+                        WordLookup.word_id,
+                        WordLookup.language,
+                    ),
+                    [
+                        {
+                            "sentence_id": sentence_id,
+                            "word_id": word_id,
+                            "text": texts[(sentence_id, word_id)],
+                            "language": language,
+                        }
+                        for sentence_id, word_id in batch
+                    ],
+                )
+                lookups.update(await self.__select_many(session, batch, language))
+        return lookups
+
+    @staticmethod
+    async def __select_many(
+        session: AsyncSession, keys: list[LookupKey], language: str
+    ) -> dict[LookupKey, WordLookup]:
+        stmt = (
+            select(WordLookup)
+            .where(tuple_(WordLookup.sentence_id, WordLookup.word_id).in_(keys))
+            .where(WordLookup.language == language)
+        )
+        result = await session.execute(stmt)
+        return {
+            (lookup.sentence_id, lookup.word_id): lookup for lookup in result.scalars()
+        }
+
     async def get_by_id(self, lookup_id: Integer) -> Maybe[WordLookup]:
         async with self.session() as session:
             stmt = select(WordLookup).where(WordLookup.id == lookup_id)
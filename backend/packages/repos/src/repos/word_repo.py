@@ -1,10 +1,12 @@
 import uuid
+from collections.abc import Iterable
 
 from db_models import Word
 from returns.maybe import Maybe
 from sqlalchemy import select
 
 from repos import BaseRepository
+from repos.base_repo import batched
 
 
 class WordRepository(BaseRepository):
@@ -12,7 +14,7 @@ class WordRepository(BaseRepository):
         self,
         text: str,
     ) -> Word:
-        async with self.session() as session:
+        async with self.write_session() as session:
             stmt = select(Word).where(Word.text == text)
             result = await session.execute(stmt)
             existing = result.scalar_one_or_none()
@@ -27,6 +29,59 @@ class WordRepository(BaseRepository):
             await session.refresh(word)
             return word
 
+    async def get_or_create_many(self, texts: Iterable[str]) -> dict[str, Word]:
+        unique_texts = list(dict.fromkeys(texts))
+        words: dict[str, Word] = {}
+        if not unique_texts:
+            return words
+
+        async with self.write_session() as session:
+            for batch in batched(unique_texts):
+                stmt = select(Word).where(Word.text.in_(batch))
+                result = await session.execute(stmt)
+                words.update((word.text, word) for word in result.scalars())
+
+            missing = [text for text in unique_texts if text not in words]
+            for batch in batched(missing):
+                await session.execute(
+                    self.insert_ignore_conflicts(session, Word, Word.text),
+                    [{"id": uuid.uuid4(), "text": text} for text in batch],
+                )
+                stmt = select(Word).where(Word.text.in_(batch))
+                result = await session.execute(stmt)
+                words.update((word.text, word) for word in result.scalars())
+
+        return words
+
+    async def get_ids(self, texts: Iterable[str]) -> dict[str, uuid.UUID]:
+        """Ids of the existing rows among ``texts``; nothing is created."""
+        ids: dict[str, uuid.UUID] = {}
+        async with self.session() as session:
+            for batch in batched(dict.fromkeys(texts)):
+                stmt = select(Word.text, Word.id).where(Word.text.in_(batch))
+                result = await session.execute(stmt)
+                ids.update(result.tuples().all())
+        return ids
+
+    async def get_or_create_ids(self, texts: Iterable[str]) -> dict[str, uuid.UUID]:
+        """Like :meth:`get_or_create_many`, but only loads the ids."""
+        unique_texts = list(dict.fromkeys(texts))
+        ids = await self.get_ids(unique_texts)
+        missing = [text for text in unique_texts if text not in ids]
+        if not missing:
+            return ids
+
+        async with self.write_session() as session:
+            for batch in batched(missing):
+                await session.execute(
+                    self.insert_ignore_conflicts(session, Word, Word.text),
+                    [{"id": uuid.uuid4(), "text": text} for text in batch],
+                )
+                stmt = select(Word.text, Word.id).where(Word.text.in_(batch))
+                result = await session.execute(stmt)
+                ids.update(result.tuples().all())
+        return ids
+
     async def get_by_id(self, word_id: uuid.UUID) -> Maybe[Word]:
         async with self.session() as session:
             stmt = select(Word).where(Word.id == word_id)
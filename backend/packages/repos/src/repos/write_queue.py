@@ -0,0 +1,180 @@
+import asyncio
+import contextvars
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from db_models.sqlite import BEGIN_IMMEDIATE
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from repos.base_repo import (
+    SessionStats,
+    _count,
+    _counters,
+    _unit_of_work,
+    _UnitOfWork,
+    _write_queues,
+)
+
+
+@dataclass(eq=False)
+class _Turn:
+    granted: asyncio.Future[AsyncSession] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+    # Set by the turn's owner: whether its savepoint was released.
+    released: asyncio.Future[bool] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+    committed: asyncio.Future[None] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+    # The owner's count_sessions counters; the writer runs in its own context.
+    counters: tuple[SessionStats, ...] = field(default_factory=_counters.get)
+
+
+def _counters_of(turns: list[_Turn]) -> list[SessionStats]:
+    """The distinct counters of ``turns``: a shared session or commit counts
+    once per counter."""
+    return list(
+        {id(stats): stats for turn in turns for stats in turn.counters}.values()
+    )
+
+
+class WriteQueue:
+    """Funnel the write transactions of one session maker through a single
+    writer task.
+
+    Writers queue for a turn. The writer opens one transaction, hands its
+    session to each queued writer in order, and commits once the queue is
+    empty or ``max_batch`` turns have run, so writes that arrive together
+    share one commit (and one fsync). Each turn runs in a savepoint: a
+    failing turn rolls back only its own changes. A turn returns only after
+    the batch commits.
+
+    A task started inside a turn must not write on the same session maker
+    until the turn ends: its own turn would queue behind the enclosing one,
+    so it raises ``RuntimeError`` instead.
+
+    Reads keep their own sessions and never wait here; in SQLite's WAL mode
+    they are not blocked by the writer either.
+    """
+
+    def __init__(
+        self, session_maker: async_sessionmaker[AsyncSession], max_batch: int
+    ) -> None:
+        self._session_maker = session_maker
+        self._max_batch = max_batch
+        self._queue: asyncio.Queue[_Turn | None] | None = None
+        self._writer: asyncio.Task | None = None
+        self._batches = 0
+        self._turns = 0
+        self._largest_batch = 0
+
+    @asynccontextmanager
+    async def turn(self) -> AsyncIterator[AsyncSession]:
+        turn = _Turn()
+        self._ensure_writer().put_nowait(turn)
+        try:
+            session = await turn.granted
+        except BaseException:
+            # Cancelled just as the turn was granted: hand it straight back.
+            if turn.granted.done() and not turn.granted.cancelled():
+                turn.released.set_result(False)
+            raise
+
+        # Repository calls nested in the turn join its savepoint instead of
+        # queueing behind it.
+        unit = _UnitOfWork(
+            self._session_maker, session, asyncio.current_task(), turn=True
+        )
+        token = _unit_of_work.set(unit)
+        succeeded = False
+        try:
+            _count("shared_calls")
+            async with session.begin_nested():
+                yield session
+            succeeded = True
+        finally:
+            unit.closed = True
+            _unit_of_work.reset(token)
+            turn.released.set_result(succeeded)
+        await asyncio.shield(turn.committed)
+
+    async def aclose(self) -> None:
+        """Commit the queued writes and stop the writer."""
+        if self._writer is None or self._writer.done():
+            return
+        assert self._queue is not None
+        self._queue.put_nowait(None)
+        await self._writer
+
+    def stats(self) -> dict:
+        return {
+            "batches": self._batches,
+            "writes": self._turns,
+            "mean_batch": self._turns / self._batches if self._batches else 0.0,
+            "largest_batch": self._largest_batch,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    def _ensure_writer(self) -> asyncio.Queue[_Turn | None]:
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue()
+            # A fresh context keeps the writer's own session out of the
+            # counters of whichever caller happened to start it; each turn
+            # carries its owner's counters instead.
+            self._writer = asyncio.create_task(
+                self._run(self._queue), context=contextvars.Context()
+            )
+        assert self._queue is not None
+        return self._queue
+
+    async def _run(self, queue: asyncio.Queue[_Turn | None]) -> None:
+        while (turn := await queue.get()) is not None:
+            # Turns whose writes wait on this commit; failed turns are not.
+            batch: list[_Turn] = []
+            turns = 0
+            try:
+                async with self._session_maker() as session:
+                    _count("sessions", ())
+                    # Owners' counters already charged with this session.
+                    charged: set[int] = set()
+                    async with session.begin():
+                        await session.connection(execution_options=BEGIN_IMMEDIATE)
+                        while turn is not None:
+                            if not turn.granted.cancelled():
+                                for stats in turn.counters:
+                                    if id(stats) not in charged:
+                                        charged.add(id(stats))
+                                        stats.sessions += 1
+                                turn.granted.set_result(session)
+                                if await turn.released:
+                                    batch.append(turn)
+                            turns += 1
+                            if turns >= self._max_batch or queue.empty():
+                                break
+                            turn = queue.get_nowait()
+                _count("commits", _counters_of(batch))
+            except Exception as err:
+                for done in batch:
+                    done.committed.set_exception(err)
+            else:
+                for done in batch:
+                    done.committed.set_result(None)
+            if batch:
+                self._batches += 1
+                self._turns += len(batch)
+                self._largest_batch = max(self._largest_batch, len(batch))
+            if turn is None:
+                break
+
+
+def serialize_writes(
+    session_maker: async_sessionmaker[AsyncSession], max_batch: int = 64
+) -> WriteQueue:
+    """Route the writes of repositories on ``session_maker`` through one
+    :class:`WriteQueue`."""
+    queue = WriteQueue(session_maker, max_batch)
+    _write_queues[session_maker] = queue
+    return queue
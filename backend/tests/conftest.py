@@ -0,0 +1,27 @@
+import pytest
+from db_models import Base
+from db_models.sqlite import configure_sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+
+@pytest.fixture
+async def session_maker(tmp_path):
+    """A fresh SQLite database file, configured as the app configures it."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    configure_sqlite(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def write_queue(session_maker):
+    """Serialize the writes of ``session_maker``, as the app does on SQLite."""
+    from repos import serialize_writes
+    from repos.base_repo import _write_queues
+
+    queue = serialize_writes(session_maker, max_batch=8)
+    yield queue
+    await queue.aclose()
+    del _write_queues[session_maker]
@@ -0,0 +1,86 @@
+import pytest
+from db_models import RawArticle
+from db_models.compressed_text import ZSTD_MAGIC, set_html_compression
+from sqlalchemy import select, text
+
+HTML = "<p>Grüße, " + "a fairly repetitive paragraph " * 50 + "</p>"
+
+
+@pytest.fixture
+def compression():
+    yield set_html_compression
+    set_html_compression(0)
+
+
+async def store(session_maker, html: str) -> RawArticle:
+    async with session_maker() as session:
+        article = RawArticle(url="https://example.com/", raw_html=html)
+        session.add(article)
+        await session.commit()
+        return article
+
+
+async def load(session_maker, article: RawArticle) -> tuple[str, bytes]:
+    """The HTML read through the ORM, and the bytes actually stored."""
+    async with session_maker() as session:
+        html = await session.scalar(
+            select(RawArticle.raw_html).where(RawArticle.id == article.id)
+        )
+        stored = await session.scalar(
+            select(text("raw_html"))
+            .select_from(RawArticle)
+            .where(RawArticle.id == article.id)
+        )
+        return html, stored
+
+
+async def test_uncompressed_html_round_trips_as_utf8(session_maker, compression):
+    compression(0)
+    article = await store(session_maker, HTML)
+
+    html, stored = await load(session_maker, article)
+
+    assert html == HTML
+    assert stored == HTML.encode()
+
+
+async def test_compressed_html_round_trips(session_maker, compression):
+    compression(3)
+    article = await store(session_maker, HTML)
+
+    html, stored = await load(session_maker, article)
+
+    assert html == HTML
+    assert stored.startswith(ZSTD_MAGIC)
+    assert len(stored) < len(HTML.encode())
+
+
+async def test_rows_of_either_kind_are_read_after_the_level_changes(
+    session_maker, compression
+):
+    compression(3)
+    compressed = await store(session_maker, HTML)
+    compression(0)
+    plain = await store(session_maker, HTML)
+
+    assert (await load(session_maker, compressed))[0] == HTML
+    assert (await load(session_maker, plain))[0] == HTML
+
+
+async def test_legacy_plaintext_rows_are_read_as_text(session_maker):
+    # Rows written while the column was still TEXT keep their SQLite type.
+    async with session_maker() as session:
+        await session.execute(
+            text(
+                "INSERT INTO raw_article (id, url, raw_html) VALUES (:id, :url, :html)"
+            ),
+            {"id": "0" * 32, "url": "https://example.com/", "html": HTML},
+        )
+        await session.commit()
+        stored_type = await session.scalar(
+            text("SELECT typeof(raw_html) FROM raw_article")
+        )
+        html = await session.scalar(select(RawArticle.raw_html))
+
+    assert stored_type == "text"
+    assert html == HTML
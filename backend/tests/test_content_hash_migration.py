@@ -0,0 +1,85 @@
+import hashlib
+import sqlite3
+import uuid
+from pathlib import Path
+
+import pytest
+import zstandard
+from alembic import command
+from alembic.config import Config
+
+from db_models.compressed_text import ZSTD_MAGIC
+
+ALEMBIC_INI = Path(__file__).parents[1] / "packages/db-migration/alembic.ini"
+BEFORE, REVISION = "b055eed89cd7", "bb2b619e1409"
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    path = tmp_path / "migration.db"
+    monkeypatch.setenv("MIGRATION_DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+    config = Config(str(ALEMBIC_INI))
+    command.upgrade(config, BEFORE)
+    return path, config
+
+
+def insert_articles(path: Path, count: int) -> dict[str, str]:
+    htmls = {uuid.uuid4().hex: f"<p>Article {i} ünïcode</p>" for i in range(count)}
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO raw_article (id, url, raw_html) VALUES (?, ?, ?)",
+            [(id_, f"https://example.com/{id_}", html) for id_, html in htmls.items()],
+        )
+        conn.executemany(
+            "INSERT INTO article (id, raw_html, clean_html) VALUES (?, ?, ?)",
+            [(id_, html, html) for id_, html in htmls.items()],
+        )
+    return htmls
+
+
+def rows(path: Path, table: str, columns: str) -> dict[str, tuple]:
+    with sqlite3.connect(path) as conn:
+        return {
+            row[0]: row[1:]
+            for row in conn.execute(f"SELECT id, {columns} FROM {table}")
+        }
+
+
+def test_upgrade_backfills_hashes_across_batches(database, monkeypatch):
+    path, config = database
+    # More rows than the migration's 500-row batches.
+    htmls = insert_articles(path, 1203)
+    monkeypatch.setenv("HTML_COMPRESSION_LEVEL", "0")
+
+    command.upgrade(config, REVISION)
+
+    for table in ("raw_article", "article"):
+        stored = rows(path, table, "content_hash, raw_html")
+        assert stored == {
+            id_: (hashlib.sha256(html.encode()).hexdigest(), html.encode())
+            for id_, html in htmls.items()
+        }
+
+
+def test_upgrade_compresses_when_asked_and_downgrade_restores_text(
+    database, monkeypatch
+):
+    path, config = database
+    htmls = insert_articles(path, 3)
+    monkeypatch.setenv("HTML_COMPRESSION_LEVEL", "3")
+
+    command.upgrade(config, REVISION)
+
+    decompress = zstandard.ZstdDecompressor().decompress
+    for id_, (raw_html, clean_html) in rows(
+        path, "article", "raw_html, clean_html"
+    ).items():
+        assert raw_html.startswith(ZSTD_MAGIC)
+        assert decompress(raw_html).decode() == htmls[id_]
+        assert decompress(clean_html).decode() == htmls[id_]
+
+    command.downgrade(config, BEFORE)
+
+    assert rows(path, "raw_article", "raw_html") == {
+        id_: (html,) for id_, html in htmls.items()
+    }
@@ -0,0 +1,92 @@
+import sys
+
+import polars as pl
+import pytest
+
+from app.nlp import freq_index
+from app.nlp.freq_index import FrequencyIndex, build_index, index_path
+from app.services.language_loader_service import LanguageResource
+
+
+def write_freq(path, words: dict[str, float]) -> None:
+    pl.DataFrame(
+        {"word": list(words), "log_score": list(words.values())}
+    ).write_parquet(path)
+
+
+def test_load_uses_a_fresh_index(tmp_path):
+    freq_path = tmp_path / "freq.parquet"
+    write_freq(freq_path, {"the": 1.0, "zebra": 9.0})
+    build_index(freq_path)
+
+    index = FrequencyIndex.load(freq_path)
+
+    assert index.lookup(["zebra", "nope"]).to_dicts() == [
+        {"word": "zebra", "log_score": 9.0}
+    ]
+
+
+def test_load_ignores_an_index_built_from_another_parquet(tmp_path):
+    freq_path = tmp_path / "freq.parquet"
+    write_freq(freq_path, {"the": 1.0, "zebra": 9.0})
+    build_index(freq_path)
+    write_freq(freq_path, {"the": 1.0, "zebra": 2.0, "quokka": 8.0})
+
+    index = FrequencyIndex.load(freq_path)
+
+    assert index.lookup(["zebra", "quokka"]).sort("word").to_dicts() == [
+        {"word": "quokka", "log_score": 8.0},
+        {"word": "zebra", "log_score": 2.0},
+    ]
+
+
+def test_load_ignores_an_index_without_a_source_digest(tmp_path):
+    freq_path = tmp_path / "freq.parquet"
+    write_freq(freq_path, {"zebra": 9.0})
+    build_index(freq_path)
+    (tmp_path / "freq.arrow.sha256").unlink()
+    write_freq(freq_path, {"zebra": 3.0})
+
+    assert FrequencyIndex.load(freq_path).lookup(["zebra"]).item(0, 1) == 3.0
+
+
+@pytest.fixture
+def resources(tmp_path, monkeypatch):
+    import app.services.language_loader_service as loader
+
+    paths = {}
+    for language in ("en", "ja"):
+        paths[language] = tmp_path / f"{language}.parquet"
+        write_freq(paths[language], {"word": 1.0})
+    monkeypatch.setattr(
+        loader,
+        "LANGUAGE_RESOURCES",
+        {name: LanguageResource("model", str(path)) for name, path in paths.items()},
+    )
+    return paths
+
+
+def test_main_without_arguments_builds_every_language(resources, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["freq_index"])
+
+    freq_index.main()
+
+    assert all(index_path(path).exists() for path in resources.values())
+
+
+def test_main_builds_only_the_named_languages(resources, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["freq_index", "ja"])
+
+    freq_index.main()
+
+    assert index_path(resources["ja"]).exists()
+    assert not index_path(resources["en"]).exists()
+
+
+def test_main_rejects_unknown_languages(resources, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["freq_index", "ja", "xx"])
+
+    with pytest.raises(SystemExit) as exited:
+        freq_index.main()
+
+    assert exited.value.code == 2
@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+from db_models import Word
+from sqlalchemy import func, select
+
+from app.core.intern_cache import InternCache
+from repos.word_repo import WordRepository
+
+
+async def count_words(session_maker) -> int:
+    async with session_maker() as session:
+        return await session.scalar(select(func.count()).select_from(Word))
+
+
+def test_put_many_evicts_the_least_recently_used():
+    cache = InternCache(2)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    cache.put_many({"a": a, "b": b})
+    cache.get_many(["a"])
+
+    cache.put_many({"c": c})
+
+    assert cache.get_many(["a", "b", "c"]) == ({"a": a, "c": c}, ["b"])
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_resolve_fetches_only_the_misses():
+    cache = InternCache(10)
+    cached = uuid.uuid4()
+    cache.put_many({"cached": cached})
+    requested: list[list[str]] = []
+
+    async def fetch(texts: list[str]) -> dict[str, uuid.UUID]:
+        requested.append(texts)
+        return {text: uuid.uuid4() for text in texts}
+
+    ids, fetched = await cache.resolve(["cached", "new", "new"], fetch)
+
+    assert requested == [["new"]]
+    assert ids == {"cached": cached, "new": fetched["new"]}
+    # Fetched ids wait for the caller's commit before being cached.
+    assert cache.get_many(["new"]) == ({}, ["new"])
+
+
+async def test_rolled_back_ids_are_not_cached(session_maker):
+    cache = InternCache(10)
+    repo = WordRepository(session_maker)
+
+    with pytest.raises(RuntimeError):
+        async with repo.unit_of_work():
+            ids, fetched = await cache.resolve(["hello"], repo.get_or_create_ids)
+            assert set(ids) == {"hello"}
+            raise RuntimeError("render failed")
+
+    assert await count_words(session_maker) == 0
+    assert cache.stats()["size"] == 0
+
+
+async def test_committed_ids_are_cached(session_maker):
+    cache = InternCache(10)
+    repo = WordRepository(session_maker)
+
+    async with repo.unit_of_work():
+        ids, fetched = await cache.resolve(["hello"], repo.get_or_create_ids)
+    cache.put_many(fetched)
+
+    assert cache.get_many(["hello"]) == (ids, [])
+    assert await count_words(session_maker) == 1
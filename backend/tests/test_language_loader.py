@@ -0,0 +1,49 @@
+import time
+
+import polars as pl
+import pytest
+
+from app.services.language_loader_service import LanguageLoaderService, LanguageResource
+
+
+@pytest.fixture
+def resources(tmp_path):
+    freq_path = tmp_path / "freq.parquet"
+    pl.DataFrame({"word": ["the"], "log_score": [1.0]}).write_parquet(freq_path)
+    return {
+        language: LanguageResource(f"blank:{language}", str(freq_path))
+        for language in ("en", "de")
+    }
+
+
+def test_languages_are_loaded_once_and_shared(resources):
+    loader = LanguageLoaderService(resources)
+
+    assert loader.model("en") is loader.model("en")
+    assert loader.stats()["languages"]["en"]["loads"] == 1
+    with pytest.raises(ValueError):
+        loader.model("xx")
+
+
+def test_idle_languages_are_evicted_without_further_use(resources):
+    loader = LanguageLoaderService(resources, idle_ttl=0.05)
+    loader.model("en")
+
+    deadline = time.monotonic() + 2
+    while loader.stats()["loaded"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert loader.stats()["loaded"] == []
+    assert loader.stats()["languages"]["en"]["evictions"] == 1
+
+
+def test_languages_in_use_are_kept(resources):
+    loader = LanguageLoaderService(resources, idle_ttl=0.2)
+    loader.model("en")
+
+    for _ in range(10):
+        time.sleep(0.05)
+        loader.model("en")
+
+    assert loader.stats()["loaded"] == ["en"]
+    assert loader.stats()["languages"]["en"]["loads"] == 1
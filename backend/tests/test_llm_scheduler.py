@@ -0,0 +1,207 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from app.core.tokens import estimate_tokens
+from app.llm import client, scheduler
+from app.llm.scheduler import LlmScheduler, ModelLimits, TokenBucket
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the scheduler's clock: the event loop keeps the real one.
+    monkeypatch.setattr(scheduler, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("a" * 30) == 11
+    assert estimate_tokens("日本語") == 4
+
+
+def test_bucket_starts_full_and_refills_over_time(clock):
+    bucket = TokenBucket(per_minute=60)
+
+    assert bucket.delay(60) == 0
+    bucket.take(60)
+    assert bucket.delay(1) == pytest.approx(1.0)
+
+    clock.now += 30
+    assert bucket.delay(30) == 0
+    assert bucket.delay(40) == pytest.approx(10.0)
+
+
+def test_bucket_holds_at_most_one_minute(clock):
+    bucket = TokenBucket(per_minute=60)
+    clock.now += 600
+
+    bucket.take(60)
+    assert bucket.delay(1) == pytest.approx(1.0)
+
+
+def test_bucket_caps_oversized_requests_at_a_full_bucket(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.take(10)
+
+    assert bucket.delay(1000) == pytest.approx(10.0)
+
+
+def test_bucket_with_no_rate_never_waits(clock):
+    bucket = TokenBucket(per_minute=0)
+    bucket.take(1000)
+
+    assert bucket.delay(1000) == 0
+
+
+def throttled(retry_after: str | None = None) -> httpx.HTTPStatusError:
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    request = httpx.Request("POST", "https://llm.invalid/")
+    response = httpx.Response(429, headers=headers, request=request)
+    return httpx.HTTPStatusError("throttled", request=request, response=response)
+
+
+def make_scheduler(concurrency: int = 8, backoff_base: float = 0.05) -> LlmScheduler:
+    return LlmScheduler(
+        default_limits=ModelLimits(concurrency=concurrency),
+        model_limits={},
+        backoff_base=backoff_base,
+        backoff_max=1.0,
+    )
+
+
+async def fail_with(llm: LlmScheduler, error: BaseException) -> None:
+    with pytest.raises(type(error)):
+        async with llm.slot("model", tokens=1):
+            raise error
+
+
+async def test_throttling_halves_the_cap_down_to_one():
+    llm = make_scheduler(concurrency=8, backoff_base=0)
+
+    for expected in (4, 2, 1, 1):
+        await fail_with(llm, throttled())
+        assert llm.stats()["model"]["limit"] == expected
+    assert llm.stats()["model"]["throttled"] == 4
+
+
+async def test_successes_grow_the_cap_back_one_step_at_a_time():
+    llm = make_scheduler(concurrency=8, backoff_base=0)
+    await fail_with(llm, throttled())
+
+    for _ in range(4):
+        async with llm.slot("model", tokens=1):
+            pass
+
+    assert llm.stats()["model"]["limit"] == 5
+
+
+async def test_other_errors_leave_the_cap_alone():
+    llm = make_scheduler(concurrency=8)
+
+    await fail_with(llm, ValueError("bad output"))
+
+    assert llm.stats()["model"]["limit"] == 8
+    assert llm.stats()["model"]["paused_ms"] == 0
+
+
+async def test_retry_after_pauses_the_queue():
+    llm = make_scheduler(backoff_base=0.01)
+    await fail_with(llm, throttled(retry_after="0.2"))
+
+    assert llm.stats()["model"]["paused_ms"] == pytest.approx(200, abs=20)
+    start = time.monotonic()
+    async with llm.slot("model", tokens=1):
+        waited = time.monotonic() - start
+
+    assert waited >= 0.18
+
+
+async def test_without_retry_after_the_queue_backs_off_exponentially():
+    llm = make_scheduler(backoff_base=0.05)
+
+    await fail_with(llm, throttled())
+    assert llm.stats()["model"]["paused_ms"] == pytest.approx(50, abs=10)
+
+    await asyncio.sleep(0.06)
+    await fail_with(llm, throttled(retry_after="soon"))
+    assert llm.stats()["model"]["paused_ms"] == pytest.approx(100, abs=10)
+
+
+class Flaky:
+    """An LLM call that raises ``errors`` one per attempt, then succeeds."""
+
+    def __init__(self, *errors: BaseException) -> None:
+        self.errors = list(errors)
+        self.calls = 0
+        self.runnable = RunnableLambda(self._call, afunc=self._acall)
+
+    def _call(self, conversation) -> str:
+        raise NotImplementedError
+
+    async def _acall(self, conversation) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+async def test_invoke_retries_throttled_calls_through_the_scheduler(monkeypatch):
+    llm = make_scheduler(concurrency=8, backoff_base=0)
+    monkeypatch.setattr(client, "LLM_SCHEDULER", llm)
+    monkeypatch.setattr(client.SETTINGS, "LLM_MAX_RETRIES", 2)
+    flaky = Flaky(throttled(), throttled())
+
+    result = await client._invoke(
+        "model",
+        flaky.runnable,
+        [{"role": "user", "content": "hi"}],
+        scheduler.Priority.INTERACTIVE,
+    )
+
+    assert result == "ok"
+    assert flaky.calls == 3
+    assert llm.stats()["model"]["throttled"] == 2
+
+
+async def test_invoke_gives_up_after_the_retry_budget(monkeypatch):
+    llm = make_scheduler(backoff_base=0)
+    monkeypatch.setattr(client, "LLM_SCHEDULER", llm)
+    monkeypatch.setattr(client.SETTINGS, "LLM_MAX_RETRIES", 1)
+    flaky = Flaky(throttled(), throttled(), throttled())
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client._invoke(
+            "model",
+            flaky.runnable,
+            [{"role": "user", "content": "hi"}],
+            scheduler.Priority.INTERACTIVE,
+        )
+    assert flaky.calls == 2
+
+
+async def test_invoke_does_not_retry_other_errors(monkeypatch):
+    monkeypatch.setattr(client, "LLM_SCHEDULER", make_scheduler())
+    flaky = Flaky(ValueError("bad output"))
+
+    with pytest.raises(ValueError):
+        await client._invoke(
+            "model",
+            flaky.runnable,
+            [{"role": "user", "content": "hi"}],
+            scheduler.Priority.INTERACTIVE,
+        )
+    assert flaky.calls == 1
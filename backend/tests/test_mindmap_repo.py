@@ -0,0 +1,48 @@
+import pytest
+from db_models import Mindmap
+from sqlalchemy import func, select
+from returns.maybe import Nothing, Some
+
+from repos.hashing import content_hash, normalize_text
+from repos.mindmap_repo import MindmapRepository
+
+
+@pytest.fixture
+def repo(session_maker):
+    return MindmapRepository(session_maker)
+
+
+def test_normalize_text_collapses_whitespace_and_composes_unicode():
+    assert normalize_text("  Cafe\u0301\n\n au\tlait ") == "Caf\u00e9 au lait"
+
+
+def test_cosmetic_differences_hash_equal():
+    assert content_hash("A  long\ntext. ") == content_hash("A long text.")
+    assert content_hash("A long text.") != content_hash("A longer text.")
+
+
+async def test_get_or_create_keeps_the_first_mindmap_per_hash_and_language(repo):
+    text_hash = content_hash("Some article text.")
+
+    first = await repo.get_or_create(text_hash, "en", {"title": "first"})
+    again = await repo.get_or_create(text_hash, "en", {"title": "second"})
+
+    assert again.id == first.id
+    assert again.data == {"title": "first"}
+    async with repo.session() as session:
+        assert await session.scalar(select(func.count()).select_from(Mindmap)) == 1
+
+
+async def test_languages_are_cached_separately(repo):
+    text_hash = content_hash("Some article text.")
+
+    english = await repo.get_or_create(text_hash, "en", {"title": "en"})
+    japanese = await repo.get_or_create(text_hash, "ja", {"title": "ja"})
+
+    assert english.id != japanese.id
+    match await repo.get_by_hash_and_language(text_hash, "ja"):
+        case Some(mindmap):
+            assert mindmap.data == {"title": "ja"}
+        case _:
+            pytest.fail("mindmap not found")
+    assert await repo.get_by_hash_and_language(text_hash, "zh-cn") == Nothing
@@ -0,0 +1,30 @@
+from app.nlp.pipeline import extract_outline, split_blocks
+
+ARTICLE = """<html><head><title>Escaping</title></head><body><article>
+<p>Write &lt;script&gt;alert(1)&lt;/script&gt; &amp; see it shown as plain text.</p>
+<p>The second paragraph has enough words for the extractor to keep it.</p>
+</article></body></html>"""
+
+
+def test_outline_blocks_keep_text_escaped():
+    blocks = extract_outline(ARTICLE).blocks
+
+    html = "".join(blocks)
+    assert "&lt;script&gt;alert(1)&lt;/script&gt; &amp; see" in html
+    assert "<script>" not in html
+    for block in blocks:
+        assert split_blocks(block) == (block,)
+
+
+def test_top_level_text_round_trips_escaped():
+    assert split_blocks("a &lt;b&gt; &amp; c<p>d</p>") == (
+        "a &lt;b&gt; &amp; c",
+        "<p>d</p>",
+    )
+
+
+def test_comments_and_doctypes_are_dropped():
+    assert split_blocks("<!DOCTYPE html><p>a</p><!-- note --><p>b</p>") == (
+        "<p>a</p>",
+        "<p>b</p>",
+    )
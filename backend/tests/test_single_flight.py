@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from app.core import single_flight
+from app.core.single_flight import RedisLock, SingleFlight
+
+
+class FakeRedis:
+    """The slice of ``redis.asyncio.Redis`` the lock uses, yielding to the
+    event loop on every call like a network round trip would."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def set(self, name: str, value: str, *, nx: bool, px: int) -> bool:
+        await asyncio.sleep(0)
+        if nx and name in self.values:
+            return False
+        self.values[name] = value
+        return True
+
+    async def eval(self, _script: str, _numkeys: int, name: str, token: str) -> int:
+        await asyncio.sleep(0)
+        if self.values.get(name) == token:
+            del self.values[name]
+            return 1
+        return 0
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(single_flight, "get_redis_client", lambda: client)
+    monkeypatch.setattr(single_flight, "_LOCK_POLL_INTERVAL", 0.001)
+    return client
+
+
+async def test_overlapping_key_sets_do_not_deadlock(redis):
+    # Two workers, each with its own in-process group, sharing the lock.
+    workers = [SingleFlight("lookup", RedisLock("lookup", ttl=5)) for _ in range(2)]
+    running: set[str] = set()
+    overlaps: list[str] = []
+
+    async def resolve(keys: list[str]) -> dict[str, str]:
+        if clash := running.intersection(keys):
+            overlaps.extend(clash)
+        running.update(keys)
+        await asyncio.sleep(0.01)
+        running.difference_update(keys)
+        return {key: key.upper() for key in keys}
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            workers[0].do_many(["a", "b", "c", "d"], resolve),
+            workers[1].do_many(["d", "c", "e", "b"], resolve),
+        ),
+        timeout=1,
+    )
+
+    assert results == [
+        {"a": "A", "b": "B", "c": "C", "d": "D"},
+        {"d": "D", "c": "C", "e": "E", "b": "B"},
+    ]
+    assert overlaps == []
+    assert redis.values == {}
+
+
+async def test_hold_gives_up_on_a_lock_after_the_ttl(redis):
+    redis.values["flowlang:flight:lookup:b"] = "someone else"
+    lock = RedisLock("lookup", ttl=0.05)
+
+    async with lock.hold(["c", "b", "a"]):
+        assert redis.values == {
+            "flowlang:flight:lookup:a": redis.values["flowlang:flight:lookup:a"],
+            "flowlang:flight:lookup:b": "someone else",
+        }
+
+    assert redis.values == {"flowlang:flight:lookup:b": "someone else"}
+
+
+async def test_hold_releases_only_its_own_locks(redis):
+    lock = RedisLock("lookup", ttl=5)
+
+    async with lock.hold(["a"]):
+        # The lock expired and another worker took it over.
+        redis.values["flowlang:flight:lookup:a"] = "someone else"
+
+    assert redis.values == {"flowlang:flight:lookup:a": "someone else"}
+
+
+async def test_do_shares_one_call_between_concurrent_callers():
+    group: SingleFlight[str, str] = SingleFlight("mindmap")
+    calls = 0
+
+    async def build() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "mindmap"
+
+    results = await asyncio.gather(group.do("text", build), group.do("text", build))
+
+    assert results == ["mindmap", "mindmap"]
+    assert calls == 1
+
+
+async def test_do_raises_when_the_joined_flight_has_no_value():
+    group: SingleFlight[str, str] = SingleFlight("lookup")
+
+    async def resolve_none(keys: list[str]) -> dict[str, str]:
+        await asyncio.sleep(0.01)
+        return {}
+
+    async def unused() -> str:
+        raise AssertionError("the key was already in flight")
+
+    leader = asyncio.ensure_future(group.do_many(["a"], resolve_none))
+    await asyncio.sleep(0)
+
+    with pytest.raises(KeyError):
+        await group.do("a", unused)
+    assert await leader == {"a": None}
@@ -0,0 +1,93 @@
+import pytest
+from db_models import WordLookup
+from sqlalchemy import func, select
+
+from repos.base_repo import BATCH_SIZE
+from repos.sentence_repo import SentenceRepository
+from repos.word_lookup_repo import WordLookupRepository
+from repos.word_repo import WordRepository
+
+
+@pytest.fixture
+async def keys(session_maker):
+    """Lookup keys over 3 sentences and enough words to span several batches."""
+    sentences = await SentenceRepository(session_maker).get_or_create_many(
+        [f"sentence {i}" for i in range(3)]
+    )
+    words = await WordRepository(session_maker).get_or_create_many(
+        [f"word{i}" for i in range(BATCH_SIZE // 2 + 10)]
+    )
+    return [
+        (sentence.id, word.id)
+        for sentence in sentences.values()
+        for word in words.values()
+    ]
+
+
+async def count_lookups(session_maker) -> int:
+    async with session_maker() as session:
+        return await session.scalar(select(func.count()).select_from(WordLookup))
+
+
+async def test_get_or_create_many_spans_several_batches(session_maker, keys):
+    repo = WordLookupRepository(session_maker)
+    texts = {key: f"meaning {i}" for i, key in enumerate(keys)}
+
+    lookups = await repo.get_or_create_many(texts, "en")
+
+    assert len(keys) > BATCH_SIZE
+    assert {key: lookup.text for key, lookup in lookups.items()} == texts
+    assert await count_lookups(session_maker) == len(keys)
+
+
+async def test_get_or_create_many_keeps_existing_lookups(session_maker, keys):
+    repo = WordLookupRepository(session_maker)
+    first, second = keys[:2]
+    existing = await repo.get_or_create(*first, "old meaning", "en")
+
+    lookups = await repo.get_or_create_many(
+        {first: "new meaning", second: "meaning"}, "en"
+    )
+
+    assert lookups[first].id == existing.id
+    assert lookups[first].text == "old meaning"
+    assert lookups[second].text == "meaning"
+    assert await count_lookups(session_maker) == 2
+
+
+async def test_lookups_are_per_language(session_maker, keys):
+    repo = WordLookupRepository(session_maker)
+    key = keys[0]
+    await repo.get_or_create_many({key: "meaning"}, "en")
+    await repo.get_or_create_many({key: "意味"}, "ja")
+
+    assert (await repo.get_many_by_sentence_and_word([key], "ja"))[key].text == "意味"
+    assert await count_lookups(session_maker) == 2
+
+
+async def test_get_many_by_sentence_and_word_returns_only_stored_keys(
+    session_maker, keys
+):
+    repo = WordLookupRepository(session_maker)
+    stored = keys[::2]
+    await repo.get_or_create_many({key: "meaning" for key in stored}, "en")
+
+    found = await repo.get_many_by_sentence_and_word(keys + keys[:10], "en")
+
+    assert set(found) == set(stored)
+    assert all(
+        key == (lookup.sentence_id, lookup.word_id) for key, lookup in found.items()
+    )
+    assert await repo.get_many_by_sentence_and_word([], "en") == {}
+
+
+async def test_get_texts_resolves_sentences_and_words(session_maker, keys):
+    repo = WordLookupRepository(session_maker)
+
+    sentence_texts, word_texts = await repo.get_texts(keys + keys[:3])
+
+    assert set(sentence_texts) == {sentence_id for sentence_id, _ in keys}
+    assert set(sentence_texts.values()) == {f"sentence {i}" for i in range(3)}
+    assert set(word_texts) == {word_id for _, word_id in keys}
+    assert set(word_texts.values()) == {f"word{i}" for i in range(BATCH_SIZE // 2 + 10)}
+    assert await repo.get_texts([]) == ({}, {})
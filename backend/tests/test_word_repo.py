@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+from db_models import Sentence, Word
+from sqlalchemy import func, select
+
+from repos.base_repo import BATCH_SIZE
+from repos.sentence_repo import SentenceRepository
+from repos.word_repo import WordRepository
+
+REPOS = [(WordRepository, Word), (SentenceRepository, Sentence)]
+
+
+async def count_rows(session_maker, model) -> int:
+    async with session_maker() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.parametrize(("repo_class", "model"), REPOS)
+async def test_get_or_create_many_creates_each_text_once(
+    session_maker, repo_class, model
+):
+    repo = repo_class(session_maker)
+
+    rows = await repo.get_or_create_many(["b", "a", "b", "c", "a"])
+
+    assert set(rows) == {"a", "b", "c"}
+    assert all(row.text == text for text, row in rows.items())
+    assert await count_rows(session_maker, model) == 3
+
+
+@pytest.mark.parametrize(("repo_class", "model"), REPOS)
+async def test_get_or_create_many_reuses_existing_rows(
+    session_maker, repo_class, model
+):
+    repo = repo_class(session_maker)
+    existing = await repo.get_or_create("known")
+
+    rows = await repo.get_or_create_many(["known", "new"])
+
+    assert rows["known"].id == existing.id
+    assert await count_rows(session_maker, model) == 2
+
+
+@pytest.mark.parametrize(("repo_class", "model"), REPOS)
+async def test_get_or_create_many_spans_several_batches(
+    session_maker, repo_class, model
+):
+    repo = repo_class(session_maker)
+    texts = [f"text{i}" for i in range(BATCH_SIZE * 2 + 10)]
+    first = await repo.get_or_create_many(texts[: BATCH_SIZE + 5])
+
+    rows = await repo.get_or_create_many(texts + texts[:20])
+
+    assert set(rows) == set(texts)
+    assert all(rows[text].id == row.id for text, row in first.items())
+    assert await count_rows(session_maker, model) == len(texts)
+
+
+@pytest.mark.parametrize(("repo_class", "model"), REPOS)
+async def test_get_or_create_many_of_nothing(session_maker, repo_class, model):
+    assert await repo_class(session_maker).get_or_create_many([]) == {}
+
+
+@pytest.mark.parametrize(("repo_class", "model"), REPOS)
+async def test_insert_ignore_conflicts_skips_existing_and_repeated_texts(
+    session_maker, repo_class, model
+):
+    # What a concurrent writer that inserted the same text first looks like.
+    repo = repo_class(session_maker)
+    existing = await repo.get_or_create("taken")
+
+    async with session_maker.begin() as session:
+        await session.execute(
+            repo.insert_ignore_conflicts(session, model, model.text),
+            [
+                {"id": uuid.uuid4(), "text": "taken"},
+                {"id": uuid.uuid4(), "text": "fresh"},
+                {"id": uuid.uuid4(), "text": "fresh"},
+            ],
+        )
+
+    rows = await repo.get_or_create_many(["taken", "fresh"])
+    assert rows["taken"].id == existing.id
+    assert await count_rows(session_maker, model) == 2
@@ -0,0 +1,145 @@
+import asyncio
+import sqlite3
+
+import pytest
+from db_models import Word
+from sqlalchemy import select
+
+from repos import count_sessions, unit_of_work
+from repos.word_repo import WordRepository
+
+
+async def stored_words(session_maker) -> set[str]:
+    async with session_maker() as session:
+        return set(await session.scalars(select(Word.text)))
+
+
+async def add_word(session_maker, text: str, order: list[str] | None = None) -> None:
+    async with unit_of_work(session_maker) as session:
+        if order is not None:
+            order.append(text)
+        session.add(Word(text=text))
+        await session.flush()
+
+
+async def test_turns_run_in_queue_order_and_share_a_commit(session_maker, write_queue):
+    order: list[str] = []
+    texts = [f"word{i}" for i in range(5)]
+
+    await asyncio.gather(*(add_word(session_maker, text, order) for text in texts))
+
+    assert order == texts
+    assert await stored_words(session_maker) == set(texts)
+    assert write_queue.stats()["batches"] == 1
+    assert write_queue.stats()["writes"] == 5
+
+
+async def test_large_bursts_commit_in_several_batches(session_maker, write_queue):
+    texts = [f"word{i}" for i in range(20)]
+
+    await asyncio.gather(*(add_word(session_maker, text) for text in texts))
+
+    assert await stored_words(session_maker) == set(texts)
+    assert write_queue.stats()["batches"] == 3
+    assert write_queue.stats()["largest_batch"] == 8
+
+
+async def test_a_failing_turn_rolls_back_only_itself(session_maker, write_queue):
+    async def failing() -> None:
+        async with unit_of_work(session_maker) as session:
+            session.add(Word(text="doomed"))
+            await session.flush()
+            raise ValueError("bad row")
+
+    results = await asyncio.gather(
+        add_word(session_maker, "before"),
+        failing(),
+        add_word(session_maker, "after"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], ValueError)
+    assert await stored_words(session_maker) == {"before", "after"}
+    assert write_queue.stats()["batches"] == 1
+    assert write_queue.stats()["writes"] == 2
+
+
+async def test_nested_writes_join_the_turn(session_maker, write_queue):
+    repo = WordRepository(session_maker)
+
+    async with count_sessions() as stats, repo.unit_of_work() as session:
+        await repo.get_or_create_ids(["a", "b"])
+        async with repo.unit_of_work() as nested:
+            assert nested is session
+        await repo.get_or_create_ids(["c"])
+
+    assert await stored_words(session_maker) == {"a", "b", "c"}
+    assert write_queue.stats()["writes"] == 1
+    assert stats.sessions == 1
+    assert stats.commits == 1
+
+
+async def test_queued_writes_are_counted_for_their_caller(session_maker, write_queue):
+    async with count_sessions() as together:
+        await asyncio.gather(add_word(session_maker, "a"), add_word(session_maker, "b"))
+    async with count_sessions() as apart:
+        await add_word(session_maker, "c")
+        await add_word(session_maker, "d")
+
+    # Writes sharing a batch share its session and commit.
+    assert (together.sessions, together.commits, together.shared_calls) == (1, 1, 2)
+    assert (apart.sessions, apart.commits, apart.shared_calls) == (2, 2, 2)
+
+
+async def test_failed_turns_count_no_commit(session_maker, write_queue):
+    async with count_sessions() as stats:
+        with pytest.raises(ValueError):
+            async with unit_of_work(session_maker):
+                raise ValueError("bad row")
+
+    assert (stats.sessions, stats.commits) == (1, 0)
+
+
+async def test_tasks_started_in_a_turn_cannot_write_in_it(session_maker, write_queue):
+    repo = WordRepository(session_maker)
+
+    async with asyncio.timeout(5), repo.unit_of_work():
+        await repo.get_or_create_ids(["owner"])
+        with pytest.raises(RuntimeError, match="write-queue turn"):
+            await asyncio.create_task(add_word(session_maker, "child"))
+
+    assert await stored_words(session_maker) == {"owner"}
+
+
+async def test_the_writer_holds_the_write_lock_from_the_start(
+    session_maker, write_queue
+):
+    path = session_maker.kw["bind"].url.database
+
+    async with unit_of_work(session_maker):
+        # Nothing has been written yet, but another process cannot write.
+        other = sqlite3.connect(path, timeout=0, isolation_level=None)
+        try:
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                other.execute("BEGIN IMMEDIATE")
+        finally:
+            other.close()
+
+
+async def test_tasks_outliving_a_turn_take_their_own(session_maker, write_queue):
+    started = asyncio.Event()
+
+    async def late_write() -> None:
+        started.set()
+        await asyncio.sleep(0.05)
+        await add_word(session_maker, "late")
+
+    async with unit_of_work(session_maker):
+        task = asyncio.create_task(late_write())
+        await started.wait()
+        await add_word(session_maker, "owner")
+    async with asyncio.timeout(5):
+        await task
+
+    assert await stored_words(session_maker) == {"owner", "late"}
+    assert write_queue.stats()["batches"] == 2